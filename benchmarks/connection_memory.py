@@ -0,0 +1,93 @@
+"""
+Memory footprint of connections: bytes per connection of current `Connection` compared with
+the previous (non-slotted) record, which allocated its lock eagerly and kept its own input/output copies.
+
+Topics and specs are rebuilt for each connection, as it happens when they are deserialized from handshake messages.
+
+Usage: python benchmarks/connection_memory.py [number of connections]
+"""
+
+import asyncio
+import sys
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Optional
+
+from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.schemaspec import Input, Output
+
+DEFAULT_CONNECTIONS = 100_000
+REMOTES = 100
+
+
+@dataclass
+class LegacyConnection:
+    operation_name: str
+    remote_identifier: str
+
+    incoming_close_connection_topic: str
+    close_connection_to_remote_topic: str
+
+    lock: asyncio.Lock = field(default_factory=lambda: asyncio.Lock(), init=False)
+
+    input: Input
+    output: Output
+
+    input_topic: Optional[str] = field(default=None)
+    output_topic: Optional[str] = field(default=None)
+
+    compression_codec: Optional[str] = field(default=None)
+    compression_threshold: int = field(default=0)
+
+    soft_closed_at: Optional[datetime] = field(default=None, init=False)
+    created_at: datetime = field(default_factory=lambda: datetime.now())
+    last_use: Optional[datetime] = field(default=None)
+
+
+def build(connection_type, index: int, input: Input, output: Output):
+    remote_identifier = "".join(["plugin-", str(index % REMOTES)])
+    operation_name = "".join(["operation-", str(index // REMOTES)])
+
+    return connection_type(
+        operation_name=operation_name,
+        remote_identifier=remote_identifier,
+        incoming_close_connection_topic=f"{operation_name}.core.{remote_identifier}.close",
+        close_connection_to_remote_topic=f"{operation_name}.{remote_identifier}.core.close",
+        input_topic=f"{operation_name}.{remote_identifier}.input",
+        output_topic=f"{operation_name}.core.output",
+        input=replace(input, schemas=list(input.schemas)),
+        output=replace(output, schemas=list(output.schemas)),
+    )
+
+
+def bytes_per_connection(connection_type, n: int) -> float:
+    input = Input.string()
+    output = Output.float64()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    connections = [build(connection_type, index, input, output) for index in range(n)]
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(connections) == n
+
+    return (after - before) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONNECTIONS
+
+    legacy = bytes_per_connection(LegacyConnection, n)
+    current = bytes_per_connection(Connection, n)
+
+    print(f"connections: {n}")
+    print(f"before: {legacy:.0f} bytes per connection")
+    print(f"after:  {current:.0f} bytes per connection ({100 * (legacy - current) / legacy:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Simulate a large fleet of orbiters in virtual time and measure convergence time to compliance and control-plane traffic.
+
+Orbiters are split in groups, each group uses its own discover topic (i.e. cores discover only plugins of the same group).
+
+Usage: python benchmarks/fleet_simulation.py [orbiters] [group size] [delay] [loss] [seed]
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.simulation.simulation import Simulation
+
+DEFAULT_ORBITERS = 10_000
+DEFAULT_GROUP_SIZE = 10
+DEFAULT_DELAY = 0.01
+DEFAULT_LOSS = 0.0
+DEFAULT_SEED = 0
+
+CONVERGENCE_TIMEOUT = 600
+OBSERVATION_TIME = 60
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ORBITERS
+    group_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_GROUP_SIZE
+    delay = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_DELAY
+    loss = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_LOSS
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else DEFAULT_SEED
+
+    with Simulation(delay=delay, jitter=delay, loss=loss, seed=seed) as simulation:
+        cores = []
+        plugins = []
+
+        for i in range(n):
+            discover_topic = f"$handshake.discover.{i // group_size}"
+
+            if i % 2 == 0:
+                plugins.append(EchoPlugin(
+                    identifier=f"plugin{i}",
+                    eventbus_client=simulation.build_client(),
+                    discover_topic=discover_topic
+                ))
+            else:
+                cores.append(Core(
+                    identifier=f"core{i}",
+                    eventbus_client=simulation.build_client(),
+                    discover_topic=discover_topic,
+                    operation_requirements={
+                        "echo": OperationRequirement(Constraint(
+                            minimum=1,
+                            inputs=[Input.string()],
+                            outputs=[Output.no_output()],
+                        ))
+                    }
+                ))
+
+        async def scenario():
+            await simulation.start_all(plugins)
+            await simulation.start_all(cores)
+
+            convergence_time = await simulation.wait_for_compliance(cores, timeout=CONVERGENCE_TIMEOUT)
+
+            handshake_messages = simulation.eventbus.published
+
+            await simulation.sleep(OBSERVATION_TIME)
+
+            await simulation.stop_all(cores)
+            await simulation.stop_all(plugins)
+
+            return convergence_time, handshake_messages
+
+        started_at = time.monotonic()
+
+        convergence_time, handshake_messages = simulation.run(scenario())
+
+        print(f"orbiters: {n} ({len(cores)} cores, {len(plugins)} plugins, groups of {group_size})")
+        print(f"delay: {delay}s (+ up to {delay}s jitter), loss: {loss}")
+        print(f"convergence time: {convergence_time}s (virtual)" if convergence_time is not None else "not converged")
+        print(f"messages until convergence: {handshake_messages}")
+        print(f"messages (total): {simulation.eventbus.published}, lost: {simulation.eventbus.lost}")
+
+        for message_type, count in simulation.eventbus.published_by_type.most_common():
+            print(f"  {message_type}: {count}")
+
+        print(f"virtual time: {simulation.elapsed:.1f}s, wall-clock time: {time.monotonic() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Any, Tuple, Callable
+
+from busline.event.message.message import Message
+from busline.event.registry import EventRegistry
+from orbitalis.utils.message import serialize_message
+
+
+@dataclass
+class ResultCacheMetrics:
+    """
+    Counters of a result cache
+
+    Author: Nicola Ricciardi
+    """
+
+    hits: int = field(default=0)
+    misses: int = field(default=0)
+    evictions: int = field(default=0)
+    expirations: int = field(default=0)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        if self.lookups == 0:
+            return None
+
+        return self.hits / self.lookups
+
+
+@dataclass(kw_only=True)
+class ResultCache:
+    """
+    Cache of results of an idempotent operation, keyed by input payload digest.
+    Entries expire after `ttl` seconds (if provided), least recently used entries are evicted beyond `max_entries`.
+
+    Author: Nicola Ricciardi
+    """
+
+    ttl: Optional[float] = field(default=None)
+    max_entries: int = field(default=1024)
+    clock: Callable[[], float] = field(default=time.monotonic)
+
+    metrics: ResultCacheMetrics = field(default_factory=ResultCacheMetrics, init=False)
+
+    _entries: OrderedDict[bytes, Tuple[float, Any]] = field(default_factory=OrderedDict, init=False)     # key => (expire at, result)
+
+    def __post_init__(self):
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError("ttl must be > 0")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def key_of(cls, payload: Optional[Message]) -> bytes:
+        """
+        Digest of payload type and serialized payload
+        """
+
+        if payload is None:
+            return b""
+
+        _, serialized_data = serialize_message(payload)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(EventRegistry.obj_to_type(payload).encode())
+        digest.update(serialized_data)
+
+        return digest.digest()
+
+    def get(self, key: bytes) -> Tuple[bool, Any]:
+        """
+        Return (hit, result)
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] < self.clock():
+            del self._entries[key]
+            self.metrics.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.metrics.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.metrics.hits += 1
+
+        return True, entry[1]
+
+    def put(self, key: bytes, result: Any):
+        expire_at = float("inf") if self.ttl is None else self.clock() + self.ttl
+
+        self._entries[key] = (expire_at, result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.metrics.evictions += 1
+
+    def invalidate(self, key: Optional[bytes] = None):
+        """
+        Remove an entry, or all entries if key is not provided
+        """
+
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
@@ -1,18 +1,23 @@
 import asyncio
 import copy
-import random
+import math
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass, field
-from typing import Type, override, Dict, Set, Optional, List
+from typing import Type, override, Dict, Set, Optional, List, AsyncIterable, Tuple
 from busline.client.subscriber.event_handler import event_handler
 from busline.client.subscriber.event_handler.event_handler import EventHandler
 from busline.event.message.avro_message import AvroMessageMixin
 from busline.event.event import Event
 
-from orbitalis.core.sink import SinksProviderMixin
+from orbitalis.core.cache import ResultCache
+from orbitalis.core.load import PluginLoadTable
+from orbitalis.core.offer_selection import OfferCandidate
+from orbitalis.core.sink import SinksProviderMixin, SinkEventHandler
+from orbitalis.core.window import WindowedSink
 from orbitalis.core.state import CoreState
 from orbitalis.events.discover import DiscoverMessage, DiscoverQuery
+from orbitalis.events.load import OperationLoad, DEFAULT_LOAD_REPORT_MAX_AGE
 from orbitalis.events.offer import OfferMessage, OfferedOperation
 from orbitalis.core.requirement import Constraint, OperationRequirement
 from orbitalis.events.reply import RequestOperationMessage, RejectOperationMessage
@@ -21,7 +26,12 @@ from orbitalis.orbiter.connection import Connection
 from orbitalis.orbiter.orbiter import Orbiter
 from orbitalis.orbiter.pending_request import PendingRequest
 from orbitalis.orbiter.schemaspec import Input
+from orbitalis.orbiter.stream import StreamItem
 from orbitalis.state_machine.state_machine import StateMachine
+from orbitalis.tracing.span import SpanKind
+from orbitalis.tracing.tracer import Tracer
+from orbitalis.utils.event_headers import event_headers, REPLY_TO_HEADER
+from orbitalis.utils import clock, rng
 from orbitalis.utils.task import fire_and_forget_task
 
 
@@ -41,9 +51,30 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
     _last_discover_sent_at: Optional[datetime] = field(default=None)
 
+    offer_collection_window: Optional[float] = field(default=None)     # seconds, if set offers are collected and best ones are selected (see `select_offers`)
+    _offer_candidates: Dict[str, List[OfferCandidate]] = field(default_factory=dict, init=False)    # operation_name => candidates of current collection window
+    _offer_selection_task: Optional[asyncio.Task] = field(default=None, init=False)
+
+    plugin_loads: PluginLoadTable = field(default_factory=PluginLoadTable, init=False)     # load reported by plugins (see `OperationLoad`)
+    load_report_max_age: Optional[float] = field(default=DEFAULT_LOAD_REPORT_MAX_AGE)     # seconds, older load reports are ignored (None to never ignore them)
+    load_aware_routing: bool = field(default=False)     # if True, the less loaded plugin between two random ones is used (see `_choose_connection`)
+
+    coalesced_calls: int = field(default=0, init=False)     # number of calls attached to an identical in-flight call
+
+    _pending_calls: Dict[str, asyncio.Future] = field(default_factory=dict, init=False)     # call identifier => future of result
+    _pending_call_plugins: Dict[str, str] = field(default_factory=dict, init=False)     # call identifier => plugin identifier
+    _in_flight_calls: Dict[Tuple[str, Optional[str], bytes], asyncio.Future] = field(default_factory=dict, init=False)     # (operation_name, plugin_identifier, payload digest) => future of result
+    _execution_inputs: Dict[Tuple[str, type], Tuple[Optional[OperationRequirement], Input]] = field(default_factory=dict, init=False)    # (operation_name, message type) => (requirement, input)
+
     def __post_init__(self):
         super().__post_init__()
 
+        if self.offer_collection_window is not None and self.offer_collection_window < 0:
+            raise ValueError("offer_collection_window must be >= 0")
+
+        if self.load_report_max_age is not None and self.load_report_max_age <= 0:
+            raise ValueError("load_report_max_age must be > 0")
+
         self.state = CoreState.CREATED
         self.compliant_event.clear()
         self.not_compliant_event.set()
@@ -80,14 +111,27 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
                 handler=self.__offer_event_handler
             )
 
+        for requirement in self.operation_requirements.values():
+            for input in requirement.constraint.inputs:
+                self.schema_registry.register_spec(input)
+
+            for output in requirement.constraint.outputs:
+                self.schema_registry.register_spec(output)
+
         self.update_compliant()
 
         await self.send_discover_based_on_requirements()
 
     @override
     async def _internal_stop(self, *args, **kwargs):
+        if self._offer_selection_task is not None:
+            self._offer_selection_task.cancel()
+            self._offer_selection_task = None
+
         await super()._internal_stop(*args, **kwargs)
 
+        await self.flush_sinks()
+
     @override
     async def _on_stopped(self, *args, **kwargs):
         await super()._on_stopped(*args, **kwargs)
@@ -110,8 +154,22 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         if connection.has_output:
             await self.eventbus_client.unsubscribe(connection.output_topic)
 
+            sink = self.operation_sinks.get(connection.operation_name)
+            if isinstance(sink, WindowedSink):
+                sink.forget_topic(connection.output_topic)
+
         self.update_compliant()
 
+    @override
+    async def _on_dead_remotes_reaped(self, remote_identifiers: List[str]):
+        """
+        Operations of dead plugins are discovered again immediately
+        """
+
+        self.update_compliant()
+
+        await self.send_discover_based_on_requirements()
+
     def current_constraint_for_operation(self, operation_name: str) -> Constraint:
         """
         Return current constraint for operation based on current connections
@@ -239,11 +297,15 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
         discover_message = DiscoverMessage(
             core_identifier=self.identifier,
-            queries=dict([(operation_name, DiscoverQuery.from_constraint(operation_name, constraint)) for operation_name, constraint in operation_requirements.items()]),
+            queries=dict([
+                (operation_name, DiscoverQuery.from_constraint(operation_name, constraint, compacted=self.schema_negotiation))
+                for operation_name, constraint in operation_requirements.items()
+            ]),
             offer_topic=self.offer_topic,
             core_keepalive_topic=self.keepalive_topic,
             core_keepalive_request_topic=self.keepalive_request_topic,
-            considered_dead_after=self.consider_others_dead_after
+            considered_dead_after=self.consider_others_dead_after,
+            schema_request_topic=self.schema_request_topic
         )
 
         await self._on_send_discover(discover_message)
@@ -253,7 +315,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
             discover_message
         )
 
-        self._last_discover_sent_at = datetime.now()
+        self._last_discover_sent_at = clock.now()
 
     async def send_discover_based_on_requirements(self):
         operation_requirements: Dict[str, Constraint] = self._operation_to_discover()
@@ -261,6 +323,28 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         if len(operation_requirements) > 0:
             await self.send_discover_for_operations(operation_requirements)
 
+    async def _resolve_offered_operation(self, plugin_identifier: str, offered_operation: OfferedOperation) -> OfferedOperation:
+        """
+        Resolve schemas of offered operation (see `resolve_schema_spec`) if requirement needs them to check compatibility,
+        i.e. if it is not exact
+        """
+
+        requirement = self.operation_requirements.get(offered_operation.name)
+
+        if requirement is None or not requirement.constraint.uses_schema_resolution:
+            return offered_operation
+
+        resolved_operation = OfferedOperation(
+            name=offered_operation.name,
+            input=await self.resolve_schema_spec(offered_operation.input, plugin_identifier),
+            output=await self.resolve_schema_spec(offered_operation.output, plugin_identifier)
+        )
+
+        # plugin's output schemas are needed to read its results
+        self.schema_registry.register_spec(resolved_operation.output)
+
+        return resolved_operation
+
     def _is_plugin_operation_required_and_pluggable(self, plugin_identifier: str, offered_operation: OfferedOperation) -> bool:
 
         not_satisfied_requirement = self.current_constraint_for_operation(offered_operation.name)
@@ -304,6 +388,9 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
         setup_data = await self._get_setup_data(plugin_identifier, offered_operation)
 
+        compression = self.operation_requirements[offered_operation.name].compression
+        schema_resolution = self.operation_requirements[offered_operation.name].constraint.uses_schema_resolution
+
         incoming_close_connection_topic: str = self._build_incoming_close_connection_topic(
             plugin_identifier,
             offered_operation.name
@@ -313,9 +400,11 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
             operation_name=offered_operation.name,
             remote_identifier=plugin_identifier,
             output_topic=output_topic,
-            output=offered_operation.output,
-            input=offered_operation.input,
-            incoming_close_connection_topic=incoming_close_connection_topic
+            output=await self.resolve_schema_spec(offered_operation.output, plugin_identifier),
+            input=await self.resolve_schema_spec(offered_operation.input, plugin_identifier),
+            incoming_close_connection_topic=incoming_close_connection_topic,
+            compression_threshold=compression.threshold if compression is not None else 0,
+            schema_resolution=schema_resolution
         ))
 
         await self.eventbus_client.publish(
@@ -326,7 +415,10 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
                 response_topic=self.response_topic,
                 output_topic=output_topic,
                 core_side_close_operation_connection_topic=incoming_close_connection_topic,
-                setup_data=setup_data
+                setup_data=setup_data,
+                compression_codecs=list(compression.codecs) if compression is not None else [],
+                compression_threshold=compression.threshold if compression is not None else 0,
+                schema_resolution=schema_resolution
             )
         )
 
@@ -345,6 +437,140 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         Hook called when a new offer arrives
         """
 
+    def _pending_requests_for_operation(self, operation_name: str) -> int:
+        return sum(1 for pending_request in self._all_pending_requests if pending_request.operation_name == operation_name)
+
+    def plugin_load(self, plugin_identifier: str, operation_name: str) -> Optional[OperationLoad]:
+        """
+        Return last load reported by plugin for operation (see `plugin_loads`), None if it is unknown or too old
+        """
+
+        return self.plugin_loads.get(plugin_identifier, operation_name, max_age=self.load_report_max_age)
+
+    def _plugin_pressure(self, plugin_identifier: str, operation_name: str) -> int:
+        """
+        Return in flight invocations and queued inputs reported by plugin for operation, 0 if they are unknown
+        """
+
+        load = self.plugin_load(plugin_identifier, operation_name)
+
+        if load is None:
+            return 0
+
+        return load.pressure
+
+    def _offer_sort_key(self, candidate: OfferCandidate, constraint: Constraint) -> Tuple:
+        """
+        Key used to rank offers of an operation (lower is better): mandatory plugins first, then not suspected ones,
+        then the ones with more free slots, then the less loaded ones and finally the fastest to answer
+        """
+
+        return (
+            candidate.plugin_identifier not in constraint.mandatory,
+            self.is_suspected(candidate.plugin_identifier),
+            -(candidate.free_slots if candidate.free_slots is not None else math.inf),
+            self._plugin_pressure(candidate.plugin_identifier, candidate.operation_name),
+            candidate.latency
+        )
+
+    def _select_offers_for_operation(self, operation_name: str, candidates: List[OfferCandidate]) -> Tuple[List[OfferCandidate], List[OfferCandidate]]:
+        """
+        Split candidates in selected and rejected ones, based on current constraint of operation.
+        Pending requests are taken into account, so maximum is never exceeded
+        """
+
+        constraint = self.current_constraint_for_operation(operation_name)
+
+        if not Core._is_plugin_operation_required_by_constraint(constraint):
+            return [], candidates
+
+        available_slots: Optional[int] = None
+        if constraint.maximum is not None:
+            available_slots = max(0, constraint.maximum - self._pending_requests_for_operation(operation_name))
+
+        selected: List[OfferCandidate] = []
+        rejected: List[OfferCandidate] = []
+        selected_plugins: Set[str] = set()
+
+        for candidate in sorted(candidates, key=lambda c: self._offer_sort_key(c, constraint)):
+            if candidate.plugin_identifier in selected_plugins \
+                    or self._is_pending(candidate.plugin_identifier, operation_name) \
+                    or (available_slots is not None and len(selected) >= available_slots) \
+                    or not constraint.is_compatible(candidate.plugin_identifier):
+                rejected.append(candidate)
+                continue
+
+            selected_plugins.add(candidate.plugin_identifier)
+            selected.append(candidate)
+
+        return selected, rejected
+
+    def _collect_offer(self, plugin_identifier: str, reply_topic: str, offered_operation: OfferedOperation):
+        """
+        Add offered operation to candidates of current collection window, window is opened if it is not
+        """
+
+        now = clock.now()
+        sent_at = self._last_discover_sent_at if self._last_discover_sent_at is not None else now
+
+        self._offer_candidates.setdefault(offered_operation.name, []).append(OfferCandidate(
+            plugin_identifier=plugin_identifier,
+            reply_topic=reply_topic,
+            offered_operation=offered_operation,
+            latency=max(0.0, (now - sent_at).total_seconds())
+        ))
+
+        if self._offer_selection_task is None:
+            self._offer_selection_task = asyncio.create_task(self.__close_offer_collection_window())
+
+    async def __close_offer_collection_window(self):
+        await asyncio.sleep(self.offer_collection_window)
+
+        self._offer_selection_task = None
+
+        await self.select_offers()
+
+    async def _on_offers_selected(self, selected: List[OfferCandidate], rejected: List[OfferCandidate]):
+        """
+        Hook called when offers of a collection window are selected, before requests and rejections are sent
+        """
+
+    async def select_offers(self):
+        """
+        Select best offers among collected ones (see `_offer_sort_key`), request selected operations and reject the others
+        """
+
+        candidates_by_operation = self._offer_candidates
+        self._offer_candidates = dict()
+
+        selected: List[OfferCandidate] = []
+        rejected: List[OfferCandidate] = []
+
+        for operation_name, candidates in candidates_by_operation.items():
+            selected_for_operation, rejected_for_operation = self._select_offers_for_operation(operation_name, candidates)
+            selected.extend(selected_for_operation)
+            rejected.extend(rejected_for_operation)
+
+        logging.debug("%s: selected offers: %s, rejected offers: %s", self, selected, rejected)
+
+        await self._on_offers_selected(selected, rejected)
+
+        tasks = []
+        for candidate in selected:
+            tasks.append(self.__request_operation(candidate.plugin_identifier, candidate.reply_topic, candidate.offered_operation))
+
+        for candidate in rejected:
+            tasks.append(self.__reject_operation(candidate.reply_topic, candidate.offered_operation))
+
+        try:
+            await asyncio.gather(*tasks)
+
+        except Exception as e:
+            logging.error("%s: %s", self, repr(e))
+
+            if self.raise_exceptions:
+                raise e
+
     @event_handler
     async def __offer_event_handler(self, topic: str, event: Event[OfferMessage]):
         logging.info("%s: new offer: %s -> %s", self, topic, event)
@@ -355,16 +581,28 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
             event.payload.plugin_identifier,
             keepalive_topic=event.payload.plugin_keepalive_topic,
             keepalive_request_topic=event.payload.plugin_keepalive_request_topic,
-            consider_me_dead_after=event.payload.considered_dead_after
+            consider_me_dead_after=event.payload.considered_dead_after,
+            schema_request_topic=event.payload.schema_request_topic
         )
 
         self.have_seen(event.payload.plugin_identifier)
 
         self._others_considers_me_dead_after[event.payload.plugin_identifier] = event.payload.considered_dead_after
 
+        self.plugin_loads.update(
+            event.payload.plugin_identifier,
+            [offered_operation.load for offered_operation in event.payload.offered_operations if offered_operation.load is not None]
+        )
+
         tasks = []
         for offered_operation in event.payload.offered_operations:
+            offered_operation = await self._resolve_offered_operation(event.payload.plugin_identifier, offered_operation)
+
             if self._is_plugin_operation_required_and_pluggable(event.payload.plugin_identifier, offered_operation):
+                if self.offer_collection_window is not None:
+                    self._collect_offer(event.payload.plugin_identifier, event.payload.reply_topic, offered_operation)
+                    continue
+
                 tasks.append(self.__request_operation(
                     event.payload.plugin_identifier,
                     event.payload.reply_topic,
@@ -425,31 +663,40 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
             if pending_request.output_topic is not None:        # output is excepted
                 handler: Optional[EventHandler] = None
+                streaming = False
                 if operation_name in self.operation_sinks:
                     handler = self.operation_sinks[operation_name]
+                    streaming = operation_name in self.streaming_sinks
 
                 if self.operation_requirements[operation_name].has_override_sink:
                     handler = self.operation_requirements[operation_name].override_sink
-
-                if handler is not None:
-                    try:
-                        await self.eventbus_client.subscribe(
-                            pending_request.output_topic,
-                            handler
+                    streaming = False
+
+                # output topic is subscribed even without sink, because results can be related to calls (see `call`)
+                try:
+                    await self.eventbus_client.subscribe(
+                        pending_request.output_topic,
+                        SinkEventHandler(
+                            core=self,
+                            operation_name=operation_name,
+                            handler=handler,
+                            streaming=streaming
                         )
+                    )
 
-                        topics_to_unsubscribe_if_error.append(pending_request.output_topic)
+                    topics_to_unsubscribe_if_error.append(pending_request.output_topic)
 
-                    except Exception as e:
-                        logging.error("%s: error during subscribing to '%s' in response handling: %s", self, pending_request.output_topic, repr(e))
+                except Exception as e:
+                    logging.error("%s: error during subscribing to '%s' in response handling: %s", self, pending_request.output_topic, repr(e))
 
-                        await self.eventbus_client.unsubscribe(pending_request.incoming_close_connection_topic)
+                    await self.eventbus_client.unsubscribe(pending_request.incoming_close_connection_topic)
 
-                        if self.raise_exceptions:
-                            raise e
+                    if self.raise_exceptions:
+                        raise e
 
             pending_request.input_topic = event.payload.operation_input_topic
             pending_request.close_connection_to_remote_topic = event.payload.plugin_side_close_operation_connection_topic
+            pending_request.compression_codec = event.payload.compression_codec
 
             try:
                 self._promote_pending_request_to_connection(pending_request)
@@ -504,10 +751,106 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
         self.update_compliant()
 
+    async def _publish_input(self, connection: Connection, data: Optional[AvroMessageMixin], *, headers: Optional[Dict[str, str]] = None):
+        """
+        Publish data on input topic of connection (see `Connection.prepare`).
+        If tracer is set, a producer span is created and propagated
+        """
+
+        data = connection.prepare(data)
+
+        if self.tracer is None:
+            await self._publish(connection.input_topic, data, headers=headers)
+            return
+
+        with self.tracer.span(
+            f"execute {connection.operation_name}",
+            kind=SpanKind.PRODUCER,
+            orbiter_identifier=self.identifier,
+            attributes={"topic": connection.input_topic, "plugin_identifier": connection.remote_identifier}
+        ) as span:
+            await self._publish(connection.input_topic, data, headers=Tracer.inject(span, headers))
+
+    def _execution_input(self, operation_name: str, message_type: type) -> Input:
+        """
+        Return input used to find connections which can receive messages of given type (NoneType if there is no data).
+        If requirement has an input with the same schema, it is used, so its compatibility is honored.
+        Inputs are cached, because building them from message schema is expensive
+        """
+
+        requirement = self.operation_requirements.get(operation_name)
+
+        cached = self._execution_inputs.get((operation_name, message_type))
+
+        if cached is not None and cached[0] is requirement:
+            return cached[1]
+
+        input = Input.empty() if message_type is type(None) else Input.from_message(message_type)
+
+        if requirement is not None:
+            signature = input.signature
+            for constraint_input in requirement.constraint.inputs:
+                if constraint_input.signature == signature:
+                    input = constraint_input
+                    break
+
+        self._execution_inputs[(operation_name, message_type)] = (requirement, input)
+
+        return input
+
+    @override
+    async def _on_load_report(self, from_identifier: str, load: List[OperationLoad]):
+        self.plugin_loads.update(from_identifier, load)
+
+    @override
+    async def _forget_remote(self, remote_identifier: str):
+        """
+        In addition, pending calls sent to remote plugin fail with ConnectionError
+        """
+
+        await super()._forget_remote(remote_identifier)
+
+        self.plugin_loads.forget(remote_identifier)
+
+        for call_identifier, plugin_identifier in list(self._pending_call_plugins.items()):
+            if plugin_identifier != remote_identifier:
+                continue
+
+            future = self._pending_calls.pop(call_identifier, None)
+            if future is not None and not future.done():
+                future.set_exception(ConnectionError(f"plugin {remote_identifier} is dead"))
+
+    def _choose_connection(self, connections: List[Connection]) -> Connection:
+        """
+        Choose a connection among given ones: randomly or, if `load_aware_routing` is enabled,
+        the less loaded between two random ones (power of two choices), so stale load reports do not make all cores choose the same plugin
+        """
+
+        if not self.load_aware_routing or len(connections) == 1:
+            return rng.choice(connections)
+
+        return min(
+            rng.sample(connections, 2),
+            key=lambda connection: self._plugin_pressure(connection.remote_identifier, connection.operation_name)
+        )
+
+    def _avoid_suspected(self, connections: List[Connection]) -> List[Connection]:
+        """
+        Return connections of plugins which are not suspected to be dead (see `is_suspected`).
+        If every plugin is suspected, all connections are returned
+        """
+
+        trusted = [connection for connection in connections if not self.is_suspected(connection.remote_identifier)]
+
+        if len(trusted) == 0:
+            return connections
+
+        return trusted
+
     async def execute_distributed(self, operation_name: str, data: List[Optional[AvroMessageMixin]], fire_and_forget: bool = False) -> Set[str]:
         """
-        Execute the operation by its name, distributing provided data among all compatible plugins.
-        All data messages must be of the same type.
+        Execute the operation by its name, distributing provided data among all compatible plugins
+        (suspected plugins are avoided). All data messages must be of the same type.
 
         Return the plugin identifiers the data has been sent to.
         """
@@ -520,10 +863,10 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
             if not isinstance(data[index], message_type):
                 raise ValueError("all data messages must be of the same type")
 
-        connections = self.retrieve_connections(
+        connections = self._avoid_suspected(self.retrieve_connections(
             operation_name=operation_name,
-            input=Input.empty() if message_type is type(None) else Input.from_message(message_type)
-        )
+            input=self._execution_input(operation_name, message_type)
+        ))
 
         plugin_identifiers: Set[str] = set()
         tasks = []
@@ -533,10 +876,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
             connection = connections[connection_index % len(connections)]
             connection_index += 1
 
-            task = self.eventbus_client.publish(
-                        connection.input_topic,
-                        message
-                    )
+            task = self._publish_input(connection, message)
 
             if fire_and_forget:
                 fire_and_forget_task(task)
@@ -559,7 +899,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
 
         connections = self.retrieve_connections(
             operation_name=operation_name,
-            input=Input.empty() if data is None else Input.from_message(type(data))
+            input=self._execution_input(operation_name, type(data))
         )
 
         plugin_identifiers: Set[str] = set()
@@ -567,11 +907,8 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         for connection in connections:
             plugin_identifiers.add(connection.remote_identifier)
 
-            task = self.eventbus_client.publish(
-                    connection.input_topic,
-                    data
-                )
-            
+            task = self._publish_input(connection, data)
+
             if fire_and_forget:
                 fire_and_forget_task(task)
             else:
@@ -584,22 +921,20 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
     
     async def execute_sending_any(self, operation_name: str, data: Optional[AvroMessageMixin] = None, fire_and_forget: bool = False) -> str:
         """
-        Execute the operation by its name, sending provided data to only one random compatible plugin.
+        Execute the operation by its name, sending provided data to only one random compatible plugin,
+        avoiding suspected ones (see `_choose_connection`).
 
         Return the plugin identifier the data has been sent to.
         """
 
-        connections = self.retrieve_connections(
+        connections = self._avoid_suspected(self.retrieve_connections(
             operation_name=operation_name,
-            input=Input.empty() if data is None else Input.from_message(type(data))
-        )
+            input=self._execution_input(operation_name, type(data))
+        ))
 
-        connection = random.choice(connections)
+        connection = self._choose_connection(connections)
 
-        task = self.eventbus_client.publish(
-            connection.input_topic,
-            data
-        )
+        task = self._publish_input(connection, data)
 
         if fire_and_forget:
             fire_and_forget_task(task)
@@ -616,7 +951,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         connections = self.retrieve_connections(
             operation_name=operation_name,
             remote_identifier=plugin_identifier,
-            input=Input.empty() if data is None else Input.from_message(type(data))
+            input=self._execution_input(operation_name, type(data))
         )
 
         if len(connections) == 0:
@@ -630,10 +965,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         if connection.remote_identifier != plugin_identifier:
             raise ValueError(f"connection found for operation {operation_name} does not match plugin {plugin_identifier}")
 
-        task = self.eventbus_client.publish(
-            connection.input_topic,
-            data
-        )
+        task = self._publish_input(connection, data)
 
         if fire_and_forget:
             fire_and_forget_task(task)
@@ -682,6 +1014,181 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
         
         raise ValueError("invalid mode specified")
 
+    async def call(self, operation_name: str, data: Optional[AvroMessageMixin] = None, *, plugin_identifier: Optional[str] = None,
+                   timeout: Optional[float] = None):
+        """
+        Execute the operation by its name sending data to only one compatible plugin (random, or plugin_identifier if provided),
+        then wait and return its result payload (sinks are not called for it).
+
+        If `result_cache` of operation requirement is set, result is looked up in cache before, and it is stored after arrival.
+
+        If `single_flight` of operation requirement is set, a call identical (same operation, plugin identifier and payload)
+        to an in-flight one is attached to it instead of being sent again (its outcome, exceptions included, is shared).
+        Timeout and cancellation of the in-flight call are not shared: attached calls call again within their own timeout.
+
+        TimeoutError is raised if result does not arrive within timeout (if provided),
+        ConnectionError if plugin is considered dead (and reaped) before result arrival.
+        """
+
+        requirement = self.operation_requirements[operation_name]
+        result_cache = requirement.result_cache
+
+        key: Optional[bytes] = None
+        if result_cache is not None or requirement.single_flight:
+            key = ResultCache.key_of(data)
+
+        if result_cache is not None:
+            hit, result = result_cache.get(key)
+
+            if hit:
+                return result
+
+        if not requirement.single_flight:
+            result = await self._call_plugin(operation_name, data, plugin_identifier, timeout)
+
+        else:
+            flight_key = (operation_name, plugin_identifier, key)
+
+            loop = asyncio.get_running_loop()
+            deadline: Optional[float] = None if timeout is None else loop.time() + timeout
+
+            attached = False
+            while (in_flight := self._in_flight_calls.get(flight_key)) is not None:
+                if not attached:
+                    self.coalesced_calls += 1
+                    attached = True
+
+                try:
+                    return await asyncio.wait_for(asyncio.shield(in_flight), self._remaining_time(deadline))
+
+                except asyncio.CancelledError:
+                    if not in_flight.cancelled() or asyncio.current_task().cancelling() > 0:
+                        raise
+
+                    # in-flight call was cancelled or timed out: call again within own timeout
+
+            in_flight = loop.create_future()
+            in_flight.add_done_callback(lambda future: future.cancelled() or future.exception())  # exception is retrieved
+            self._in_flight_calls[flight_key] = in_flight
+
+            try:
+                result = await self._call_plugin(operation_name, data, plugin_identifier, self._remaining_time(deadline))
+                in_flight.set_result(result)
+
+            except TimeoutError as e:
+                in_flight.cancel()      # timeout is not shared, attached calls have their own
+                raise e
+
+            except Exception as e:
+                in_flight.set_exception(e)
+                raise e
+
+            finally:
+                if not in_flight.done():
+                    in_flight.cancel()      # i.e. call was cancelled
+
+                if self._in_flight_calls.get(flight_key) is in_flight:
+                    del self._in_flight_calls[flight_key]
+
+        if result_cache is not None:
+            result_cache.put(key, result)
+
+        return result
+
+    @staticmethod
+    def _remaining_time(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+
+        return max(0.0, deadline - asyncio.get_running_loop().time())
+
+    async def _call_plugin(self, operation_name: str, data: Optional[AvroMessageMixin], plugin_identifier: Optional[str], timeout: Optional[float]):
+        connections = [
+            connection for connection in self.retrieve_connections(
+                operation_name=operation_name,
+                remote_identifier=plugin_identifier,
+                input=self._execution_input(operation_name, type(data))
+            )
+            if connection.has_output
+        ]
+
+        if len(connections) == 0:
+            raise ValueError(f"no connection with output found for operation {operation_name}")
+
+        connection = self._choose_connection(self._avoid_suspected(connections))
+        connection.touch()
+
+        call_identifier = rng.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending_calls[call_identifier] = future
+        self._pending_call_plugins[call_identifier] = connection.remote_identifier
+
+        try:
+            await self._publish_input(connection, data, headers={REPLY_TO_HEADER: call_identifier})
+
+            return await asyncio.wait_for(future, timeout)
+
+        finally:
+            self._pending_calls.pop(call_identifier, None)
+            self._pending_call_plugins.pop(call_identifier, None)
+
+    def _resolve_call(self, event: Event) -> bool:
+        """
+        Complete the call related to result event (if any), return True if event was a call result
+        """
+
+        if len(self._pending_calls) == 0:
+            return False
+
+        call_identifier = event_headers(event).get(REPLY_TO_HEADER)
+        if call_identifier is None:
+            return False
+
+        future = self._pending_calls.pop(call_identifier, None)
+        if future is None:
+            return False
+
+        if not future.done():
+            future.set_result(event.payload)
+
+        return True
+
+    async def execute_stream(self, operation_name: str, items: AsyncIterable[StreamItem], *, plugin_identifier: Optional[str] = None,
+                             credit_timeout: Optional[float] = None) -> str:
+        """
+        Execute a streaming operation by its name, sending items as ordered frames to only one compatible plugin
+        (random, or plugin_identifier if provided). Binary items are chunked (see `stream_chunk_size`).
+
+        Items are sent while plugin grants credits (see `stream_window`), therefore memory is bounded regardless of stream size.
+
+        Return the plugin identifier the stream has been sent to.
+        """
+
+        connections = [
+            connection for connection in self.retrieve_connections(operation_name=operation_name, remote_identifier=plugin_identifier)
+            if connection.input.streaming and connection.has_input
+        ]
+
+        if len(connections) == 0:
+            raise ValueError(f"no streaming connection found for operation {operation_name}")
+
+        connection = self._choose_connection(self._avoid_suspected(connections))
+        connection.touch()
+
+        if self.tracer is None:
+            await self._publish_stream(connection.input_topic, items, credit_timeout=credit_timeout)
+
+        else:
+            with self.tracer.span(
+                f"execute {connection.operation_name}",
+                kind=SpanKind.PRODUCER,
+                orbiter_identifier=self.identifier,
+                attributes={"topic": connection.input_topic, "plugin_identifier": connection.remote_identifier, "stream": True}
+            ) as span:
+                await self._publish_stream(connection.input_topic, items, headers=Tracer.inject(span), credit_timeout=credit_timeout)
+
+        return connection.remote_identifier
+
     async def sudo_execute(self, topic: str, data: Optional[AvroMessageMixin] = None):
         """
         Bypass all checks and send data to topic
@@ -697,7 +1204,7 @@ class Core(SinksProviderMixin, StateMachine[CoreState], Orbiter):
     async def _on_loop_iteration(self):
         self.update_compliant()
 
-        if self._last_discover_sent_at is None or (self._last_discover_sent_at + timedelta(seconds=self.discovering_interval)) < datetime.now():
+        if self._last_discover_sent_at is None or (self._last_discover_sent_at + timedelta(seconds=self.discovering_interval)) < clock.now():
             await self.send_discover_based_on_requirements()
 
     def __str__(self):
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from orbitalis.events.load import OperationLoad
+from orbitalis.utils import clock
+
+
+@dataclass(kw_only=True)
+class PluginLoadTable:
+    """
+    Last load reported by each plugin for each operation (see `OperationLoad`), fed by keepalive and offer messages.
+    It is used by cores to rank offers and to route executions
+
+    Author: Nicola Ricciardi
+    """
+
+    _loads: Dict[str, Dict[str, Tuple[OperationLoad, datetime]]] = field(default_factory=dict, init=False)     # plugin_identifier => { operation_name => (OperationLoad, reported_at) }
+
+    def __contains__(self, plugin_identifier: str) -> bool:
+        return plugin_identifier in self._loads
+
+    def __len__(self) -> int:
+        return len(self._loads)
+
+    def update(self, plugin_identifier: str, loads: Iterable[OperationLoad], *, when: Optional[datetime] = None):
+        if when is None:
+            when = clock.now()
+
+        of_plugin = self._loads.setdefault(plugin_identifier, {})
+
+        for load in loads:
+            of_plugin[load.name] = (load, when)
+
+    def get(self, plugin_identifier: str, operation_name: str, *, max_age: Optional[float] = None,
+            now: Optional[datetime] = None) -> Optional[OperationLoad]:
+        """
+        Return last load reported by plugin for operation, None if it is unknown or older than `max_age` seconds
+        """
+
+        entry = self._loads.get(plugin_identifier, {}).get(operation_name)
+
+        if entry is None:
+            return None
+
+        load, reported_at = entry
+
+        if max_age is not None:
+            if now is None:
+                now = clock.now()
+
+            if (now - reported_at).total_seconds() > max_age:
+                return None
+
+        return load
+
+    def reported_at(self, plugin_identifier: str, operation_name: str) -> Optional[datetime]:
+        entry = self._loads.get(plugin_identifier, {}).get(operation_name)
+
+        if entry is None:
+            return None
+
+        return entry[1]
+
+    def of_plugin(self, plugin_identifier: str) -> Dict[str, OperationLoad]:
+        return {operation_name: load for operation_name, (load, _) in self._loads.get(plugin_identifier, {}).items()}
+
+    def forget(self, plugin_identifier: str):
+        self._loads.pop(plugin_identifier, None)
+
+    def clear(self):
+        self._loads = dict()
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from orbitalis.events.offer import OfferedOperation
+
+
+@dataclass(frozen=True, kw_only=True)
+class OfferCandidate:
+    """
+    Offered operation collected by a core during an offer collection window, waiting to be selected or rejected
+
+    latency: seconds elapsed between last discover sent and offer arrival
+
+    Author: Nicola Ricciardi
+    """
+
+    plugin_identifier: str
+    reply_topic: str
+    offered_operation: OfferedOperation
+    latency: float
+
+    @property
+    def operation_name(self) -> str:
+        return self.offered_operation.name
+
+    @property
+    def free_slots(self) -> Optional[int]:
+        """
+        Free slots advertised by plugin, None if plugin has not a maximum
+        """
+
+        return self.offered_operation.free_slots
@@ -2,6 +2,9 @@ from dataclasses import dataclass, field
 from typing import Optional, List
 
 from busline.client.subscriber.event_handler.event_handler import EventHandler
+from orbitalis.core.cache import ResultCache
+from orbitalis.orbiter.compatibility import SchemaCompatibility
+from orbitalis.orbiter.compression import Compression
 from orbitalis.orbiter.schemaspec import Inputs, Outputs
 from orbitalis.utils.allowblocklist import AllowBlockListMixin
 
@@ -36,6 +39,14 @@ class Constraint(AllowBlockListMixin, Inputs, Outputs):
         if len(self.outputs) == 0:
             raise ValueError("Missed outputs")
 
+    @property
+    def uses_schema_resolution(self) -> bool:
+        """
+        True if some input or output is not exact, i.e. schemas must be resolved to check compatibility
+        """
+
+        return any(spec.compatibility != SchemaCompatibility.EXACT for spec in [*self.inputs, *self.outputs])
+
 
 @dataclass
 class OperationRequirement:
@@ -48,6 +59,9 @@ class OperationRequirement:
     constraint: Constraint
     override_sink: Optional[EventHandler] = field(default=None, kw_only=True)
     default_setup_data: Optional[bytes] = field(default=None, kw_only=True)
+    result_cache: Optional[ResultCache] = field(default=None, kw_only=True)     # opt-in, only for idempotent operations (see `Core.call`)
+    single_flight: bool = field(default=False, kw_only=True)    # opt-in, coalesce identical in-flight calls (see `Core.call`)
+    compression: Optional[Compression] = field(default=None, kw_only=True)     # opt-in, proposed to plugins on request
 
     @property
     def has_override_sink(self) -> bool:
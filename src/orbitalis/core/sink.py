@@ -1,38 +1,271 @@
+import asyncio
 import inspect
+import logging
 from dataclasses import dataclass, field
-from typing import Dict, Self, Any
+from typing import Dict, Self, Any, Set, Optional, List, Tuple, Callable, ClassVar
 
 from busline.client.subscriber.event_handler import event_handler
 from busline.client.subscriber.event_handler.event_handler import EventHandler
+from busline.event.event import Event
+from orbitalis.core.window import WindowedSink, default_window_value, DEFAULT_SKETCH_RELATIVE_ACCURACY
+from orbitalis.events.stream import StreamFrameMessage
+from orbitalis.orbiter.compression import decompress_event
+from orbitalis.orbiter.resolution import resolve_event
+from orbitalis.orbiter.stream import MessageStream, StreamError
+from orbitalis.utils.descriptors import collect_class_descriptors
+from orbitalis.utils.task import fire_and_forget_task
+
+
+@dataclass(kw_only=True)
+class SinkBatcher(EventHandler):
+    """
+    Event handler which accumulates events of an operation and calls handler with a batch, i.e. a list of (topic, event).
+    Batch is flushed when `batch_size` events are accumulated or `max_delay` seconds are elapsed since its first event.
+    Batches are delivered in order, one at a time.
+
+    Handler receives (operation_name, batch).
+
+    Author: Nicola Ricciardi
+    """
+
+    operation_name: str
+    handler: EventHandler
+    batch_size: int
+    max_delay: Optional[float] = field(default=None)
+    core: Optional[Any] = field(default=None)
+
+    _batch: List[Tuple[str, Event]] = field(default_factory=list, init=False)
+    _timer: Optional[asyncio.TimerHandle] = field(default=None, init=False)
+    _flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
+
+    def __post_init__(self):
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        if self.max_delay is not None and self.max_delay < 0:
+            raise ValueError("max_delay must be >= 0")
+
+    @property
+    def pending(self) -> int:
+        return len(self._batch)
+
+    async def handle(self, topic: str, event: Event):
+        self._batch.append((topic, event))
+
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+            return
+
+        if len(self._batch) == 1 and self.max_delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay,
+                lambda: fire_and_forget_task(self.__flush_on_timeout())
+            )
+
+    async def flush(self):
+        """
+        Call handler with accumulated events (if any)
+        """
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if len(self._batch) == 0:
+            return
+
+        batch, self._batch = self._batch, []
+
+        async with self._flush_lock:
+            invocation = self.handler.handle(self.operation_name, batch)
+
+            if self.core is not None:
+                invocation = self.core._profiled(f"sink {self.operation_name} batch", invocation)
+
+            await invocation
+
+    async def __flush_on_timeout(self):
+        try:
+            await self.flush()
+
+        except Exception as e:
+            logging.error("%s: batch of operation %s can not be handled: %s", self.core, self.operation_name, repr(e))
 
 
 @dataclass(kw_only=True)
 class _SinkDescriptor:
     operation_name: str
     func: Any
+    streaming: bool = field(default=False)
+    wrapper: Optional[Callable[[EventHandler, Any], EventHandler]] = field(default=None)     # (handler, core) => wrapping handler
 
     def __post_init__(self):
         self.func = event_handler(self.func)
 
+    def bind(self, instance):
+        """
+        Add sink to instance's sinks, unless a sink for the same operation was already provided
+        """
+
+        if self.operation_name not in instance.operation_sinks:
+            handler = self.func.__get__(instance, type(instance))
+
+            if self.wrapper is not None:
+                handler = self.wrapper(handler, instance)
+
+            instance.operation_sinks[self.operation_name] = handler
+
+            if self.streaming:
+                instance.streaming_sinks.add(self.operation_name)
+
     def __get__(self, instance, owner):
         if instance is None:
             return self
 
-        if self.operation_name not in instance.operation_sinks:
-            instance.operation_sinks[self.operation_name] = self.func.__get__(instance, owner)
-
         return self.func.__get__(instance, owner)
 
 
-def sink(operation_name: str):
+@dataclass(kw_only=True)
+class SinkEventHandler(EventHandler):
+    """
+    Event handler subscribed by cores on operation output topics.
+    It wraps sink in order to trace and profile its invocations.
+
+    Results related to a call (see `Core.call`) are returned to caller instead.
+
+    Result streams are reassembled: a streaming sink is invoked once per stream (in background) and it receives
+    the stream (async iterator of items) instead of the event, otherwise sink is invoked for each item.
+    Compressed payloads are decompressed.
+
+    Author: Nicola Ricciardi
+    """
+
+    core: Any
+    operation_name: str
+    handler: Optional[EventHandler]
+    streaming: bool = field(default=False)
+
+    async def handle(self, topic: str, event: Event):
+        event = resolve_event(decompress_event(event), self.core.schema_registry)
+
+        if self.core._resolve_call(event):
+            return
+
+        if self.handler is None:
+            return
+
+        if isinstance(event.payload, StreamFrameMessage):
+            stream = await self.core._feed_stream(event.payload, topic=topic)
+
+            if stream is not None:
+                if self.streaming:
+                    fire_and_forget_task(self._invoke(topic, event, stream))
+                else:
+                    fire_and_forget_task(self._invoke_for_each_item(topic, event, stream))
+
+            return
+
+        await self._invoke(topic, event, event)
+
+    async def _invoke_for_each_item(self, topic: str, event: Event, stream: MessageStream):
+        try:
+            async for item in stream:
+                item_event = Event(
+                    publisher_identifier=event.publisher_identifier,
+                    payload=item,
+                    identifier=event.identifier,
+                    timestamp=event.timestamp
+                )
+
+                await self._invoke(topic, item_event, item_event)
+
+        except StreamError as e:
+            logging.error("%s: result stream of operation %s aborted: %s", self.core, self.operation_name, repr(e))
+
+            if self.core.raise_exceptions:
+                raise e
+
+    async def _invoke(self, topic: str, event: Event, argument: Any):
+        tracer = self.core.tracer
+
+        invocation = self.core._profiled(f"sink {self.operation_name}", self.handler.handle(topic, argument))
+
+        if tracer is None:
+            await invocation
+            return
+
+        with tracer.consume(
+            f"sink {self.operation_name}",
+            event,
+            orbiter_identifier=self.core.identifier,
+            attributes={"topic": topic}
+        ):
+            await invocation
+
+
+def sink(operation_name: str, *, streaming: bool = False, batch_size: Optional[int] = None, max_delay: Optional[float] = None):
+    """
+    Transform a method in the sink of an operation.
+    If streaming, sink receives (topic, stream) where stream is an async iterator of result items
+    (it raises `StreamError` if plugin aborts the stream).
+    If batch_size is provided, sink receives (operation_name, batch) where batch is a list of (topic, event) (see `SinkBatcher`)
+    """
+
+    if batch_size is None and max_delay is not None:
+        raise ValueError("max_delay requires batch_size")
+
+    if batch_size is not None and streaming:
+        raise ValueError("a streaming sink can not be batched")
 
     def decorator(func):
         if not inspect.iscoroutinefunction(func):
             raise TypeError("Event handler must be async")
 
+        wrapper = None
+        if batch_size is not None:
+            wrapper = lambda handler, core: SinkBatcher(
+                operation_name=operation_name,
+                handler=handler,
+                batch_size=batch_size,
+                max_delay=max_delay,
+                core=core
+            )
+
         return _SinkDescriptor(
             func=func,
-            operation_name=operation_name
+            operation_name=operation_name,
+            streaming=streaming,
+            wrapper=wrapper
+        )
+
+    return decorator
+
+
+def windowed_sink(operation_name: str, *, size: float, slide: Optional[float] = None, value: Callable[[Event], float] = default_window_value,
+                  percentiles: Tuple[float, ...] = (), relative_accuracy: float = DEFAULT_SKETCH_RELATIVE_ACCURACY, group_by_plugin: bool = True):
+    """
+    Transform a method in a windowed sink of an operation: sink receives (operation_name, WindowAggregate) once per closed window
+    (see `WindowedSink`). By default, `event.payload.value` is aggregated
+    """
+
+    def decorator(func):
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError("Event handler must be async")
+
+        return _SinkDescriptor(
+            func=func,
+            operation_name=operation_name,
+            wrapper=lambda handler, core: WindowedSink(
+                operation_name=operation_name,
+                handler=handler,
+                size=size,
+                slide=slide,
+                value=value,
+                percentiles=percentiles,
+                relative_accuracy=relative_accuracy,
+                group_by_plugin=group_by_plugin,
+                core=core
+            )
         )
 
     return decorator
@@ -43,15 +276,58 @@ def sink(operation_name: str):
 @dataclass(kw_only=True)
 class SinksProviderMixin:
 
+    _sink_descriptors: ClassVar[Dict[str, _SinkDescriptor]] = {}    # attribute name => descriptor, collected once per class
+
     operation_sinks: Dict[str, EventHandler] = field(default_factory=dict, init=False)    # operation_name => EventHandler
+    streaming_sinks: Set[str] = field(default_factory=set, init=False)    # operation_name of sinks which receive result streams
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._sink_descriptors = collect_class_descriptors(cls, _SinkDescriptor)
 
     def __post_init__(self):
-        # used to refresh sinks
-        for attr_name in dir(self):
-            _ = getattr(self, attr_name)
+        for descriptor in self._sink_descriptors.values():
+            descriptor.bind(self)
+
+        if hasattr(super(), "__post_init__"):
+            super().__post_init__()
+
+    async def flush_sinks(self):
+        """
+        Flush events accumulated by batching sinks and close current windows of windowed sinks
+        """
 
-    def with_operation_sink(self, operation_name: str, handler: EventHandler) -> Self:
+        await asyncio.gather(*[
+            handler.flush() for handler in self.operation_sinks.values() if isinstance(handler, (SinkBatcher, WindowedSink))
+        ])
+
+    def with_windowed_sink(self, operation_name: str, handler: EventHandler, *, size: float, slide: Optional[float] = None,
+                           value: Callable[[Event], float] = default_window_value, percentiles: Tuple[float, ...] = (),
+                           relative_accuracy: float = DEFAULT_SKETCH_RELATIVE_ACCURACY, group_by_plugin: bool = True) -> Self:
+        """
+        Add a windowed sink (see `WindowedSink`), handler receives (operation_name, WindowAggregate)
+        """
+
+        return self.with_operation_sink(operation_name, WindowedSink(
+            operation_name=operation_name,
+            handler=handler,
+            size=size,
+            slide=slide,
+            value=value,
+            percentiles=percentiles,
+            relative_accuracy=relative_accuracy,
+            group_by_plugin=group_by_plugin,
+            core=self
+        ))
+
+    def with_operation_sink(self, operation_name: str, handler: EventHandler, *, streaming: bool = False) -> Self:
 
         self.operation_sinks[operation_name] = handler
 
+        if streaming:
+            self.streaming_sinks.add(operation_name)
+        else:
+            self.streaming_sinks.discard(operation_name)
+
         return self
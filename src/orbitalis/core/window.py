@@ -0,0 +1,372 @@
+import asyncio
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Callable, Any, Deque, Tuple, List
+
+from busline.client.subscriber.event_handler.event_handler import EventHandler
+from busline.event.event import Event
+from orbitalis.utils import clock
+from orbitalis.utils.task import fire_and_forget_task
+
+
+DEFAULT_SKETCH_RELATIVE_ACCURACY = 0.01
+DEFAULT_SKETCH_MAX_BUCKETS = 2048
+
+_MIN_INDEXABLE_VALUE = 1e-9
+
+
+@dataclass(kw_only=True)
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy guarantee (DDSketch-like): values are counted in logarithmic buckets,
+    so memory is bounded by `max_buckets` regardless of number of values (lowest buckets are collapsed if needed)
+
+    Author: Nicola Ricciardi
+    """
+
+    relative_accuracy: float = field(default=DEFAULT_SKETCH_RELATIVE_ACCURACY)
+    max_buckets: int = field(default=DEFAULT_SKETCH_MAX_BUCKETS)
+
+    count: int = field(default=0, init=False)
+    _zero_count: int = field(default=0, init=False)
+    _positive: Dict[int, int] = field(default_factory=dict, init=False)     # bucket key => count
+    _negative: Dict[int, int] = field(default_factory=dict, init=False)     # bucket key (of absolute value) => count
+    _gamma: float = field(init=False)
+    _log_gamma: float = field(init=False)
+
+    def __post_init__(self):
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, value: float):
+        if value > _MIN_INDEXABLE_VALUE:
+            buckets = self._positive
+            key = self._key(value)
+        elif value < -_MIN_INDEXABLE_VALUE:
+            buckets = self._negative
+            key = self._key(-value)
+        else:
+            self._zero_count += 1
+            self.count += 1
+            return
+
+        buckets[key] = buckets.get(key, 0) + 1
+        self.count += 1
+
+        if len(buckets) > self.max_buckets:
+            self._collapse(buckets)
+
+    def merge(self, other: "QuantileSketch"):
+        if other._gamma != self._gamma:
+            raise ValueError("sketches with different relative accuracy can not be merged")
+
+        for buckets, other_buckets in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+
+            if len(buckets) > self.max_buckets:
+                self._collapse(buckets)
+
+        self._zero_count += other._zero_count
+        self.count += other.count
+
+    def _collapse(self, buckets: Dict[int, int]):
+        """
+        Merge lowest buckets (i.e. values nearest to zero) until buckets are at most max_buckets
+        """
+
+        keys = sorted(buckets.keys())
+        exceeding = len(keys) - self.max_buckets
+        target = keys[exceeding]
+
+        for key in keys[:exceeding]:
+            buckets[target] += buckets.pop(key)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return approximated q-quantile (q in [0, 1]), None if sketch is empty
+        """
+
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        for key in sorted(self._negative.keys(), reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._value(key)
+
+        seen += self._zero_count
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self._positive.keys()):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._value(key)
+
+        return self._value(max(self._positive.keys()))
+
+
+@dataclass(kw_only=True)
+class RunningStatistics:
+    """
+    Incremental and mergeable aggregators: count, sum, min, max, mean and (optionally) quantiles
+
+    Author: Nicola Ricciardi
+    """
+
+    sketch: Optional[QuantileSketch] = field(default=None)
+
+    count: int = field(default=0, init=False)
+    sum: float = field(default=0.0, init=False)
+    min: Optional[float] = field(default=None, init=False)
+    max: Optional[float] = field(default=None, init=False)
+
+    @property
+    def mean(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+
+        return self.sum / self.count
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+    def merge(self, other: "RunningStatistics"):
+        if other.count == 0:
+            return
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+
+
+@dataclass(frozen=True, kw_only=True)
+class WindowAggregate:
+    """
+    Aggregated values of a closed window. plugin_identifier is None if window is not grouped by plugin
+
+    Author: Nicola Ricciardi
+    """
+
+    operation_name: str
+    plugin_identifier: Optional[str]
+    start: datetime
+    end: datetime
+    count: int
+    sum: float
+    min: float
+    max: float
+    mean: float
+    percentiles: Dict[float, float]
+
+
+def default_window_value(event: Event) -> float:
+    return event.payload.value
+
+
+@dataclass(kw_only=True)
+class WindowedSink(EventHandler):
+    """
+    Event handler which aggregates outputs of an operation over time windows, handler is called with (operation_name, WindowAggregate)
+    once per closed non-empty window (for each plugin, if group_by_plugin).
+
+    Windows are tumbling (slide is None) or sliding: a sliding window is made of `size / slide` panes,
+    each one aggregated incrementally, therefore memory is constant per window regardless of event rate.
+    Timers are scheduled only while windows contain values.
+
+    Author: Nicola Ricciardi
+    """
+
+    operation_name: str
+    handler: EventHandler
+    size: float
+    slide: Optional[float] = field(default=None)
+    value: Callable[[Event], float] = field(default=default_window_value)
+    percentiles: Tuple[float, ...] = field(default=())
+    relative_accuracy: float = field(default=DEFAULT_SKETCH_RELATIVE_ACCURACY)
+    group_by_plugin: bool = field(default=True)
+    core: Optional[Any] = field(default=None)
+
+    _panes: Dict[Optional[str], Deque[RunningStatistics]] = field(default_factory=dict, init=False)     # plugin_identifier => panes
+    _plugin_by_topic: Dict[str, str] = field(default_factory=dict, init=False)     # output_topic => plugin_identifier, only for registered connections
+    _timer: Optional[asyncio.TimerHandle] = field(default=None, init=False)
+    _panes_per_window: int = field(init=False)
+
+    def __post_init__(self):
+        if self.slide is None:
+            self.slide = self.size
+
+        if self.size <= 0 or self.slide <= 0:
+            raise ValueError("size and slide must be > 0")
+
+        self._panes_per_window = round(self.size / self.slide)
+
+        if self._panes_per_window < 1 or not math.isclose(self._panes_per_window * self.slide, self.size):
+            raise ValueError("size must be a multiple of slide")
+
+    @property
+    def is_sliding(self) -> bool:
+        return self._panes_per_window > 1
+
+    def _new_pane(self) -> RunningStatistics:
+        return RunningStatistics(
+            sketch=QuantileSketch(relative_accuracy=self.relative_accuracy) if len(self.percentiles) > 0 else None
+        )
+
+    def _plugin_identifier(self, topic: str) -> Optional[str]:
+        if not self.group_by_plugin or self.core is None:
+            return None
+
+        plugin_identifier = self._plugin_by_topic.get(topic)
+
+        if plugin_identifier is None:
+            connections = self.core.retrieve_connections(output_topic=topic)
+
+            # output can arrive before its connection is registered, misses are not cached
+            if len(connections) == 0:
+                return None
+
+            plugin_identifier = connections[0].remote_identifier
+            self._plugin_by_topic[topic] = plugin_identifier
+
+        return plugin_identifier
+
+    def forget_topic(self, topic: str):
+        """
+        Forget plugin related to output topic, called when its connection is closed
+        """
+
+        self._plugin_by_topic.pop(topic, None)
+
+    async def handle(self, topic: str, event: Event):
+        plugin_identifier = self._plugin_identifier(topic)
+
+        panes = self._panes.get(plugin_identifier)
+        if panes is None:
+            panes = deque([self._new_pane()], maxlen=self._panes_per_window)
+            self._panes[plugin_identifier] = panes
+
+        panes[-1].add(self.value(event))
+
+        if self._timer is None:
+            self._schedule()
+
+    def _schedule(self):
+        self._timer = asyncio.get_running_loop().call_later(
+            self.slide,
+            lambda: fire_and_forget_task(self.__on_pane_end())
+        )
+
+    def _aggregate(self, plugin_identifier: Optional[str], panes: Deque[RunningStatistics], end: datetime) -> Optional[WindowAggregate]:
+        window = self._new_pane()
+        for pane in panes:
+            window.merge(pane)
+
+        if window.count == 0:
+            return None
+
+        return WindowAggregate(
+            operation_name=self.operation_name,
+            plugin_identifier=plugin_identifier,
+            start=end - timedelta(seconds=self.size),
+            end=end,
+            count=window.count,
+            sum=window.sum,
+            min=window.min,
+            max=window.max,
+            mean=window.mean,
+            percentiles={q: window.sketch.quantile(q) for q in self.percentiles} if window.sketch is not None else {}
+        )
+
+    def _close_windows(self) -> List[WindowAggregate]:
+        """
+        Close current windows and slide them of a pane, groups which have no values anymore are discarded
+        """
+
+        end = clock.now()
+        aggregates: List[WindowAggregate] = []
+
+        for plugin_identifier in list(self._panes.keys()):
+            panes = self._panes[plugin_identifier]
+
+            aggregate = self._aggregate(plugin_identifier, panes, end)
+            if aggregate is not None:
+                aggregates.append(aggregate)
+
+            panes.append(self._new_pane())
+
+            if all(pane.count == 0 for pane in panes):
+                del self._panes[plugin_identifier]
+
+        return aggregates
+
+    async def _emit(self, aggregates: List[WindowAggregate]):
+        for aggregate in aggregates:
+            invocation = self.handler.handle(self.operation_name, aggregate)
+
+            if self.core is not None:
+                invocation = self.core._profiled(f"sink {self.operation_name} window", invocation)
+
+            await invocation
+
+    async def __on_pane_end(self):
+        self._timer = None
+
+        aggregates = self._close_windows()
+
+        if len(self._panes) > 0:
+            self._schedule()
+
+        try:
+            await self._emit(aggregates)
+
+        except Exception as e:
+            logging.error("%s: window of operation %s can not be handled: %s", self.core, self.operation_name, repr(e))
+
+    async def flush(self):
+        """
+        Close current (partial) windows and call handler, then windows are reset
+        """
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        end = clock.now()
+        aggregates = [
+            aggregate for aggregate in (self._aggregate(plugin_identifier, panes, end) for plugin_identifier, panes in self._panes.items())
+            if aggregate is not None
+        ]
+
+        self._panes.clear()
+
+        await self._emit(aggregates)
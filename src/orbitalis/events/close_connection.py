@@ -4,11 +4,11 @@ from typing import Optional, TypeVar, Generic
 from dataclasses_avroschema import AvroModel
 
 from busline.event.registry import add_to_registry
-from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.codec import CompactMessageMixin
 
 
 @dataclass(frozen=True, kw_only=True)
-class GracelessCloneConnectionMessage(AvroMessageMixin):
+class GracelessCloneConnectionMessage(CompactMessageMixin):
     """
     Orbiter A --- close ---> Orbiter B
 
@@ -23,7 +23,7 @@ class GracelessCloneConnectionMessage(AvroMessageMixin):
 
 
 @dataclass(frozen=True, kw_only=True)
-class GracefulCloseConnectionMessage(AvroMessageMixin):
+class GracefulCloseConnectionMessage(CompactMessageMixin):
     """
     Orbiter A --- close ---> Orbiter B
 
@@ -39,7 +39,7 @@ class GracefulCloseConnectionMessage(AvroMessageMixin):
 
 
 @dataclass(frozen=True, kw_only=True)
-class CloseConnectionAckMessage(AvroMessageMixin):
+class CloseConnectionAckMessage(CompactMessageMixin):
     """
     Orbiter A <--- close ack --- Orbiter B
 
@@ -0,0 +1,370 @@
+import dataclasses
+import struct
+import types
+import typing
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, Tuple, Self, Optional, Union
+
+from busline.event.message.avro_message import AvroMessageMixin
+from busline.event.message.number_message import Int64Message, Int32Message, Float64Message, Float32Message
+from busline.event.message.string_message import StringMessage
+from orbitalis.events.raw import RawMessage
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+from orbitalis.orbiter.schemaspec import SchemaSpec
+
+
+COMPACT_FORMAT_TYPE = "compact"
+
+_DOUBLE = struct.Struct(">d")
+_FINGERPRINT = struct.Struct(">q")
+
+_INLINE_SCHEMA = 0
+_KNOWN_SCHEMA = 1
+
+
+_known_schemas: Dict[int, str] = {}    # fingerprint => schema
+
+
+def register_known_schema(schema: str) -> int:
+    """
+    Register a schema known by every orbiter, which is referenced only by its fingerprint in compact messages.
+
+    Return its fingerprint
+    """
+
+    fingerprint = schema_fingerprint(schema)
+    _known_schemas[fingerprint] = schema
+
+    return fingerprint
+
+
+def known_schema(fingerprint: int) -> Optional[str]:
+    return _known_schemas.get(fingerprint)
+
+
+for _message_class in (Int64Message, Int32Message, Float64Message, Float32Message, StringMessage, RawMessage):
+    register_known_schema(_message_class.avro_schema())
+
+
+class _Writer:
+    """
+    Output buffer of compact encoding: repeated strings are written once, then referenced by index
+    """
+
+    __slots__ = ("buffer", "strings")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, value: int):
+        if value < 0:
+            raise ValueError(f"varint must be non-negative, got {value} (zig-zag encode signed values)")
+
+        while value > 0x7F:
+            self.buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+
+        self.buffer.append(value)
+
+    def string(self, value: str):
+        index = self.strings.get(value)
+
+        if index is not None:
+            self.varint((index << 1) | 1)
+            return
+
+        self.strings[value] = len(self.strings)
+
+        data = value.encode()
+        self.varint(len(data) << 1)
+        self.buffer += data
+
+
+class _Reader:
+
+    __slots__ = ("data", "position", "strings")
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+        self.strings: List[str] = []
+
+    def varint(self) -> int:
+        result = 0
+        shift = 0
+
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+
+            shift += 7
+
+    def take(self, size: int) -> memoryview:
+        if self.position + size > len(self.data):
+            raise ValueError("truncated compact message")
+
+        view = self.data[self.position:self.position + size]
+        self.position += size
+
+        return view
+
+    def string(self) -> str:
+        header = self.varint()
+
+        if header & 1:
+            return self.strings[header >> 1]
+
+        value = str(self.take(header >> 1), "utf-8")
+        self.strings.append(value)
+
+        return value
+
+
+Encoder = Callable[[_Writer, Any], None]
+Decoder = Callable[[_Reader], Any]
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _encode_int(writer: _Writer, value: int):
+    writer.varint(_zigzag(value))
+
+
+def _decode_int(reader: _Reader) -> int:
+    return _unzigzag(reader.varint())
+
+
+def _encode_float(writer: _Writer, value: float):
+    writer.buffer += _DOUBLE.pack(value)
+
+
+def _decode_float(reader: _Reader) -> float:
+    return _DOUBLE.unpack(reader.take(8))[0]
+
+
+def _encode_bool(writer: _Writer, value: bool):
+    writer.buffer.append(1 if value else 0)
+
+
+def _decode_bool(reader: _Reader) -> bool:
+    return reader.take(1)[0] == 1
+
+
+def _encode_bytes(writer: _Writer, value: bytes):
+    writer.varint(len(value))
+    writer.buffer += value
+
+
+def _decode_bytes(reader: _Reader) -> bytes:
+    return bytes(reader.take(reader.varint()))
+
+
+def _encode_fingerprint(writer: _Writer, fingerprint: int):
+    writer.buffer += _FINGERPRINT.pack(fingerprint)
+
+
+def _decode_fingerprint(reader: _Reader) -> int:
+    return _FINGERPRINT.unpack(reader.take(8))[0]
+
+
+def _encode_schema(writer: _Writer, schema: str):
+    fingerprint = schema_fingerprint(schema)
+
+    if fingerprint in _known_schemas:
+        writer.buffer.append(_KNOWN_SCHEMA)
+        _encode_fingerprint(writer, fingerprint)
+    else:
+        writer.buffer.append(_INLINE_SCHEMA)
+        writer.string(schema)
+
+
+def _decode_schema(reader: _Reader) -> str:
+    if reader.take(1)[0] == _INLINE_SCHEMA:
+        return reader.string()
+
+    fingerprint = _decode_fingerprint(reader)
+    schema = _known_schemas.get(fingerprint)
+
+    if schema is None:
+        raise ValueError(f"unknown schema fingerprint {fingerprint}")
+
+    return schema
+
+
+_PRIMITIVES: Dict[Any, Tuple[Encoder, Decoder]] = {
+    str: (_Writer.string, _Reader.string),
+    int: (_encode_int, _decode_int),
+    float: (_encode_float, _decode_float),
+    bool: (_encode_bool, _decode_bool),
+    bytes: (_encode_bytes, _decode_bytes),
+}
+
+
+def _list_codec(item: Tuple[Encoder, Decoder]) -> Tuple[Encoder, Decoder]:
+    encode_item, decode_item = item
+
+    def encode(writer: _Writer, values: List[Any]):
+        writer.varint(len(values))
+        for value in values:
+            encode_item(writer, value)
+
+    def decode(reader: _Reader) -> List[Any]:
+        return [decode_item(reader) for _ in range(reader.varint())]
+
+    return encode, decode
+
+
+def _codec_of(annotation: Any) -> Tuple[Encoder, Decoder]:
+    if annotation in _PRIMITIVES:
+        return _PRIMITIVES[annotation]
+
+    origin = typing.get_origin(annotation)
+    arguments = typing.get_args(annotation)
+
+    if origin is Union or origin is types.UnionType:     # Optional[X] or X | None
+        not_none = [argument for argument in arguments if argument is not type(None)]
+        if len(not_none) != 1:
+            raise TypeError(f"union {annotation} is not supported by compact codec")
+
+        encode_value, decode_value = _codec_of(not_none[0])
+
+        def encode_optional(writer: _Writer, value: Any):
+            if value is None:
+                writer.buffer.append(0)
+            else:
+                writer.buffer.append(1)
+                encode_value(writer, value)
+
+        def decode_optional(reader: _Reader) -> Any:
+            if reader.take(1)[0] == 0:
+                return None
+
+            return decode_value(reader)
+
+        return encode_optional, decode_optional
+
+    if origin is list:
+        return _list_codec(_codec_of(arguments[0]))
+
+    if origin is dict:
+        encode_key, decode_key = _codec_of(arguments[0])
+        encode_value, decode_value = _codec_of(arguments[1])
+
+        def encode_dict(writer: _Writer, values: Dict[Any, Any]):
+            writer.varint(len(values))
+            for key, value in values.items():
+                encode_key(writer, key)
+                encode_value(writer, value)
+
+        def decode_dict(reader: _Reader) -> Dict[Any, Any]:
+            return {decode_key(reader): decode_value(reader) for _ in range(reader.varint())}
+
+        return encode_dict, decode_dict
+
+    if dataclasses.is_dataclass(annotation):
+        return _record_codec(annotation)
+
+    raise TypeError(f"type {annotation} is not supported by compact codec")
+
+
+@lru_cache(maxsize=None)
+def _record_codec(cls: type) -> Tuple[Encoder, Decoder]:
+    """
+    Compile encoder and decoder of a dataclass: fields are written in declaration order, without names
+    """
+
+    hints = typing.get_type_hints(cls)
+
+    plan: List[Tuple[str, Encoder, Decoder]] = []
+    for f in dataclasses.fields(cls):
+        if not f.init:
+            continue
+
+        if issubclass(cls, SchemaSpec) and f.name == "schemas":
+            encode_field, decode_field = _list_codec((_encode_schema, _decode_schema))
+        elif issubclass(cls, SchemaSpec) and f.name == "schema_fingerprints":
+            encode_field, decode_field = _list_codec((_encode_fingerprint, _decode_fingerprint))
+        else:
+            encode_field, decode_field = _codec_of(hints[f.name])
+
+        plan.append((f.name, encode_field, decode_field))
+
+    if all(hints[name] is str for name, _, _ in plan):
+        return _fixed_strings_codec(cls, [name for name, _, _ in plan])
+
+    def encode(writer: _Writer, value: Any):
+        for name, encode_field, _ in plan:
+            encode_field(writer, getattr(value, name))
+
+    def decode(reader: _Reader) -> Any:
+        return cls(**{name: decode_field(reader) for name, _, decode_field in plan})
+
+    return encode, decode
+
+
+def _fixed_strings_codec(cls: type, names: List[str]) -> Tuple[Encoder, Decoder]:
+    """
+    Fast path for records made only of strings (e.g. keepalive and ack messages): length-prefixed UTF-8 strings, no string table
+    """
+
+    def encode(writer: _Writer, value: Any):
+        for name in names:
+            data = getattr(value, name).encode()
+            writer.varint(len(data))
+            writer.buffer += data
+
+    def decode(reader: _Reader) -> Any:
+        return cls(**{name: str(reader.take(reader.varint()), "utf-8") for name in names})
+
+    return encode, decode
+
+
+def encode_compact(message: Any) -> bytes:
+    writer = _Writer()
+    _record_codec(type(message))[0](writer, message)
+
+    return bytes(writer.buffer)
+
+
+def decode_compact(cls: type, data: bytes) -> Any:
+    reader = _Reader(data)
+    message = _record_codec(cls)[1](reader)
+
+    if reader.position != len(reader.data):
+        raise ValueError("trailing bytes in compact message")
+
+    return message
+
+
+class CompactMessageMixin(AvroMessageMixin):
+    """
+    Control-plane message which is serialized using compact binary encoding by default:
+    fields are written without names (varints, interned strings) and well-known schemas are referenced by fingerprint.
+    Avro format is still available explicitly.
+
+    Author: Nicola Ricciardi
+    """
+
+    def serialize(self, *, format_type: Optional[str] = None) -> Tuple[str, bytes]:
+        if format_type is None or format_type == COMPACT_FORMAT_TYPE:
+            return COMPACT_FORMAT_TYPE, encode_compact(self)
+
+        return AvroMessageMixin.serialize(self, format_type=format_type)
+
+    @classmethod
+    def deserialize(cls, format_type: str, serialized_data: bytes) -> Self:
+        if format_type == COMPACT_FORMAT_TYPE:
+            return decode_compact(cls, serialized_data)
+
+        return AvroMessageMixin.deserialize.__func__(cls, format_type, serialized_data)
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from busline.event.registry import add_to_registry
+from orbitalis.events.codec import CompactMessageMixin
+
+
+@add_to_registry
+@dataclass(frozen=True, kw_only=True)
+class CompressedMessage(CompactMessageMixin):
+    """
+    Sender --- compressed ---> Receiver
+
+    Envelope of an operation payload (input or result) published on a compressed connection, see `Compression`.
+    Codec is None if payload was not worth compressing, in which case data is the serialized payload
+
+    Author: Nicola Ricciardi
+    """
+
+    codec: Optional[str]
+    message_type: str
+    format_type: str
+    data: bytes
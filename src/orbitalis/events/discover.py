@@ -1,10 +1,10 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 from dataclasses_avroschema import AvroModel
 
 from busline.event.registry import add_to_registry
-from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.codec import CompactMessageMixin
 from orbitalis.core.requirement import Constraint
 from orbitalis.orbiter.schemaspec import Outputs, Inputs
 from orbitalis.utils.allowblocklist import AllowBlockListMixin
@@ -16,11 +16,15 @@ class DiscoverQuery(AllowBlockListMixin, Inputs, Outputs, AvroModel):
     operation_name: str
 
     @classmethod
-    def from_constraint(cls, operation_name: str, constraint: Constraint):
+    def from_constraint(cls, operation_name: str, constraint: Constraint, *, compacted: bool = False):
+        """
+        Build query from constraint, if compacted only schema fingerprints are provided (see `SchemaSpec.compacted`)
+        """
+
         return cls(
             operation_name=operation_name,
-            inputs=constraint.inputs,
-            outputs=constraint.outputs,
+            inputs=[input.compacted() for input in constraint.inputs] if compacted else constraint.inputs,
+            outputs=[output.compacted() for output in constraint.outputs] if compacted else constraint.outputs,
             allowlist=constraint.allowlist,
             blocklist=constraint.blocklist,
         )
@@ -28,7 +32,7 @@ class DiscoverQuery(AllowBlockListMixin, Inputs, Outputs, AvroModel):
 
 
 @dataclass(frozen=True)
-class DiscoverMessage(AvroMessageMixin):
+class DiscoverMessage(CompactMessageMixin):
     """
     Core --- discover ---> Plugin
 
@@ -44,3 +48,4 @@ class DiscoverMessage(AvroMessageMixin):
     core_keepalive_request_topic: str
     considered_dead_after: float
     queries: Dict[str, DiscoverQuery]   # operation_name => DiscoverQuery
+    schema_request_topic: Optional[str] = None     # topic to request schemas known only by fingerprint
@@ -1,11 +1,13 @@
 from dataclasses import dataclass
+from typing import List
 
-from busline.event.message.avro_message import AvroMessageMixin
 from busline.event.registry import add_to_registry
+from orbitalis.events.codec import CompactMessageMixin
+from orbitalis.events.load import OperationLoad
 
 
 @dataclass(frozen=True, kw_only=True)
-class KeepaliveRequestMessage(AvroMessageMixin):
+class KeepaliveRequestMessage(CompactMessageMixin):
     """
     Orbiter A --- keepalive_request ---> Orbiter B
 
@@ -19,7 +21,7 @@ class KeepaliveRequestMessage(AvroMessageMixin):
 
 
 @dataclass(frozen=True, kw_only=True)
-class KeepaliveMessage(AvroMessageMixin):
+class KeepaliveMessage(CompactMessageMixin):
     """
     Orbiter A <--- keepalive --- Orbiter B
 
@@ -28,4 +30,18 @@ class KeepaliveMessage(AvroMessageMixin):
     Author: Nicola Ricciardi
     """
 
-    from_identifier: str
\ No newline at end of file
+    from_identifier: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class LoadKeepaliveMessage(KeepaliveMessage):
+    """
+    Core <--- keepalive --- Plugin
+
+    Keepalive which piggybacks a load report of operations lent to receiver (see `OperationLoad`).
+    Plain keepalive is kept for other cases, in order to preserve its compact encoding
+
+    Author: Nicola Ricciardi
+    """
+
+    load: List[OperationLoad]
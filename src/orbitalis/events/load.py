@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from dataclasses_avroschema import AvroModel
+
+
+DEFAULT_LOAD_REPORT_INTERVAL = 5.0     # seconds, suggested plugin's load_report_interval when cores use load-aware routing
+DEFAULT_LOAD_REPORT_MAX_AGE = 3 * DEFAULT_LOAD_REPORT_INTERVAL     # seconds, i.e. up to two lost reports are tolerated
+
+
+@dataclass
+class OperationLoad(AvroModel):
+    """
+    Compact load report of a plugin's operation, shipped in keepalive and offer messages
+
+    in_flight: handler invocations in progress
+    queue_depth: inputs received, but not yet consumed by handler (i.e. items buffered in incoming streams)
+    p50, p99: handler duration percentiles (seconds) over recent invocations, None if there are no invocations
+    free_slots: slots still available for operation, None if plugin has not a maximum
+
+    Author: Nicola Ricciardi
+    """
+
+    name: str
+    in_flight: int = 0
+    queue_depth: int = 0
+    p50: Optional[float] = None
+    p99: Optional[float] = None
+    free_slots: Optional[int] = None
+
+    @property
+    def pressure(self) -> int:
+        """
+        Work currently assigned to operation, i.e. in flight invocations and queued inputs
+        """
+
+        return self.in_flight + self.queue_depth
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 from dataclasses_avroschema import AvroModel
 
 from busline.event.registry import add_to_registry
-from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.codec import CompactMessageMixin
+from orbitalis.events.load import OperationLoad
 from orbitalis.orbiter.schemaspec import Input, Output
 
 
@@ -13,9 +14,11 @@ class OfferedOperation(AvroModel):
     name: str
     input: Input
     output: Output
+    free_slots: Optional[int] = None   # slots still available for operation (offered one included), None if plugin has not a maximum
+    load: Optional[OperationLoad] = None
 
 @dataclass(frozen=True)
-class OfferMessage(AvroMessageMixin):
+class OfferMessage(CompactMessageMixin):
     """
 
     Plugin --- offer ---> Core
@@ -31,4 +34,5 @@ class OfferMessage(AvroMessageMixin):
     reply_topic: str
     considered_dead_after: float
     plugin_keepalive_topic: str
-    plugin_keepalive_request_topic: str
\ No newline at end of file
+    plugin_keepalive_request_topic: str
+    schema_request_topic: Optional[str] = None     # topic to request schemas known only by fingerprint
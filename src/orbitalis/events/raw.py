@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Self, Tuple, Optional
+
+from busline.event.message.avro_message import AvroMessageMixin, AVRO_FORMAT_TYPE
+from busline.event.message.message import BYTES_FORMAT_TYPE
+from busline.event.registry import add_to_registry
+
+
+@add_to_registry
+@dataclass(frozen=True, eq=False)
+class RawMessage(AvroMessageMixin):
+    """
+    Wrap a binary buffer (bytes, bytearray or memoryview) which travels without Avro re-encoding.
+
+    Bytes format (default) serializes buffer as is, deserialization returns a memoryview over received data,
+    therefore large payloads (e.g. images, model weights) are not copied by Orbitalis.
+
+    Raw messages are compared and hashed by identity (a writable memoryview is not hashable): compare `view` to compare content.
+
+    Author: Nicola Ricciardi
+    """
+
+    data: bytes
+
+    @property
+    def view(self) -> memoryview:
+        return memoryview(self.data)
+
+    def __len__(self) -> int:
+        return self.view.nbytes
+
+    def serialize(self, *, format_type: Optional[str] = None) -> Tuple[str, bytes]:
+        if format_type is None or format_type == BYTES_FORMAT_TYPE:
+            if isinstance(self.data, (bytes, bytearray)):
+                return BYTES_FORMAT_TYPE, self.data
+
+            return BYTES_FORMAT_TYPE, self.view.tobytes()
+
+        if format_type == AVRO_FORMAT_TYPE:
+            return AvroMessageMixin.serialize(RawMessage(bytes(self.data)))
+
+        raise ValueError("Not supported format type")
+
+    @classmethod
+    def deserialize(cls, format_type: str, serialized_data: bytes) -> Self:
+        if format_type is None or format_type == BYTES_FORMAT_TYPE:
+            return cls(memoryview(serialized_data))
+
+        if format_type == AVRO_FORMAT_TYPE:
+            return AvroMessageMixin.deserialize.__func__(cls, format_type, serialized_data)
+
+        raise ValueError("Not supported format type")
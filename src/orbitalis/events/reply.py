@@ -1,13 +1,13 @@
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, List
 
 from busline.event.registry import add_to_registry
-from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.codec import CompactMessageMixin
 
 
 @dataclass(frozen=True, kw_only=True)
-class RequestOperationMessage(AvroMessageMixin):
+class RequestOperationMessage(CompactMessageMixin):
     """
     Core --- request ---> Plugin
 
@@ -23,10 +23,13 @@ class RequestOperationMessage(AvroMessageMixin):
     output_topic: Optional[str]
     core_side_close_operation_connection_topic: str
     setup_data: Optional[bytes]
+    compression_codecs: List[str] = field(default_factory=list)     # proposed codecs, in preference order
+    compression_threshold: int = field(default=0)
+    schema_resolution: bool = field(default=False)     # True if payloads are tagged with their writer schema (see `SchemaTaggedMessage`)
 
 
 @dataclass(frozen=True, kw_only=True)
-class RejectOperationMessage(AvroMessageMixin):
+class RejectOperationMessage(CompactMessageMixin):
     """
     Core --- reject ---> Plugin
 
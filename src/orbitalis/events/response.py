@@ -1,13 +1,13 @@
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from busline.event.registry import add_to_registry
-from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.codec import CompactMessageMixin
 
 
 @dataclass(frozen=True, kw_only=True)
-class ConfirmConnectionMessage(AvroMessageMixin):
+class ConfirmConnectionMessage(CompactMessageMixin):
     """
     Plugin --- confirm connection ---> Core
 
@@ -20,10 +20,11 @@ class ConfirmConnectionMessage(AvroMessageMixin):
     operation_name: str
     operation_input_topic: Optional[str]
     plugin_side_close_operation_connection_topic: str
+    compression_codec: Optional[str] = field(default=None)     # chosen among proposed ones, None if payloads are not compressed
 
 
 @dataclass(frozen=True, kw_only=True)
-class OperationNoLongerAvailableMessage(AvroMessageMixin):
+class OperationNoLongerAvailableMessage(CompactMessageMixin):
     """
     Plugin --- operation no longer available ---> Core
 
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import List
+
+from orbitalis.events.codec import CompactMessageMixin
+
+
+@dataclass(frozen=True, kw_only=True)
+class SchemaRequestMessage(CompactMessageMixin):
+    """
+    Orbiter A --- schema_request ---> Orbiter B
+
+    Message sent to request schemas which are known only by their fingerprints
+
+    Author: Nicola Ricciardi
+    """
+
+    from_identifier: str
+    fingerprints: List[int]
+    response_topic: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class SchemaResponseMessage(CompactMessageMixin):
+    """
+    Orbiter A <--- schema_response --- Orbiter B
+
+    Message sent to provide requested schemas, unknown ones are omitted
+
+    Author: Nicola Ricciardi
+    """
+
+    from_identifier: str
+    schemas: List[str]
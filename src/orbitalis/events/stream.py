@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field, replace
+from typing import Optional, Tuple
+
+from busline.event.message.avro_message import AvroMessageMixin
+from busline.event.registry import add_to_registry
+from orbitalis.events.codec import CompactMessageMixin
+
+
+@add_to_registry
+@dataclass(frozen=True, kw_only=True)
+class StreamFrameMessage(AvroMessageMixin):
+    """
+    Sender --- stream_frame ---> Receiver
+
+    Ordered frame of a stream. Each frame carries one serialized item, last frame has `end` set (and no data).
+    If sender fails, last frame carries `error`.
+    First frame (sequence 0) carries `credit_topic`, i.e. where receiver grants new credits to sender,
+    and `window`, i.e. how many frames sender can have in flight (its initial credits).
+
+    Author: Nicola Ricciardi
+    """
+
+    stream_id: str
+    sequence: int
+    message_type: Optional[str] = field(default=None)
+    format_type: Optional[str] = field(default=None)
+    data: Optional[bytes] = field(default=None)
+    credit_topic: Optional[str] = field(default=None)
+    window: Optional[int] = field(default=None)
+    end: bool = field(default=False)
+    error: Optional[str] = field(default=None)
+
+    def serialize(self, *, format_type: Optional[str] = None) -> Tuple[str, bytes]:
+        if self.data is not None and not isinstance(self.data, bytes):
+            return AvroMessageMixin.serialize(replace(self, data=bytes(self.data)), format_type=format_type)
+
+        return AvroMessageMixin.serialize(self, format_type=format_type)
+
+
+@add_to_registry
+@dataclass(frozen=True, kw_only=True)
+class StreamCreditMessage(CompactMessageMixin):
+    """
+    Sender <--- stream_credit --- Receiver
+
+    Message sent by receiver to allow sender to send `credits` more frames
+
+    Author: Nicola Ricciardi
+    """
+
+    stream_id: str
+    credits: int
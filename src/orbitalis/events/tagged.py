@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+from busline.event.registry import add_to_registry
+from orbitalis.events.codec import CompactMessageMixin
+
+
+@add_to_registry
+@dataclass(frozen=True, kw_only=True)
+class SchemaTaggedMessage(CompactMessageMixin):
+    """
+    Sender --- tagged ---> Receiver
+
+    Envelope of an Avro operation payload (input or result) published on a connection which uses schema resolution:
+    fingerprint of writer schema travels with payload, so receiver can decode it using its own schema (see `SchemaCompatibility`)
+
+    Author: Nicola Ricciardi
+    """
+
+    message_type: str
+    writer_fingerprint: int
+    data: bytes
@@ -0,0 +1,241 @@
+import json
+from enum import StrEnum
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
+
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+
+
+SCHEMA_RESOLUTION_CACHE_SIZE = 4096
+
+
+class SchemaCompatibility(StrEnum):
+    """
+    How a schema of a spec can differ from the schema of the other one:
+
+    - EXACT: schemas must be equal
+    - BACKWARD: my schema can read data written using the other schema
+    - FORWARD: the other schema can read data written using my schema
+    - FULL: both BACKWARD and FORWARD
+
+    Payloads of connections negotiated using non-exact specs are decoded using their writer schema (see `SchemaTaggedMessage`)
+
+    Author: Nicola Ricciardi
+    """
+
+    EXACT = "EXACT"
+    BACKWARD = "BACKWARD"
+    FORWARD = "FORWARD"
+    FULL = "FULL"
+
+
+_PRIMITIVE_TYPES = {"null", "boolean", "int", "long", "float", "double", "bytes", "string"}
+
+_PROMOTIONS: Dict[str, Set[str]] = {    # writer type => reader types
+    "int": {"long", "float", "double"},
+    "long": {"float", "double"},
+    "float": {"double"},
+    "string": {"bytes"},
+    "bytes": {"string"},
+}
+
+_NAMED_TYPES = {"record", "error", "enum", "fixed"}
+
+
+def _full_name(name: str, namespace: Optional[str]) -> str:
+    if "." in name or not namespace:
+        return name
+
+    return f"{namespace}.{name}"
+
+
+def _short_name(name: str) -> str:
+    return name.rsplit(".", 1)[-1]
+
+
+def _collect_named_types(schema: Any, names: Dict[str, Any], namespace: Optional[str] = None):
+    """
+    Collect named types (records, enums, fixed) of schema, indexed both by full and short name
+    """
+
+    if isinstance(schema, list):
+        for branch in schema:
+            _collect_named_types(branch, names, namespace)
+        return
+
+    if not isinstance(schema, dict):
+        return
+
+    schema_type = schema.get("type")
+
+    if schema_type in _NAMED_TYPES and "name" in schema:
+        namespace = schema.get("namespace", namespace)
+        full_name = _full_name(schema["name"], namespace)
+        names[full_name] = schema
+        names.setdefault(_short_name(full_name), schema)
+        namespace = full_name.rpartition(".")[0] or namespace
+
+    if schema_type in ("record", "error"):
+        for f in schema.get("fields", []):
+            _collect_named_types(f.get("type"), names, namespace)
+
+    elif schema_type == "array":
+        _collect_named_types(schema.get("items"), names, namespace)
+
+    elif schema_type == "map":
+        _collect_named_types(schema.get("values"), names, namespace)
+
+    elif isinstance(schema_type, (dict, list)):
+        _collect_named_types(schema_type, names, namespace)
+
+
+class _Resolver:
+    """
+    Apply Avro schema resolution rules to check if data written using writer schema can be read using reader schema
+    """
+
+    def __init__(self, reader: Any, writer: Any):
+        self.reader_names: Dict[str, Any] = {}
+        self.writer_names: Dict[str, Any] = {}
+        _collect_named_types(reader, self.reader_names)
+        _collect_named_types(writer, self.writer_names)
+
+        self.in_progress: Set[Tuple[str, str]] = set()
+
+    @staticmethod
+    def _deref(schema: Any, names: Dict[str, Any]) -> Any:
+        # unwrap {"type": ...} which does not define a complex type (e.g. logical types)
+        while isinstance(schema, dict) and schema.get("type") not in _NAMED_TYPES | {"array", "map"}:
+            schema = schema.get("type")
+
+        if isinstance(schema, str) and schema not in _PRIMITIVE_TYPES:
+            return names.get(schema, names.get(_short_name(schema), schema))
+
+        return schema
+
+    @staticmethod
+    def _type_of(schema: Any) -> str:
+        if isinstance(schema, list):
+            return "union"
+
+        if isinstance(schema, str):
+            return schema
+
+        if isinstance(schema, dict):
+            return schema.get("type")
+
+        return "invalid"
+
+    def can_read(self, reader: Any, writer: Any) -> bool:
+        reader = self._deref(reader, self.reader_names)
+        writer = self._deref(writer, self.writer_names)
+
+        reader_type = self._type_of(reader)
+        writer_type = self._type_of(writer)
+
+        if writer_type == "union":
+            return all(self.can_read(reader, branch) for branch in writer)
+
+        if reader_type == "union":
+            return any(self.can_read(branch, writer) for branch in reader)
+
+        if reader_type in _PRIMITIVE_TYPES or writer_type in _PRIMITIVE_TYPES:
+            return reader_type == writer_type or reader_type in _PROMOTIONS.get(writer_type, ())
+
+        if reader_type != writer_type and {reader_type, writer_type} != {"record", "error"}:
+            return False
+
+        if reader_type == "array":
+            return self.can_read(reader.get("items"), writer.get("items"))
+
+        if reader_type == "map":
+            return self.can_read(reader.get("values"), writer.get("values"))
+
+        if not self._same_name(reader, writer):
+            return False
+
+        if reader_type == "fixed":
+            return reader.get("size") == writer.get("size")
+
+        if reader_type == "enum":
+            return "default" in reader or set(writer.get("symbols", [])).issubset(reader.get("symbols", []))
+
+        return self._can_read_record(reader, writer)
+
+    @staticmethod
+    def _same_name(reader: Dict, writer: Dict) -> bool:
+        writer_name = _short_name(writer.get("name", ""))
+        reader_names = {_short_name(reader.get("name", ""))} | {_short_name(alias) for alias in reader.get("aliases", [])}
+
+        return writer_name in reader_names
+
+    def _can_read_record(self, reader: Dict, writer: Dict) -> bool:
+        key = (reader.get("name", ""), writer.get("name", ""))
+
+        # recursive types: assume they are compatible while they are checked
+        if key in self.in_progress:
+            return True
+
+        self.in_progress.add(key)
+
+        try:
+            writer_fields = {f["name"]: f for f in writer.get("fields", [])}
+
+            for reader_field in reader.get("fields", []):
+                writer_field = writer_fields.get(reader_field["name"])
+
+                if writer_field is None:
+                    for alias in reader_field.get("aliases", []):
+                        writer_field = writer_fields.get(alias)
+                        if writer_field is not None:
+                            break
+
+                if writer_field is None:
+                    if "default" not in reader_field:
+                        return False
+
+                    continue
+
+                if not self.can_read(reader_field["type"], writer_field["type"]):
+                    return False
+
+            return True
+
+        finally:
+            self.in_progress.discard(key)
+
+
+@lru_cache(maxsize=SCHEMA_RESOLUTION_CACHE_SIZE)
+def can_read(reader_schema: str, writer_schema: str) -> bool:
+    """
+    Return True if data written using writer schema can be read using reader schema, according to Avro schema resolution.
+    Non-JSON schemas can read only themselves. Results are cached
+    """
+
+    if reader_schema == writer_schema:
+        return True
+
+    try:
+        reader = json.loads(reader_schema)
+        writer = json.loads(writer_schema)
+    except ValueError:
+        return False
+
+    return _Resolver(reader, writer).can_read(reader, writer)
+
+
+def schemas_are_compatible(my_schema: str, other_schema: str, compatibility: SchemaCompatibility) -> bool:
+    """
+    Check if other schema is compatible with my schema, given compatibility mode
+    """
+
+    if compatibility == SchemaCompatibility.BACKWARD:
+        return can_read(my_schema, other_schema)
+
+    if compatibility == SchemaCompatibility.FORWARD:
+        return can_read(other_schema, my_schema)
+
+    if compatibility == SchemaCompatibility.FULL:
+        return can_read(my_schema, other_schema) and can_read(other_schema, my_schema)
+
+    return schema_fingerprint(my_schema) == schema_fingerprint(other_schema)
@@ -0,0 +1,152 @@
+import lzma
+import zlib
+from dataclasses import dataclass, field, replace
+from enum import StrEnum
+from typing import Optional, List, Tuple
+
+from busline.event.event import Event
+from busline.event.message.message import Message
+from busline.event.registry import EventRegistry
+from orbitalis.events.compressed import CompressedMessage
+from orbitalis.utils.message import serialize_message
+
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+
+class CompressionCodec(StrEnum):
+    """
+    Compression codecs available in standard library
+
+    Author: Nicola Ricciardi
+    """
+
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+_COMPRESSORS = {
+    CompressionCodec.ZLIB: zlib.compress,
+    CompressionCodec.LZMA: lzma.compress,
+}
+
+_DECOMPRESSORS = {
+    CompressionCodec.ZLIB: zlib.decompress,
+    CompressionCodec.LZMA: lzma.decompress,
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class Compression:
+    """
+    Compression proposed by a core for the connections of an operation: codecs are in preference order,
+    plugin chooses the first one it supports. Only payloads of at least `threshold` bytes are compressed
+
+    Author: Nicola Ricciardi
+    """
+
+    codecs: Tuple[str, ...] = field(default=(CompressionCodec.ZLIB,))
+    threshold: int = field(default=DEFAULT_COMPRESSION_THRESHOLD)
+
+    def __post_init__(self):
+        if len(self.codecs) == 0:
+            raise ValueError("codecs must be provided")
+
+        for codec in self.codecs:
+            if codec not in _COMPRESSORS:
+                raise ValueError(f"unknown compression codec: {codec}")
+
+        if self.threshold < 0:
+            raise ValueError("threshold must be >= 0")
+
+
+def choose_compression_codec(proposed: List[str], supported: List[str]) -> Optional[str]:
+    """
+    Return first proposed codec which is supported, None if there is not
+    """
+
+    for codec in proposed:
+        if codec in supported and codec in _COMPRESSORS:
+            return codec
+
+    return None
+
+
+def register_message_type(message: Message) -> str:
+    """
+    Register class of message in event registry (so that it can be retrieved after decompression)
+    and return its message type
+    """
+
+    message_type = EventRegistry.obj_to_type(message)
+    EventRegistry().add(type(message), message_type=message_type)
+
+    return message_type
+
+
+def compress_message(message: Optional[Message], codec: str, threshold: int, *,
+                     message_type: Optional[str] = None) -> Optional[Message]:
+    """
+    Return message wrapped in a `CompressedMessage`. Payload is compressed if its serialized size is at least threshold
+    and compression is worth, otherwise serialized payload is wrapped as it is (codec is None), so that
+    message is serialized only once.
+
+    If message type is not provided, class of message is registered (see `register_message_type`)
+    """
+
+    if message is None:
+        return None
+
+    if message_type is None:
+        message_type = register_message_type(message)
+
+    format_type, data = serialize_message(message)
+
+    if len(data) >= threshold:
+        compressed = _COMPRESSORS[codec](data)
+
+        if len(compressed) < len(data):
+            return CompressedMessage(
+                codec=codec,
+                message_type=message_type,
+                format_type=format_type,
+                data=compressed
+            )
+
+    return CompressedMessage(
+        codec=None,
+        message_type=message_type,
+        format_type=format_type,
+        data=data
+    )
+
+
+def decompress_message(message: CompressedMessage) -> Message:
+    """
+    Return message wrapped in compressed message, ValueError is raised if its codec is unknown
+    """
+
+    data = message.data
+
+    if message.codec is not None:
+        decompressor = _DECOMPRESSORS.get(message.codec)
+
+        if decompressor is None:
+            raise ValueError(f"unknown compression codec: {message.codec}")
+
+        data = decompressor(data)
+
+    message_class = EventRegistry().retrieve_class(message.message_type)
+
+    return message_class.deserialize(message.format_type, data)
+
+
+def decompress_event(event: Event) -> Event:
+    """
+    Return event with decompressed payload if it is compressed, otherwise event is returned as it is
+    """
+
+    if not isinstance(event.payload, CompressedMessage):
+        return event
+
+    return replace(event, payload=decompress_message(event.payload))
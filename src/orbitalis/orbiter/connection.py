@@ -1,12 +1,24 @@
 import asyncio
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Self
+from typing import Optional, List, Self, Tuple, Type
 
+from busline.event.message.message import Message
+from orbitalis.orbiter.compression import compress_message, register_message_type
+from orbitalis.orbiter.resolution import tag_message, writer_fingerprint_of, SCHEMA_TAGGED_MESSAGE_TYPE
 from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.utils import clock
 
 
-@dataclass
+def intern_topic(topic: Optional[str]) -> Optional[str]:
+    if topic is None:
+        return None
+
+    return sys.intern(topic)
+
+
+@dataclass(slots=True)
 class Connection:
     """
     Orbiter2 uses this connection to execute related operation on Orbiter1.
@@ -17,6 +29,9 @@ class Connection:
     Orbiter (you) --- close_connection_to_remote_topic ---> Orbiter (remote)
     Orbiter (you) <--- close_connection_to_local_topic --- Orbiter (remote)
 
+    Connections are slotted and share identifiers, topics and input/output specs with the other connections,
+    because an orbiter can keep a lot of them. Lock is created on first use.
+
     Author: Nicola Ricciardi
     """
 
@@ -26,7 +41,7 @@ class Connection:
     incoming_close_connection_topic: str
     close_connection_to_remote_topic: str
 
-    lock: asyncio.Lock = field(default_factory=lambda: asyncio.Lock(), init=False)
+    _lock: Optional[asyncio.Lock] = field(default=None, init=False, repr=False, compare=False)
 
     input: Input
     output: Output
@@ -34,10 +49,33 @@ class Connection:
     input_topic: Optional[str] = field(default=None)
     output_topic: Optional[str] = field(default=None)
 
+    compression_codec: Optional[str] = field(default=None)
+    compression_threshold: int = field(default=0)
+    schema_resolution: bool = field(default=False)
+    _outgoing_message_type: Optional[Tuple[Type[Message], str, Optional[int]]] = field(default=None, init=False, repr=False, compare=False)
+
     soft_closed_at: Optional[datetime] = field(default=None, init=False)
-    created_at: datetime = field(default_factory=lambda: datetime.now())
+    created_at: datetime = field(default_factory=lambda: clock.now())
     last_use: Optional[datetime] = field(default=None)
 
+    def __post_init__(self):
+        self.operation_name = sys.intern(self.operation_name)
+        self.remote_identifier = sys.intern(self.remote_identifier)
+        self.incoming_close_connection_topic = intern_topic(self.incoming_close_connection_topic)
+        self.close_connection_to_remote_topic = intern_topic(self.close_connection_to_remote_topic)
+        self.input_topic = intern_topic(self.input_topic)
+        self.output_topic = intern_topic(self.output_topic)
+
+        self.input = self.input.interned()
+        self.output = self.output.interned()
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        return self._lock
+
     @property
     def is_soft_closed(self) -> bool:
         return self.soft_closed_at is not None
@@ -50,15 +88,48 @@ class Connection:
     def has_output(self) -> bool:
         return self.output_topic is not None
 
+    def prepare(self, message: Optional[Message]) -> Optional[Message]:
+        """
+        Return message as it must be published on this connection, i.e. tagged with its writer schema
+        if connection uses schema resolution (see `SchemaTaggedMessage`) and compressed if a codec was negotiated.
+        Message class is registered once, then it is registered again only if class of published messages changes
+        """
+
+        if message is None or (self.compression_codec is None and not self.schema_resolution):
+            return message
+
+        if self._outgoing_message_type is None or self._outgoing_message_type[0] is not type(message):
+            self._outgoing_message_type = (
+                type(message),
+                register_message_type(message),
+                writer_fingerprint_of(type(message)) if self.schema_resolution else None
+            )
+
+        _, message_type, writer_fingerprint = self._outgoing_message_type
+
+        if writer_fingerprint is not None:
+            message = tag_message(message, message_type, writer_fingerprint)
+            message_type = SCHEMA_TAGGED_MESSAGE_TYPE
+
+        if self.compression_codec is None:
+            return message
+
+        return compress_message(
+            message,
+            self.compression_codec,
+            self.compression_threshold,
+            message_type=message_type
+        )
+
     def touch(self):
         """
         Update last use
         """
-        self.last_use = datetime.now()
+        self.last_use = clock.now()
 
     def soft_close(self):
         if self.soft_closed_at is None:
-            self.soft_closed_at = datetime.now()
+            self.soft_closed_at = clock.now()
 
     def __str__(self):
-        return f"('{self.remote_identifier}', '{self.operation_name}')"
\ No newline at end of file
+        return f"('{self.remote_identifier}', '{self.operation_name}')"
@@ -0,0 +1,204 @@
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, Optional
+
+from orbitalis.utils import clock
+
+
+DEFAULT_PHI_WINDOW_SIZE = 100
+DEFAULT_PHI_MIN_SAMPLES = 3
+DEFAULT_PHI_MIN_STD = 0.5
+DEFAULT_PHI_ACCEPTABLE_PAUSE = 0.0
+DEFAULT_SUSPICION_THRESHOLD = 8.0
+
+MAX_PHI = 100.0
+
+
+@dataclass(kw_only=True)
+class ArrivalWindow:
+    """
+    Sliding window of inter-arrival times (in seconds) of messages sent by a remote orbiter.
+    Mean and variance are maintained incrementally.
+
+    Author: Nicola Ricciardi
+    """
+
+    size: int = field(default=DEFAULT_PHI_WINDOW_SIZE)
+    last_arrival: Optional[float] = field(default=None)
+
+    _intervals: Deque[float] = field(default_factory=deque, init=False)
+    _sum: float = field(default=0.0, init=False)
+    _squared_sum: float = field(default=0.0, init=False)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    @property
+    def mean(self) -> float:
+        if len(self._intervals) == 0:
+            return 0.0
+
+        return self._sum / len(self._intervals)
+
+    @property
+    def std(self) -> float:
+        if len(self._intervals) == 0:
+            return 0.0
+
+        mean = self.mean
+
+        return math.sqrt(max(0.0, self._squared_sum / len(self._intervals) - mean * mean))
+
+    @property
+    def successive_deviation(self) -> float:
+        """
+        Mean absolute difference between consecutive inter-arrival times (as RTP interarrival jitter):
+        unlike std, it is not inflated by a slow drift of sending period
+        """
+
+        if len(self._intervals) < 2:
+            return 0.0
+
+        intervals = iter(self._intervals)
+        previous = next(intervals)
+
+        total = 0.0
+        for interval in intervals:
+            total += abs(interval - previous)
+            previous = interval
+
+        return total / (len(self._intervals) - 1)
+
+    def add(self, arrival: float):
+        """
+        Record a new arrival, arrivals older than last one are ignored
+        """
+
+        if self.last_arrival is not None:
+            if arrival <= self.last_arrival:
+                return
+
+            interval = arrival - self.last_arrival
+
+            if len(self._intervals) >= self.size:
+                oldest = self._intervals.popleft()
+                self._sum -= oldest
+                self._squared_sum -= oldest * oldest
+
+            self._intervals.append(interval)
+            self._sum += interval
+            self._squared_sum += interval * interval
+
+        self.last_arrival = arrival
+
+
+def phi(elapsed: float, mean: float, std: float) -> float:
+    """
+    Suspicion level given time elapsed since last arrival, assuming inter-arrival times normally distributed.
+    Logistic approximation of normal CDF is used (as in Akka)
+    """
+
+    y = (elapsed - mean) / std
+
+    try:
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y))
+    except OverflowError:
+        return 0.0     # far earlier than expected
+
+    if elapsed > mean:
+        p = e / (1.0 + e)
+    else:
+        p = 1.0 - 1.0 / (1.0 + e)
+
+    if p <= 0.0:
+        return MAX_PHI
+
+    return min(MAX_PHI, -math.log10(p))
+
+
+@dataclass(kw_only=True)
+class PhiAccrualFailureDetector:
+    """
+    Phi accrual failure detector: instead of a boolean dead/alive verdict based on a fixed timeout,
+    it provides a suspicion level (phi) for each remote orbiter, based on the learnt distribution of its inter-arrival times.
+
+    phi = 1 means ~10% probability of wrong suspicion, phi = 2 ~1%, phi = 3 ~0.1% and so on.
+    phi is 0 until `min_samples` inter-arrival times are collected.
+
+    `min_std` prevents too high suspicion levels when arrivals are very regular,
+    `acceptable_pause` is added to the mean to tolerate known pauses (e.g. GC).
+
+    Author: Nicola Ricciardi
+    """
+
+    window_size: int = field(default=DEFAULT_PHI_WINDOW_SIZE)
+    min_samples: int = field(default=DEFAULT_PHI_MIN_SAMPLES)
+    min_std: float = field(default=DEFAULT_PHI_MIN_STD)
+    acceptable_pause: float = field(default=DEFAULT_PHI_ACCEPTABLE_PAUSE)
+
+    _windows: Dict[str, ArrivalWindow] = field(default_factory=dict, init=False)    # remote_identifier => ArrivalWindow
+
+    def __post_init__(self):
+        if self.window_size < 1:
+            raise ValueError("window_size must be >= 1")
+
+        if self.min_std <= 0:
+            raise ValueError("min_std must be > 0")
+
+    def __contains__(self, remote_identifier: str) -> bool:
+        return remote_identifier in self._windows
+
+    def window(self, remote_identifier: str) -> Optional[ArrivalWindow]:
+        return self._windows.get(remote_identifier)
+
+    def heartbeat(self, remote_identifier: str, when: datetime):
+        """
+        Record an arrival from remote orbiter
+        """
+
+        window = self._windows.get(remote_identifier)
+
+        if window is None:
+            window = ArrivalWindow(size=self.window_size)
+            self._windows[remote_identifier] = window
+
+        window.add(when.timestamp())
+
+    def phi(self, remote_identifier: str, *, now: Optional[datetime] = None) -> float:
+        """
+        Return current suspicion level of remote orbiter (0 if unknown or not enough samples)
+        """
+
+        window = self._windows.get(remote_identifier)
+
+        if window is None or window.last_arrival is None or len(window) < self.min_samples:
+            return 0.0
+
+        if now is None:
+            now = clock.now()
+
+        return phi(
+            now.timestamp() - window.last_arrival,
+            window.mean + self.acceptable_pause,
+            max(window.std, self.min_std)
+        )
+
+    def jitter(self, remote_identifier: str) -> float:
+        """
+        Return standard deviation of inter-arrival times of remote orbiter (0 if not enough samples)
+        """
+
+        window = self._windows.get(remote_identifier)
+
+        if window is None or len(window) < self.min_samples:
+            return 0.0
+
+        return window.std
+
+    def forget(self, remote_identifier: str):
+        self._windows.pop(remote_identifier, None)
+
+    def clear(self):
+        self._windows = dict()
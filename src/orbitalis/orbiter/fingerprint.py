@@ -0,0 +1,61 @@
+import json
+from functools import lru_cache
+from typing import List
+
+
+SCHEMA_FINGERPRINT_CACHE_SIZE = 4096
+
+_CRC_64_AVRO_EMPTY = 0xc15d213aa4d7a795
+
+
+def _build_crc_64_avro_table() -> List[int]:
+    table: List[int] = []
+
+    for i in range(256):
+        fingerprint = i
+        for _ in range(8):
+            fingerprint = (fingerprint >> 1) ^ (_CRC_64_AVRO_EMPTY & -(fingerprint & 1))
+
+        table.append(fingerprint)
+
+    return table
+
+
+_CRC_64_AVRO_TABLE = _build_crc_64_avro_table()
+
+
+def fingerprint64(data: bytes) -> int:
+    """
+    64-bit Rabin fingerprint (CRC-64-AVRO, as defined by Avro specification) of data,
+    returned as signed integer in order to fit in an Avro long
+    """
+
+    fingerprint = _CRC_64_AVRO_EMPTY
+    for byte in data:
+        fingerprint = (fingerprint >> 8) ^ _CRC_64_AVRO_TABLE[(fingerprint ^ byte) & 0xff]
+
+    if fingerprint >= (1 << 63):
+        fingerprint -= (1 << 64)
+
+    return fingerprint
+
+
+def normalize_schema(schema: str) -> str:
+    """
+    Return a normalized representation of schema: two schemas are equal iff their normalized representations are equal.
+    Non-JSON schemas are returned as they are
+    """
+
+    try:
+        return json.dumps(json.loads(schema), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return schema
+
+
+@lru_cache(maxsize=SCHEMA_FINGERPRINT_CACHE_SIZE)
+def schema_fingerprint(schema: str) -> int:
+    """
+    Fingerprint of normalized schema, results are cached
+    """
+
+    return fingerprint64(normalize_schema(schema).encode("utf-8"))
@@ -1,22 +1,34 @@
 import asyncio
+import heapq
 import logging
 from abc import ABC
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
-import uuid
+from typing import Dict, List, Optional, Set, Coroutine, AsyncIterable, Tuple
 
 from busline.client.pubsub_client import PubSubClient
 from busline.client.subscriber.event_handler import event_handler
+from busline.client.subscriber.event_handler.callback_event_handler import CallbackEventHandler
 from busline.event.event import Event
 from orbitalis.events.close_connection import GracefulCloseConnectionMessage, GracelessCloneConnectionMessage, \
     CloseConnectionAckMessage
-from orbitalis.events.keepalive import KeepaliveRequestMessage, KeepaliveMessage
+from orbitalis.events.keepalive import KeepaliveRequestMessage, KeepaliveMessage, LoadKeepaliveMessage
+from orbitalis.events.load import OperationLoad
+from orbitalis.events.schema import SchemaRequestMessage, SchemaResponseMessage
+from orbitalis.events.stream import StreamFrameMessage, StreamCreditMessage
 from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.failure_detector import PhiAccrualFailureDetector, DEFAULT_SUSPICION_THRESHOLD
 from orbitalis.orbiter.pending_request import PendingRequest
-from orbitalis.orbiter.schemaspec import Output, Input
+from orbitalis.orbiter.profiler import Profiler
+from orbitalis.orbiter.schema_registry import SchemaRegistry
+from orbitalis.orbiter.schemaspec import Output, Input, SchemaSpec
+from orbitalis.orbiter.stream import StreamReceiver, MessageStream, StreamCredits, StreamItem, split_stream_item, \
+    encode_stream_frame, DEFAULT_STREAM_WINDOW, DEFAULT_STREAM_CHUNK_SIZE, DEFAULT_STREAM_IDLE_TIMEOUT, StreamError
 from orbitalis.plugin.operation import Operation
+from orbitalis.tracing.tracer import Tracer
+from orbitalis.utils.event_headers import encode_event_identifier
+from orbitalis.utils import clock, rng
 
 DEFAULT_DISCOVER_TOPIC = "$handshake.discover"
 DEFAULT_LOOP_INTERVAL = 1
@@ -24,6 +36,9 @@ DEFAULT_PENDING_REQUESTS_EXPIRE_AFTER = 60.0
 DEFAULT_SEND_KEEPALIVE_BEFORE_TIMELIMIT = 10.0
 DEFAULT_CONSIDERED_DEAD_AFTER = 120.0
 DEFAULT_GRACEFUL_CLOSE_TIMEOUT = 300.0
+DEFAULT_SCHEMA_REQUEST_TIMEOUT = 10.0
+DEFAULT_KEEPALIVE_JITTER_MULTIPLIER = 3.0
+DEFAULT_MAX_KEEPALIVE_MARGIN_RATIO = 0.25
 
 
 @dataclass(kw_only=True)
@@ -38,7 +53,7 @@ class Orbiter(ABC):
 
     eventbus_client: PubSubClient
 
-    identifier: str = field(default_factory=lambda: str(uuid.uuid4()))
+    identifier: str = field(default_factory=lambda: str(rng.uuid4()))
 
     discover_topic: str = field(default=DEFAULT_DISCOVER_TOPIC)
     raise_exceptions: bool = field(default=False)
@@ -50,22 +65,46 @@ class Orbiter(ABC):
     consider_others_dead_after: Optional[float] = field(default=DEFAULT_CONSIDERED_DEAD_AFTER)
     send_keepalive_before_timelimit: float = field(default=DEFAULT_SEND_KEEPALIVE_BEFORE_TIMELIMIT)
     graceful_close_timeout: Optional[float] = field(default=DEFAULT_GRACEFUL_CLOSE_TIMEOUT)
+    with_dead_remotes_reaping: bool = field(default=True)     # close connections of dead remote orbiters in loop
+
+    failure_detector: PhiAccrualFailureDetector = field(default_factory=PhiAccrualFailureDetector)
+    suspicion_threshold: Optional[float] = field(default=DEFAULT_SUSPICION_THRESHOLD)     # None to never suspect
+    keepalive_jitter_multiplier: float = field(default=DEFAULT_KEEPALIVE_JITTER_MULTIPLIER)
+    max_keepalive_margin_ratio: float = field(default=DEFAULT_MAX_KEEPALIVE_MARGIN_RATIO)     # of remote dead time
 
     with_loop: bool = field(default=True)
 
+    tracer: Optional[Tracer] = field(default=None)
+    profiler: Optional[Profiler] = field(default=None)
+
+    stream_window: int = field(default=DEFAULT_STREAM_WINDOW)
+    stream_chunk_size: int = field(default=DEFAULT_STREAM_CHUNK_SIZE)
+    stream_idle_timeout: Optional[float] = field(default=DEFAULT_STREAM_IDLE_TIMEOUT)     # None to never abort idle incoming streams
+
+    schema_negotiation: bool = field(default=False)
+    schema_request_timeout: float = field(default=DEFAULT_SCHEMA_REQUEST_TIMEOUT)
+    schema_registry: SchemaRegistry = field(default_factory=SchemaRegistry)
+
     new_connection_added_event: asyncio.Event = field(default_factory=asyncio.Event, init=False)
 
     _others_considers_me_dead_after: Dict[str, float] = field(default_factory=dict, init=False)     # remote_identifier => time
     _remote_keepalive_request_topics: Dict[str, str] = field(default_factory=dict, init=False)   # remote_identifier => keepalive_request_topic
     _remote_keepalive_topics: Dict[str, str] = field(default_factory=dict, init=False)   # remote_identifier => keepalive_topic
+    _remote_schema_request_topics: Dict[str, str] = field(default_factory=dict, init=False)   # remote_identifier => schema_request_topic
     _last_seen: Dict[str, datetime] = field(default_factory=dict, init=False)   # remote_identifier => datetime
     _last_keepalive_sent: Dict[str, datetime] = field(default_factory=dict, init=False)   # remote_identifier => datetime
 
+    _dead_deadlines: List[Tuple[datetime, str]] = field(default_factory=list, init=False)    # heap of (deadline, remote_identifier)
+    _scheduled_dead_deadlines: Dict[str, datetime] = field(default_factory=dict, init=False)   # remote_identifier => deadline in heap
+
     _connections: Dict[str, Dict[str, Connection]] = field(default_factory=lambda: defaultdict(dict), init=False)    # remote_identifier => { operation_name => Connection }
     _pending_requests: Dict[str, Dict[str, PendingRequest]] = field(default_factory=lambda: defaultdict(dict), init=False)    # remote_identifier => { operation_name => PendingRequest }
 
     _unsubscribe_on_full_close_bucket: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set), init=False)
 
+    _stream_receiver: StreamReceiver = field(default_factory=StreamReceiver, init=False)
+    _outgoing_streams: Dict[str, Tuple[str, StreamCredits]] = field(default_factory=dict, init=False)    # stream_id => (topic, credits)
+
     _loop_task: Optional[asyncio.Task] = field(default=None, init=False)
 
     __stop_loop_controller: asyncio.Event = field(default_factory=lambda: asyncio.Event(), init=False)
@@ -74,6 +113,12 @@ class Orbiter(ABC):
     def __post_init__(self):
         if 0 > self.send_keepalive_before_timelimit:
             raise ValueError("send_keepalive_before_timelimit must be >= 0")
+
+        if 0 > self.keepalive_jitter_multiplier:
+            raise ValueError("keepalive_jitter_multiplier must be >= 0")
+
+        if not 0 < self.max_keepalive_margin_ratio <= 1:
+            raise ValueError("max_keepalive_margin_ratio must be in (0, 1]")
         
         self.new_connection_added_event.clear()
 
@@ -85,6 +130,10 @@ class Orbiter(ABC):
     def keepalive_topic(self) -> str:
         return f"$keepalive.{self.identifier}"
 
+    @property
+    def schema_request_topic(self) -> str:
+        return f"$schema.{self.identifier}.request"
+
     @property
     def _all_pending_requests(self) -> List[PendingRequest]:
 
@@ -111,7 +160,7 @@ class Orbiter(ABC):
             return []
 
         dead = []
-        now = datetime.now()
+        now = clock.now()
         for remote_identifier, last_seen in self._last_seen.items():
             if (last_seen + timedelta(seconds=self.consider_others_dead_after)) < now:
                 dead.append(remote_identifier)
@@ -163,6 +212,10 @@ class Orbiter(ABC):
             self.eventbus_client.subscribe(
                 self.keepalive_topic,
                 self.__keepalive_event_handler
+            ),
+            self.eventbus_client.subscribe(
+                self.schema_request_topic,
+                self.__schema_request_event_handler
             )
         )
 
@@ -198,6 +251,7 @@ class Orbiter(ABC):
                 self.eventbus_client.multi_unsubscribe([
                     self.keepalive_request_topic,
                     self.keepalive_topic,
+                    self.schema_request_topic,
                 ])
             )
         )
@@ -222,6 +276,133 @@ class Orbiter(ABC):
         Hook called after stopping
         """
 
+    def _profiled(self, name: str, coroutine: Coroutine) -> Coroutine:
+        """
+        Return a coroutine which measures given coroutine if profiler is set, otherwise given coroutine is returned
+        """
+
+        if self.profiler is None:
+            return coroutine
+
+        return self.profiler.measure(name, coroutine)
+
+    async def _publish(self, topic: str, data=None, *, headers: Optional[Dict[str, str]] = None):
+        """
+        Publish data on topic. If headers are provided, they are carried by event identifier
+        """
+
+        if headers is None or len(headers) == 0:
+            await self.eventbus_client.publish(topic, data)
+            return
+
+        await self.eventbus_client.publish(
+            topic,
+            data,
+            event_identifier=encode_event_identifier(headers),
+            event_timestamp=clock.now()
+        )
+
+    def _build_stream_credit_topic(self, stream_id: str) -> str:
+        return f"$stream.{self.identifier}.{stream_id}.credit"
+
+    async def _publish_stream(self, topic: str, items: AsyncIterable[StreamItem], *, headers: Optional[Dict[str, str]] = None,
+                              credit_timeout: Optional[float] = None) -> str:
+        """
+        Publish items on topic as ordered stream frames. At most `stream_window` frames are in flight,
+        then sender waits for credits granted by receiver (if credit_timeout expires, StreamError is raised).
+        Binary items are sliced in chunks of `stream_chunk_size` bytes.
+
+        If items iteration fails, an error frame is sent before re-raising exception.
+
+        Return stream identifier
+        """
+
+        stream_id = str(rng.uuid4())
+        credit_topic = self._build_stream_credit_topic(stream_id)
+        window = self.stream_window
+        credits = StreamCredits(available=window)
+
+        async def on_credit(topic: str, event: Event[StreamCreditMessage]):
+            credits.grant(event.payload.credits)
+
+        await self.eventbus_client.subscribe(credit_topic, CallbackEventHandler(on_credit))
+        self._outgoing_streams[stream_id] = (topic, credits)
+
+        sequence = 0
+        try:
+            try:
+                async for item in items:
+                    for message in split_stream_item(item, self.stream_chunk_size):
+                        await credits.acquire(credit_timeout)
+
+                        await self._publish(
+                            topic,
+                            encode_stream_frame(
+                                stream_id,
+                                sequence,
+                                message,
+                                credit_topic if sequence == 0 else None,
+                                window if sequence == 0 else None
+                            ),
+                            headers=headers
+                        )
+
+                        sequence += 1
+
+            except Exception as e:
+                await self._publish(topic, StreamFrameMessage(stream_id=stream_id, sequence=sequence, error=repr(e)), headers=headers)
+                raise e
+
+            await self._publish(
+                topic,
+                StreamFrameMessage(
+                    stream_id=stream_id,
+                    sequence=sequence,
+                    end=True,
+                    credit_topic=credit_topic if sequence == 0 else None,
+                    window=window if sequence == 0 else None
+                ),
+                headers=headers
+            )
+
+        finally:
+            self._outgoing_streams.pop(stream_id, None)
+            await self.eventbus_client.unsubscribe(credit_topic)
+
+        return stream_id
+
+    async def _feed_stream(self, frame: StreamFrameMessage, *, topic: Optional[str] = None) -> Optional[MessageStream]:
+        """
+        Feed an incoming stream frame arrived on topic, return a new stream if frame opens it
+        """
+
+        return await self._stream_receiver.feed(
+            frame,
+            buffer_size=self.stream_window,
+            publish=self.eventbus_client.publish,
+            topic=topic,
+            idle_timeout=self.stream_idle_timeout
+        )
+
+    def _abort_streams_of_connection(self, connection: Connection) -> int:
+        """
+        Abort open streams of connection (both incoming and outgoing ones), return the number of aborted streams
+        """
+
+        topics = [topic for topic in (connection.input_topic, connection.output_topic) if topic is not None]
+        error = StreamError(f"connection {connection} closed")
+
+        aborted = 0
+        for topic in topics:
+            aborted += self._stream_receiver.abort_topic(topic, error)
+
+        for topic, credits in self._outgoing_streams.values():
+            if topic in topics:
+                credits.abort(error)
+                aborted += 1
+
+        return aborted
+
     def _connections_by_remote_identifier(self, remote_identifier: str) -> Dict[str, Connection]:
         return self._connections[remote_identifier]
 
@@ -334,24 +515,30 @@ class Orbiter(ABC):
         Hook called before promotion
         """
 
-    def _promote_pending_request_to_connection(self, pending_request: PendingRequest):
+    def _promote_pending_request_to_connection(self, pending_request: PendingRequest) -> Optional[Connection]:
         """
-        Transform a pending request into a connection
+        Transform a pending request into a connection, return new connection (None if promotion fails)
         """
 
         try:
 
             self._on_promote_pending_request_to_connection(pending_request)
 
-            self._add_connection(pending_request.into_connection())
+            connection = pending_request.into_connection()
+
+            self._add_connection(connection)
             self._remove_pending_request(pending_request)
 
+            return connection
+
         except Exception as e:
             logging.error("%s: %s", self, repr(e))
 
             if self.raise_exceptions:
                 raise e
 
+        return None
+
     async def discard_expired_pending_requests(self) -> int:
         """
         Remove expired pending requests.
@@ -369,7 +556,7 @@ class Orbiter(ABC):
         discarded = 0
         for remote_identifier, of_operation in self._pending_requests.items():
             for operation_name, pending_request in of_operation.items():
-                if (pending_request.created_at + timedelta(seconds=self.pending_requests_expire_after)) < datetime.now():
+                if (pending_request.created_at + timedelta(seconds=self.pending_requests_expire_after)) < clock.now():
                     to_remove.append(pending_request)
 
         for pending_request in to_remove:
@@ -400,7 +587,7 @@ class Orbiter(ABC):
             for remote_identifier, of_operation in self._connections.items():
                 for operation_name, connection in of_operation.items():
                     expiration= connection.created_at + timedelta(seconds=self.close_connection_if_unused_after)
-                    if expiration < datetime.now():
+                    if expiration < clock.now():
                         to_close.append(connection)
 
             tasks = [
@@ -439,7 +626,7 @@ class Orbiter(ABC):
                         continue
 
                     expiration= connection.soft_closed_at + timedelta(seconds=self.graceful_close_timeout)
-                    if expiration < datetime.now():
+                    if expiration < clock.now():
                         to_close.append(connection)
 
             tasks = [
@@ -462,9 +649,10 @@ class Orbiter(ABC):
         return 0
 
     def update_acquaintances(self, remote_identifier: str,
-        *, keepalive_topic: str, keepalive_request_topic: str, consider_me_dead_after: float):
+        *, keepalive_topic: str, keepalive_request_topic: str, consider_me_dead_after: float,
+        schema_request_topic: Optional[str] = None):
         """
-        Update knowledge about keepalive request topics, keepalive topics and dead time
+        Update knowledge about keepalive request topics, keepalive topics, schema request topics and dead time
         """
 
         self._remote_keepalive_request_topics[remote_identifier] = keepalive_request_topic
@@ -473,18 +661,200 @@ class Orbiter(ABC):
 
         self._others_considers_me_dead_after[remote_identifier] = consider_me_dead_after
 
-    def have_seen(self, remote_identifier: str, *, when: Optional[datetime] = None):
+        if schema_request_topic is not None:
+            self._remote_schema_request_topics[remote_identifier] = schema_request_topic
+
+    def have_seen(self, remote_identifier: str, *, when: Optional[datetime] = None, keepalive: bool = False):
         """
-        Update last seen for remote orbiter
+        Update last seen for remote orbiter. Only keepalive arrivals feed `failure_detector` (i.e. suspicion level and keepalive margin),
+        because other messages (e.g. handshake bursts) do not follow keepalive period
         """
 
         if when is None:
-            when = datetime.now()
+            when = clock.now()
 
         self._last_seen[remote_identifier] = when
 
+        if keepalive:
+            self.failure_detector.heartbeat(remote_identifier, when)
+
+        if self.consider_others_dead_after is not None:
+            self._schedule_dead_deadline(remote_identifier, when + timedelta(seconds=self.consider_others_dead_after))
+
     def clear_last_seen(self):
         self._last_seen = dict()
+        self.failure_detector.clear()
+        self._dead_deadlines = []
+        self._scheduled_dead_deadlines = dict()
+
+    def suspicion_level(self, remote_identifier: str) -> float:
+        """
+        Return phi suspicion level of remote orbiter (see `failure_detector`), 0 if it is unknown
+        """
+
+        return self.failure_detector.phi(remote_identifier)
+
+    def is_suspected(self, remote_identifier: str) -> bool:
+        """
+        Return True if suspicion level of remote orbiter reached `suspicion_threshold`
+        """
+
+        if self.suspicion_threshold is None:
+            return False
+
+        return self.suspicion_level(remote_identifier) >= self.suspicion_threshold
+
+    @property
+    def suspected_remote_identifiers(self) -> List[str]:
+        return [remote_identifier for remote_identifier in self._last_seen.keys() if self.is_suspected(remote_identifier)]
+
+    def keepalive_jitter(self, remote_identifier: str) -> float:
+        """
+        Return mean absolute difference between consecutive inter-arrival times of keepalive sent by remote orbiter
+        (0 if not enough samples), see `ArrivalWindow.successive_deviation`
+        """
+
+        window = self.failure_detector.window(remote_identifier)
+
+        if window is None or len(window) < self.failure_detector.min_samples:
+            return 0.0
+
+        return window.successive_deviation
+
+    def keepalive_margin(self, remote_identifier: str) -> float:
+        """
+        Return how many seconds before remote orbiter considers this orbiter dead a keepalive must be sent.
+        `send_keepalive_before_timelimit` is widened by observed jitter of keepalive from remote orbiter
+        (same bus, same delays), but widening never exceeds `max_keepalive_margin_ratio` of remote dead time
+        and margin never exceeds remote dead time
+        """
+
+        margin = self.send_keepalive_before_timelimit + self.keepalive_jitter_multiplier * self.keepalive_jitter(remote_identifier)
+
+        considered_dead_after = self._others_considers_me_dead_after.get(remote_identifier)
+
+        if considered_dead_after is not None:
+            margin = min(margin, max(self.send_keepalive_before_timelimit, self.max_keepalive_margin_ratio * considered_dead_after))
+            margin = min(margin, considered_dead_after)
+
+        return margin
+
+    def _schedule_dead_deadline(self, remote_identifier: str, deadline: datetime):
+        """
+        Schedule a check of remote orbiter at deadline. Only the earliest check is kept in heap, because
+        when it is popped, it is re-scheduled based on last seen (therefore keepalive does not push anything)
+        """
+
+        scheduled = self._scheduled_dead_deadlines.get(remote_identifier)
+
+        if scheduled is not None and scheduled <= deadline:
+            return
+
+        self._scheduled_dead_deadlines[remote_identifier] = deadline
+        heapq.heappush(self._dead_deadlines, (deadline, remote_identifier))
+
+    def pop_dead_remote_identifiers(self) -> List[str]:
+        """
+        Return remote orbiters which are dead since last call, only expired deadlines are visited
+        """
+
+        if self.consider_others_dead_after is None:
+            return []
+
+        dead: List[str] = []
+        now = clock.now()
+
+        while len(self._dead_deadlines) > 0 and self._dead_deadlines[0][0] < now:
+            deadline, remote_identifier = heapq.heappop(self._dead_deadlines)
+
+            if self._scheduled_dead_deadlines.get(remote_identifier) != deadline:
+                continue    # stale entry
+
+            del self._scheduled_dead_deadlines[remote_identifier]
+
+            last_seen = self._last_seen.get(remote_identifier)
+
+            if last_seen is None:
+                continue
+
+            actual_deadline = last_seen + timedelta(seconds=self.consider_others_dead_after)
+
+            if actual_deadline < now:
+                dead.append(remote_identifier)
+            else:
+                self._schedule_dead_deadline(remote_identifier, actual_deadline)
+
+        return dead
+
+    async def _forget_remote(self, remote_identifier: str):
+        """
+        Purge every knowledge about remote orbiter (acquaintances, last seen and pending requests)
+        and abort open streams of its connections
+        """
+
+        for connection in self._connections.get(remote_identifier, {}).values():
+            self._abort_streams_of_connection(connection)
+
+        for pending_request in list(self._pending_requests.get(remote_identifier, {}).values()):
+            async with pending_request.lock:
+                try:
+                    self._remove_pending_request(pending_request)
+                except ValueError:
+                    logging.warning("%s: pending request %s was removed before forgetting remote", self, pending_request)
+
+        self._remote_keepalive_request_topics.pop(remote_identifier, None)
+        self._remote_keepalive_topics.pop(remote_identifier, None)
+        self._remote_schema_request_topics.pop(remote_identifier, None)
+        self._others_considers_me_dead_after.pop(remote_identifier, None)
+        self._last_seen.pop(remote_identifier, None)
+        self._last_keepalive_sent.pop(remote_identifier, None)
+        self._scheduled_dead_deadlines.pop(remote_identifier, None)
+        self._pending_requests.pop(remote_identifier, None)
+        self.failure_detector.forget(remote_identifier)
+
+    async def _on_dead_remotes_reaped(self, remote_identifiers: List[str]):
+        """
+        Hook called after connections of dead remote orbiters are closed
+        """
+
+    async def reap_dead_remotes(self) -> int:
+        """
+        Close all connections of dead remote orbiters at once and forget them.
+        Remote orbiters are notified using a graceless close, so a remote which is only unreachable for a while
+        does not keep stale connections
+
+        Return the number of reaped remote orbiters
+        """
+
+        try:
+            dead = self.pop_dead_remote_identifiers()
+
+            if len(dead) == 0:
+                return 0
+
+            logging.warning("%s: dead remote orbiters: %s", self, dead)
+
+            await asyncio.gather(*[
+                self.send_graceless_close_connection(remote_identifier, operation_name)
+                for remote_identifier in dead
+                for operation_name in list(self._connections_by_remote_identifier(remote_identifier).keys())
+            ])
+
+            for remote_identifier in dead:
+                await self._forget_remote(remote_identifier)
+                self._connections.pop(remote_identifier, None)
+
+            await self._on_dead_remotes_reaped(dead)
+
+            return len(dead)
+
+        except Exception as e:
+            logging.error("%s: %s", self, repr(e))
+
+            if self.raise_exceptions:
+                raise e
+
+        return 0
 
     async def _on_keepalive_request(self, from_identifier: str):
         """
@@ -498,7 +868,7 @@ class Orbiter(ABC):
 
             await self.eventbus_client.publish(
                 event.payload.keepalive_topic,
-                KeepaliveMessage(from_identifier=self.identifier)
+                self._build_keepalive_message(event.payload.from_identifier)
             )
         except Exception as e:
             logging.error("%s: %s", self, repr(e))
@@ -511,11 +881,126 @@ class Orbiter(ABC):
         Hook called on inbound keepalive
         """
 
+    async def _on_load_report(self, from_identifier: str, load: List[OperationLoad]):
+        """
+        Hook called when a keepalive carries a load report
+        """
+
     @event_handler
     async def __keepalive_event_handler(self, topic: str, event: Event[KeepaliveMessage]):
         await self._on_keepalive(event.payload.from_identifier)
 
-        self._last_seen[event.payload.from_identifier] = datetime.now()
+        self.have_seen(event.payload.from_identifier, keepalive=True)
+
+        if isinstance(event.payload, LoadKeepaliveMessage):
+            await self._on_load_report(event.payload.from_identifier, event.payload.load)
+
+    def _shipped_schema_spec(self, spec: SchemaSpec) -> SchemaSpec:
+        """
+        Return spec as it must be sent to other orbiters: only fingerprints are sent if schema negotiation is enabled
+        """
+
+        if not self.schema_negotiation:
+            return spec
+
+        return spec.compacted()
+
+    async def _on_schema_request(self, from_identifier: str, fingerprints: List[int]):
+        """
+        Hook called on schema request, before response
+        """
+
+    @event_handler
+    async def __schema_request_event_handler(self, topic: str, event: Event[SchemaRequestMessage]):
+        try:
+            await self._on_schema_request(event.payload.from_identifier, event.payload.fingerprints)
+
+            schemas: List[str] = []
+            for fingerprint in event.payload.fingerprints:
+                schema = self.schema_registry.get(fingerprint)
+
+                if schema is not None:
+                    schemas.append(schema)
+
+            await self.eventbus_client.publish(
+                event.payload.response_topic,
+                SchemaResponseMessage(from_identifier=self.identifier, schemas=schemas)
+            )
+
+        except Exception as e:
+            logging.error("%s: %s", self, repr(e))
+
+            if self.raise_exceptions:
+                raise e
+
+    async def fetch_schemas(self, remote_identifier: str, fingerprints: List[int]) -> List[int]:
+        """
+        Request to remote orbiter schemas which are not in local registry, then register them.
+        Nothing is sent if every schema is already known.
+
+        Return fingerprints which are still unknown
+        """
+
+        missing = self.schema_registry.missing(fingerprints)
+
+        if len(missing) == 0:
+            return missing
+
+        schema_request_topic = self._remote_schema_request_topics.get(remote_identifier)
+
+        if schema_request_topic is None:
+            logging.warning("%s: schema request topic not found for %s", self, remote_identifier)
+            return missing
+
+        response_topic = f"$schema.{self.identifier}.response.{rng.uuid4()}"
+        response: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        async def on_response(topic: str, event: Event[SchemaResponseMessage]):
+            if not response.done():
+                response.set_result(event.payload.schemas)
+
+        await self.eventbus_client.subscribe(response_topic, CallbackEventHandler(on_response))
+
+        try:
+            await self.eventbus_client.publish(
+                schema_request_topic,
+                SchemaRequestMessage(
+                    from_identifier=self.identifier,
+                    fingerprints=missing,
+                    response_topic=response_topic
+                )
+            )
+
+            for schema in await asyncio.wait_for(response, self.schema_request_timeout):
+                self.schema_registry.register(schema)
+
+        except asyncio.TimeoutError:
+            logging.warning("%s: schema request to %s timed out", self, remote_identifier)
+
+        finally:
+            await self.eventbus_client.unsubscribe(response_topic)
+
+        return self.schema_registry.missing(missing)
+
+    async def resolve_schema_spec(self, spec: SchemaSpec, remote_identifier: str) -> SchemaSpec:
+        """
+        Return a copy of spec (sent by remote orbiter) in which fingerprints are replaced by schemas.
+        Schemas not found in local registry are fetched from remote orbiter
+        """
+
+        if spec.is_resolved:
+            return spec
+
+        await self.fetch_schemas(remote_identifier, spec.schema_fingerprints)
+
+        return self.schema_registry.resolve(spec)
+
+    def _build_keepalive_message(self, remote_identifier: str) -> KeepaliveMessage:
+        """
+        Build keepalive message for remote orbiter
+        """
+
+        return KeepaliveMessage(from_identifier=self.identifier)
 
     async def send_keepalive(self, remote_identifier: str):
 
@@ -524,12 +1009,10 @@ class Orbiter(ABC):
 
         await self.eventbus_client.publish(
             self._remote_keepalive_topics[remote_identifier],
-            KeepaliveMessage(
-                from_identifier=self.identifier
-            )
+            self._build_keepalive_message(remote_identifier)
         )
 
-        self._last_keepalive_sent[remote_identifier] = datetime.now()
+        self._last_keepalive_sent[remote_identifier] = clock.now()
 
     async def send_keepalive_request(self, *, keepalive_request_topic: Optional[str] = None, remote_identifier: Optional[str] = None):
 
@@ -564,7 +1047,7 @@ class Orbiter(ABC):
     async def send_keepalive_based_on_connections_and_threshold(self):
         """
         Send keepalive messages to all remote orbiters which have a connection with this orbiter only if
-        send_keepalive_before_timelimit seconds away from being considered dead this orbiter
+        `keepalive_margin` seconds away from being considered dead this orbiter
         """
 
         tasks = []
@@ -584,13 +1067,13 @@ class Orbiter(ABC):
             considered_dead_at: datetime = self._last_keepalive_sent[remote_identifier] + timedelta(
                 seconds=self._others_considers_me_dead_after[remote_identifier])
 
-            if (considered_dead_at - datetime.now()).seconds < 0:
+            if (considered_dead_at - clock.now()).total_seconds() < 0:
                 logging.warning("%s: %s could be flag me as dead, anyway keepalive will be sent", self, remote_identifier)
 
             assert 0 <= self.send_keepalive_before_timelimit, "send_keepalive_threshold_multiplier must be >= 0"
 
             if remote_identifier not in self._last_keepalive_sent \
-                    or (considered_dead_at - datetime.now()).seconds < self.send_keepalive_before_timelimit:
+                    or (considered_dead_at - clock.now()).total_seconds() < self.keepalive_margin(remote_identifier):
                 tasks.append(
                     self.send_keepalive(remote_identifier)
                 )
@@ -651,6 +1134,8 @@ class Orbiter(ABC):
         async with connection.lock:
             connection = self._remove_connection(connection)
 
+        self._abort_streams_of_connection(connection)
+
         await self._on_close_connection(connection)
 
         close_incoming_close_connection_task = self.eventbus_client.unsubscribe(connection.incoming_close_connection_topic)
@@ -817,25 +1302,35 @@ class Orbiter(ABC):
 
         await self._on_loop_start()
 
+        loop = asyncio.get_running_loop()
+
         while not self.__stop_loop_controller.is_set():
 
+            sleep_started_at = loop.time()
+
             await asyncio.sleep(self.loop_interval)
 
+            if self.profiler is not None:
+                self.profiler.record_loop_lag(loop.time() - sleep_started_at - self.loop_interval)
+
             if self.__pause_loop_controller.is_set():
                 continue
 
             try:
-                await self._on_new_loop_iteration()
+                await self._profiled("loop._on_new_loop_iteration", self._on_new_loop_iteration())
+
+                if self.with_dead_remotes_reaping:
+                    await self._profiled("loop.reap_dead_remotes", self.reap_dead_remotes())
 
                 await asyncio.gather(
-                    self._on_loop_iteration(),
-                    self.close_unused_connections(),
-                    self.discard_expired_pending_requests(),
-                    self.force_close_connection_for_out_to_timeout_pending_graceful_close_connection(),
-                    self.send_keepalive_based_on_connections_and_threshold(),
+                    self._profiled("loop._on_loop_iteration", self._on_loop_iteration()),
+                    self._profiled("loop.close_unused_connections", self.close_unused_connections()),
+                    self._profiled("loop.discard_expired_pending_requests", self.discard_expired_pending_requests()),
+                    self._profiled("loop.force_close_connection_for_out_to_timeout_pending_graceful_close_connection", self.force_close_connection_for_out_to_timeout_pending_graceful_close_connection()),
+                    self._profiled("loop.send_keepalive_based_on_connections_and_threshold", self.send_keepalive_based_on_connections_and_threshold()),
                 )
 
-                await self._on_loop_iteration_end()
+                await self._profiled("loop._on_loop_iteration_end", self._on_loop_iteration_end())
 
             except Exception as e:
 
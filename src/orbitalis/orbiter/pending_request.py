@@ -1,18 +1,20 @@
 import asyncio
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List
 from orbitalis.orbiter.connection import Connection
 from orbitalis.orbiter.schemaspec import SchemaSpec, Input, Output
+from orbitalis.utils import clock
 
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingRequest:
     operation_name: str
     remote_identifier: str
 
-    lock: asyncio.Lock = field(default_factory=lambda: asyncio.Lock(), init=False)
+    _lock: Optional[asyncio.Lock] = field(default=None, init=False, repr=False, compare=False)
 
     input: Optional[Input] = field(default=None)
     output: Optional[Output] = field(default=None)
@@ -21,8 +23,22 @@ class PendingRequest:
     incoming_close_connection_topic: Optional[str] = field(default=None, kw_only=True)
     close_connection_to_remote_topic: Optional[str] = field(default=None, kw_only=True)
     output_topic: Optional[str] = field(default=None, kw_only=True)
+    compression_codec: Optional[str] = field(default=None, kw_only=True)
+    compression_threshold: int = field(default=0, kw_only=True)
+    schema_resolution: bool = field(default=False, kw_only=True)
 
-    created_at: datetime = field(default_factory=lambda: datetime.now(), init=False)
+    created_at: datetime = field(default_factory=lambda: clock.now(), init=False)
+
+    def __post_init__(self):
+        self.operation_name = sys.intern(self.operation_name)
+        self.remote_identifier = sys.intern(self.remote_identifier)
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        return self._lock
 
     def into_connection(self) -> Connection:
 
@@ -51,4 +67,7 @@ class PendingRequest:
             output=self.output,
             incoming_close_connection_topic=self.incoming_close_connection_topic,
             close_connection_to_remote_topic=self.close_connection_to_remote_topic,
+            compression_codec=self.compression_codec,
+            compression_threshold=self.compression_threshold,
+            schema_resolution=self.schema_resolution,
         )
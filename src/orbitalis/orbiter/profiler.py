@@ -0,0 +1,238 @@
+import asyncio
+import linecache
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Deque, Awaitable, TypeVar, Any, Tuple
+
+
+T = TypeVar("T")
+
+DEFAULT_SLOW_THRESHOLD = 0.1
+DEFAULT_MAX_SLOW_INVOCATIONS = 100
+DEFAULT_STACK_LIMIT = 20
+
+
+@dataclass
+class DurationStatistics:
+    """
+    Aggregated durations (in seconds) of a measured phase
+
+    Author: Nicola Ricciardi
+    """
+
+    count: int = field(default=0)
+    total: float = field(default=0.0)
+    maximum: float = field(default=0.0)
+    last: float = field(default=0.0)
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+
+        return self.total / self.count
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.last = duration
+
+        if duration > self.maximum:
+            self.maximum = duration
+
+
+@dataclass(kw_only=True)
+class SlowInvocation:
+    """
+    Invocation which exceeded profiler's threshold.
+    `stack` is captured while invocation was still running (empty if it never released the event loop),
+    instead `location` is where measured coroutine is defined.
+
+    Author: Nicola Ricciardi
+    """
+
+    name: str
+    duration: float
+    threshold: float
+    location: Optional[str]
+    stack: str
+    when: datetime = field(default_factory=lambda: datetime.now())
+
+
+@dataclass(kw_only=True)
+class Profiler:
+    """
+    Measure loop phases and event handler invocations, flag slow invocations and track asyncio loop lag.
+
+    Loop lag is how much later than expected the orbiter's loop wakes up from its sleep,
+    i.e. how long the event loop was blocked by other coroutines.
+
+    Stacks of slow invocations are captured by a single watchdog timer, armed only while invocations are running
+    (instead of a timer for each invocation).
+
+    Author: Nicola Ricciardi
+    """
+
+    slow_threshold: float = field(default=DEFAULT_SLOW_THRESHOLD)
+    capture_stack: bool = field(default=True)
+    stack_limit: int = field(default=DEFAULT_STACK_LIMIT)
+    max_slow_invocations: int = field(default=DEFAULT_MAX_SLOW_INVOCATIONS)
+
+    phases: Dict[str, DurationStatistics] = field(default_factory=dict, init=False)
+    loop_lag: DurationStatistics = field(default_factory=DurationStatistics, init=False)
+    slow_invocations: Deque[SlowInvocation] = field(default=None, init=False)
+
+    _running: Dict[int, Tuple[asyncio.Task, float, List[str]]] = field(default_factory=dict, init=False)    # invocation => (task, started_at, stack)
+    _next_invocation: int = field(default=0, init=False)
+    _watchdog: Optional[asyncio.TimerHandle] = field(default=None, init=False)
+    _watchdog_loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False)
+
+    def __post_init__(self):
+        if self.slow_threshold < 0:
+            raise ValueError("slow_threshold must be >= 0")
+
+        self.slow_invocations = deque(maxlen=self.max_slow_invocations)
+
+    def _snapshot_stack(self, task: asyncio.Task, into: List[str]):
+        """
+        Format the chain of awaited coroutines in which task is suspended (outermost first)
+        """
+
+        if task.done():
+            return
+
+        lines: List[str] = []
+        awaitable = task.get_coro()
+        while awaitable is not None and len(lines) < self.stack_limit:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+
+            if frame is None:
+                break
+
+            lines.append(f'  File "{frame.f_code.co_filename}", line {frame.f_lineno}, in {frame.f_code.co_name}\n')
+
+            source_line = linecache.getline(frame.f_code.co_filename, frame.f_lineno).strip()
+            if source_line:
+                lines.append(f"    {source_line}\n")
+
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+        into.append("".join(lines))
+
+    def _arm_watchdog(self, loop: asyncio.AbstractEventLoop, delay: float):
+        self._watchdog = loop.call_later(delay, self._watch, loop)
+        self._watchdog_loop = loop
+
+    def _watch(self, loop: asyncio.AbstractEventLoop):
+        """
+        Capture stacks of running invocations which exceeded threshold (once each), then re-arm if invocations are still running
+        """
+
+        self._watchdog = None
+
+        if len(self._running) == 0:
+            return
+
+        now = loop.time()
+        next_check = self.slow_threshold
+        for task, started_at, stack in self._running.values():
+            elapsed = now - started_at
+
+            if elapsed >= self.slow_threshold:
+                if len(stack) == 0:
+                    self._snapshot_stack(task, stack)
+            else:
+                next_check = min(next_check, self.slow_threshold - elapsed)
+
+        self._arm_watchdog(loop, next_check)
+
+    @classmethod
+    def _location_of(cls, awaitable: Any) -> Optional[str]:
+        code = getattr(awaitable, "cr_code", None)
+
+        if code is None:
+            return None
+
+        return f"{code.co_filename}:{code.co_firstlineno} ({code.co_qualname})"
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        """
+        Await awaitable measuring its duration. If it takes more than `slow_threshold`, it is flagged as slow
+        """
+
+        task = asyncio.current_task()
+        location = self._location_of(awaitable)
+
+        stack: List[str] = []
+        invocation: Optional[int] = None
+        if self.capture_stack and task is not None:
+            loop = asyncio.get_running_loop()
+
+            invocation = self._next_invocation
+            self._next_invocation += 1
+            self._running[invocation] = (task, loop.time(), stack)
+
+            if self._watchdog is None or self._watchdog_loop is not loop:
+                self._arm_watchdog(loop, self.slow_threshold)
+
+        started_at = time.perf_counter()
+
+        try:
+            return await awaitable
+
+        finally:
+            duration = time.perf_counter() - started_at
+
+            if invocation is not None:
+                self._running.pop(invocation, None)
+
+            self.record(name, duration, location=location, stack="".join(stack))
+
+    def record(self, name: str, duration: float, *, location: Optional[str] = None, stack: str = ""):
+        if name not in self.phases:
+            self.phases[name] = DurationStatistics()
+
+        self.phases[name].add(duration)
+
+        if duration > self.slow_threshold:
+            self.slow_invocations.append(SlowInvocation(
+                name=name,
+                duration=duration,
+                threshold=self.slow_threshold,
+                location=location,
+                stack=stack
+            ))
+
+            logging.warning("%s: slow invocation of '%s' (%s): %.6fs > %.6fs\n%s", self, name, location, duration,
+                            self.slow_threshold, stack)
+
+    def record_loop_lag(self, lag: float):
+        self.loop_lag.add(max(0.0, lag))
+
+    def reset(self):
+        self.phases = {}
+        self.loop_lag = DurationStatistics()
+        self.slow_invocations.clear()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return a summary: name => { count, mean, max, last }, loop lag is reported as "loop_lag"
+        """
+
+        summary: Dict[str, Dict[str, float]] = {}
+
+        for name, statistics in (list(self.phases.items()) + [("loop_lag", self.loop_lag)]):
+            summary[name] = {
+                "count": statistics.count,
+                "mean": statistics.mean,
+                "max": statistics.maximum,
+                "last": statistics.last,
+            }
+
+        return summary
+
+    def __str__(self):
+        return "Profiler"
@@ -0,0 +1,88 @@
+import json
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional, Type, Dict, Any
+
+from busline.event.event import Event
+from busline.event.message.avro_message import AvroMessageMixin, AVRO_FORMAT_TYPE
+from busline.event.message.message import Message
+from busline.event.registry import EventRegistry
+from dataclasses_avroschema import AvroModel
+from orbitalis.events.raw import RawMessage
+from orbitalis.events.tagged import SchemaTaggedMessage
+from orbitalis.orbiter.compatibility import SCHEMA_RESOLUTION_CACHE_SIZE
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+from orbitalis.orbiter.schema_registry import SchemaRegistry
+
+
+SCHEMA_TAGGED_MESSAGE_TYPE = EventRegistry.class_to_type(SchemaTaggedMessage)
+
+
+@lru_cache(maxsize=None)
+def writer_fingerprint_of(message_class: Type[Message]) -> Optional[int]:
+    """
+    Return fingerprint of schema used to write messages of given class, None if they are not Avro records
+    (e.g. raw messages), i.e. they can not be resolved. Fingerprints are cached, because building schemas is expensive
+    """
+
+    if not issubclass(message_class, AvroMessageMixin) or issubclass(message_class, RawMessage):
+        return None
+
+    return schema_fingerprint(message_class.avro_schema())
+
+
+def tag_message(message: AvroMessageMixin, message_type: str, writer_fingerprint: int) -> SchemaTaggedMessage:
+    """
+    Wrap Avro serialization of message together with fingerprint of its writer schema
+    """
+
+    _, data = message.serialize(format_type=AVRO_FORMAT_TYPE)
+
+    return SchemaTaggedMessage(
+        message_type=message_type,
+        writer_fingerprint=writer_fingerprint,
+        data=data
+    )
+
+
+@lru_cache(maxsize=SCHEMA_RESOLUTION_CACHE_SIZE)
+def _parsed_schema(schema: str) -> Dict[str, Any]:
+    return json.loads(schema)
+
+
+def read_tagged_message(message: SchemaTaggedMessage, schema_registry: SchemaRegistry,
+                        reader_class: Optional[Type[AvroMessageMixin]] = None) -> AvroMessageMixin:
+    """
+    Decode tagged message using reader class (by default, the one registered for its message type):
+    if writer schema differs from reader one, it is retrieved from schema registry and Avro schema resolution is applied.
+    ValueError is raised if writer schema is unknown
+    """
+
+    if reader_class is None:
+        reader_class = EventRegistry().retrieve_class(message.message_type)
+
+    if writer_fingerprint_of(reader_class) == message.writer_fingerprint:
+        return reader_class.deserialize(AVRO_FORMAT_TYPE, message.data)
+
+    writer_schema = schema_registry.get(message.writer_fingerprint)
+
+    if writer_schema is None:
+        raise ValueError(f"unknown writer schema fingerprint {message.writer_fingerprint}")
+
+    return AvroModel.deserialize.__func__(
+        reader_class,
+        message.data,
+        serialization_type=AVRO_FORMAT_TYPE,
+        writer_schema=_parsed_schema(writer_schema)
+    )
+
+
+def resolve_event(event: Event, schema_registry: SchemaRegistry) -> Event:
+    """
+    Return event with decoded payload if it is tagged (see `SchemaTaggedMessage`), otherwise event is returned as it is
+    """
+
+    if not isinstance(event.payload, SchemaTaggedMessage):
+        return event
+
+    return replace(event, payload=read_tagged_message(event.payload, schema_registry))
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, Iterable, List
+
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+from orbitalis.orbiter.schemaspec import SchemaSpec
+
+
+@dataclass(kw_only=True)
+class SchemaRegistry:
+    """
+    Local cache of schemas indexed by their fingerprint.
+
+    Each orbiter registers its own schemas and the ones fetched from other orbiters, so schemas
+    referenced only by fingerprint (see `SchemaSpec.compacted`) can be resolved without asking them again.
+
+    Author: Nicola Ricciardi
+    """
+
+    _schemas: Dict[int, str] = field(default_factory=dict, init=False)     # fingerprint => schema
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self._schemas
+
+    def __len__(self) -> int:
+        return len(self._schemas)
+
+    def register(self, schema: str) -> int:
+        """
+        Register schema, return its fingerprint
+        """
+
+        fingerprint = schema_fingerprint(schema)
+        self._schemas.setdefault(fingerprint, schema)
+
+        return fingerprint
+
+    def register_spec(self, spec: SchemaSpec):
+        """
+        Register every shipped schema of spec
+        """
+
+        for schema in spec.schemas:
+            self.register(schema)
+
+    def get(self, fingerprint: int) -> Optional[str]:
+        return self._schemas.get(fingerprint)
+
+    def missing(self, fingerprints: Iterable[int]) -> List[int]:
+        """
+        Return fingerprints which are not registered
+        """
+
+        return [fingerprint for fingerprint in fingerprints if fingerprint not in self._schemas]
+
+    def resolve(self, spec: SchemaSpec) -> SchemaSpec:
+        """
+        Return a copy of spec in which fingerprints of registered schemas are replaced by schemas.
+        Unknown fingerprints are kept
+        """
+
+        if spec.is_resolved:
+            return spec
+
+        schemas = list(spec.schemas)
+        unresolved: List[int] = []
+
+        for fingerprint in spec.schema_fingerprints:
+            schema = self._schemas.get(fingerprint)
+
+            if schema is None:
+                unresolved.append(fingerprint)
+            else:
+                schemas.append(schema)
+
+        return replace(spec, schemas=schemas, schema_fingerprints=unresolved)
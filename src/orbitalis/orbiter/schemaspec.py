@@ -1,32 +1,140 @@
-import json
-from dataclasses import dataclass, field
-from typing import List, Type, Self, override
+from dataclasses import dataclass, field, replace, FrozenInstanceError
+from typing import List, Type, Self, override, Tuple, FrozenSet, Optional, Dict
+from weakref import WeakValueDictionary
 
 from busline.event.message.number_message import Int64Message, Int32Message, Float64Message, Float32Message
 from busline.event.message.string_message import StringMessage
 from dataclasses_avroschema import AvroModel
 
 from busline.event.message.avro_message import AvroMessageMixin
+from orbitalis.events.raw import RawMessage
+from orbitalis.orbiter.compatibility import SchemaCompatibility, schemas_are_compatible
+from orbitalis.orbiter.fingerprint import schema_fingerprint
 
 
+_interned_specs: WeakValueDictionary = WeakValueDictionary()     # spec key => shared spec
+_interned_classes: Dict[type, type] = {}     # spec class => class of its interned specs
+
 @dataclass(kw_only=True)
 class SchemaSpec(AvroModel):
     """
+    Schemas can be shipped as they are or only by fingerprint (see `compacted`), in which case
+    they can be resolved using a `SchemaRegistry`.
+
+    By default, schemas must be equal to be compatible, otherwise Avro schema resolution is used
+    according to `compatibility` (see `SchemaCompatibility`)
 
     Author: Nicola Ricciardi
     """
 
     schemas: List[str] = field(default_factory=list)
+    schema_fingerprints: List[int] = field(default_factory=list)     # fingerprints of schemas which are not shipped
     support_empty_schema: bool = field(default=False)
     support_undefined_schema: bool = field(default=False)
+    streaming: bool = field(default=False)
+    compatibility: str = field(default=SchemaCompatibility.EXACT)
 
     def with_empty_support(self) -> Self:
-        self.support_empty_schema = True
+        """
+        Set support of empty schema and return this spec (a copy if this spec is interned)
+        """
+
+        spec = self._mutable()
+        spec.support_empty_schema = True
+        return spec
+
+    def as_stream(self) -> Self:
+        """
+        Set that schemas are related to items of a stream (see `Core.execute_stream`) and
+        return this spec (a copy if this spec is interned)
+        """
+
+        spec = self._mutable()
+        spec.streaming = True
+        return spec
+
+    def with_compatibility(self, compatibility: SchemaCompatibility) -> Self:
+        """
+        Set compatibility and return this spec (a copy if this spec is interned)
+        """
+
+        spec = self._mutable()
+        spec.compatibility = compatibility
+        return spec
+
+    def compacted(self) -> Self:
+        """
+        Return a copy of this spec in which schemas are replaced by their fingerprints.
+        Schemas are kept if compatibility is not exact, because they are needed to resolve them
+        """
+
+        if self.compatibility != SchemaCompatibility.EXACT:
+            return replace(self)
+
+        return replace(self, schemas=[], schema_fingerprints=self.fingerprints)
+
+    def interned(self) -> Self:
+        """
+        Return a shared copy of this spec, the same for all equal specs (while it is referenced).
+        It is used by connections, so that they do not keep their own copy of the same schemas.
+        Shared copy is frozen: its fields can not be assigned, schemas are stored in tuples
+        and builders (e.g. `as_stream`) return a new spec
+        """
+
+        key = self._key()
+
+        spec = _interned_specs.get(key)
+
+        if spec is None:
+            spec = replace(self)
+            spec.schemas = tuple(self.schemas)
+            spec.schema_fingerprints = tuple(self.schema_fingerprints)
+            spec.__class__ = _interned_class(type(self))
+            _interned_specs[key] = spec
+
+        return spec
+
+    def _mutable(self) -> Self:
+        """
+        Return spec which builders can modify: this spec, or a copy if it is interned
+        """
+
         return self
 
+    def _key(self) -> tuple:
+        return (
+            type(self),
+            tuple(self.schemas),
+            tuple(self.schema_fingerprints),
+            self.support_empty_schema,
+            self.support_undefined_schema,
+            self.streaming,
+            self.compatibility
+        )
+
     @property
     def has_some_explicit_schemas(self) -> bool:
-        return len(self.schemas) > 0
+        return len(self.schemas) > 0 or len(self.schema_fingerprints) > 0
+
+    @property
+    def is_resolved(self) -> bool:
+        """
+        True if every schema is available (i.e. no schema is known only by fingerprint)
+        """
+
+        return len(self.schema_fingerprints) == 0
+
+    @property
+    def fingerprints(self) -> List[int]:
+        return [schema_fingerprint(schema) for schema in self.schemas] + list(self.schema_fingerprints)
+
+    @property
+    def signature(self) -> Tuple[bool, bool, bool, FrozenSet[int]]:
+        """
+        Hashable summary of this spec: two specs are compatible iff their signatures are equal
+        """
+
+        return self.support_undefined_schema, self.support_empty_schema, self.streaming, frozenset(self.fingerprints)
 
     @classmethod
     def from_schema(cls, schema: str) -> Self:
@@ -64,26 +172,43 @@ class SchemaSpec(AvroModel):
     def string(cls) -> Self:
         return cls.from_message(StringMessage)
 
+    @classmethod
+    def raw(cls) -> Self:
+        """
+        Raw binary payloads, see `RawMessage`
+        """
+
+        return cls.from_message(RawMessage)
+
 
     def is_compatible(self, other: Self) -> bool:
         if self.support_undefined_schema != other.support_undefined_schema:
             return False
 
-        if self.support_empty_schema != other.support_empty_schema:
+        if self.streaming != other.streaming:
             return False
 
-        if len(self.schemas) != len(other.schemas):
+        if self.support_empty_schema != other.support_empty_schema:
             return False
 
-        for my_schema in self.schemas:
-            found = False
+        my_fingerprints = self.fingerprints
+        other_fingerprints = other.fingerprints
+
+        if self.compatibility == SchemaCompatibility.EXACT:
+            if len(my_fingerprints) != len(other_fingerprints):
+                return False
+
+            return set(my_fingerprints).issubset(other_fingerprints)
 
-            for other_schema in other.schemas:
-                if self._compare_two_schema(my_schema, other_schema):
-                    found = True
-                    break
+        # each schema must have a compatible counterpart, schemas known only by fingerprint can match only themselves
+        for my_fingerprint, my_schema in self._fingerprinted_schemas():
+            if not any(self._are_compatible(my_fingerprint, my_schema, other_fingerprint, other_schema)
+                       for other_fingerprint, other_schema in other._fingerprinted_schemas()):
+                return False
 
-            if not found:
+        for other_fingerprint, other_schema in other._fingerprinted_schemas():
+            if not any(self._are_compatible(my_fingerprint, my_schema, other_fingerprint, other_schema)
+                       for my_fingerprint, my_schema in self._fingerprinted_schemas()):
                 return False
 
         return True
@@ -92,26 +217,89 @@ class SchemaSpec(AvroModel):
         if self.support_undefined_schema:
             return True
 
-        for my_schema in self.schemas:
-            if self._compare_two_schema(my_schema, target_schema):
-                return True
+        target_fingerprint = schema_fingerprint(target_schema)
+
+        if self.compatibility == SchemaCompatibility.EXACT:
+            return target_fingerprint in self.fingerprints
+
+        return any(self._are_compatible(my_fingerprint, my_schema, target_fingerprint, target_schema)
+                   for my_fingerprint, my_schema in self._fingerprinted_schemas())
+
+    def _fingerprinted_schemas(self) -> List[Tuple[int, Optional[str]]]:
+        """
+        Return (fingerprint, schema) of each schema, schema is None if it is known only by fingerprint
+        """
+
+        return [(schema_fingerprint(schema), schema) for schema in self.schemas] \
+            + [(fingerprint, None) for fingerprint in self.schema_fingerprints]
+
+    def _are_compatible(self, my_fingerprint: int, my_schema: Optional[str], other_fingerprint: int, other_schema: Optional[str]) -> bool:
+        if my_fingerprint == other_fingerprint:
+            return True
+
+        if my_schema is None or other_schema is None:
+            return False
 
-        return False
+        return schemas_are_compatible(my_schema, other_schema, self.compatibility)
 
 
     @classmethod
     def _compare_two_schema(cls, schema_a: str, schema_b: str):
         """
-        Compare two schemas and return True if they are equal
+        Compare two schemas and return True if they are equal (fingerprints of normalized schemas are compared)
         """
 
-        try:
-            schema_a_dict = json.loads(schema_a)
-            schema_b_dict = json.loads(schema_b)
+        return schema_fingerprint(schema_a) == schema_fingerprint(schema_b)
+
+
+def _interned_class(spec_class: Type[SchemaSpec]) -> Type[SchemaSpec]:
+    """
+    Return frozen subclass of spec class which interned specs are switched to, so that
+    assignments to not interned specs are not checked
+    """
+
+    interned_class = _interned_classes.get(spec_class)
+
+    if interned_class is not None:
+        return interned_class
+
+    class InternedSchemaSpec(spec_class):
+        __slots__ = ()
+
+        def __new__(cls, **kwargs):
+            # new specs (e.g. by dataclasses.replace) are not interned
+            for name in ("schemas", "schema_fingerprints"):
+                if name in kwargs:
+                    kwargs[name] = list(kwargs[name])
+
+            return spec_class(**kwargs)
+
+        def __setattr__(self, name, value):
+            raise FrozenInstanceError(f"cannot assign to field '{name}' of an interned spec")
+
+        def __delattr__(self, name):
+            raise FrozenInstanceError(f"cannot delete field '{name}' of an interned spec")
+
+        def __eq__(self, other):
+            if not isinstance(other, SchemaSpec):
+                return NotImplemented
+
+            return self._key() == other._key()
+
+        __hash__ = None
+
+        def _mutable(self) -> Self:
+            return replace(self)
+
+        def _key(self) -> tuple:
+            return (spec_class, *super()._key()[1:])
+
+    InternedSchemaSpec.__name__ = spec_class.__name__
+    InternedSchemaSpec.__qualname__ = spec_class.__qualname__
+
+    _interned_classes[spec_class] = InternedSchemaSpec
 
-            return schema_a_dict == schema_b_dict
-        except:
-            return schema_a == schema_b
+    return InternedSchemaSpec
 
 
 @dataclass
@@ -0,0 +1,398 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, AsyncIterable, AsyncIterator, Iterator, Callable, Awaitable, Any, List
+
+from busline.event.message.avro_message import AvroMessageMixin
+from busline.event.message.message import Message
+from busline.event.registry import EventRegistry
+from orbitalis.events.raw import RawMessage
+from orbitalis.events.stream import StreamFrameMessage, StreamCreditMessage
+from orbitalis.utils.message import serialize_message
+
+
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_STREAM_WINDOW = 32
+DEFAULT_STREAM_IDLE_TIMEOUT = 60
+
+
+class StreamError(Exception):
+    """
+    Raised when a stream is aborted by sender, it can not be reassembled, it is idle for too long or its connection is closed
+
+    Author: Nicola Ricciardi
+    """
+
+
+StreamItem = AvroMessageMixin | bytes | bytearray | memoryview
+
+
+def split_stream_item(item: StreamItem, chunk_size: int) -> Iterator[Message]:
+    """
+    Return messages which represent item: binary items (and raw messages) are sliced in `RawMessage` chunks
+    of at most `chunk_size` bytes without copies, other messages are returned as they are
+    """
+
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        item = RawMessage(item)
+
+    if not isinstance(item, RawMessage):
+        yield item
+        return
+
+    view = item.view
+    if view.nbytes <= chunk_size:
+        yield item
+        return
+
+    for offset in range(0, view.nbytes, chunk_size):
+        yield RawMessage(view[offset:offset + chunk_size])
+
+
+def encode_stream_frame(stream_id: str, sequence: int, message: Message, credit_topic: Optional[str] = None,
+                        window: Optional[int] = None) -> StreamFrameMessage:
+    message_type = EventRegistry.obj_to_type(message)
+    EventRegistry().add(type(message), message_type=message_type)
+
+    format_type, data = serialize_message(message)
+
+    return StreamFrameMessage(
+        stream_id=stream_id,
+        sequence=sequence,
+        message_type=message_type,
+        format_type=format_type,
+        data=data,
+        credit_topic=credit_topic,
+        window=window
+    )
+
+
+def decode_stream_frame(frame: StreamFrameMessage) -> Message:
+    message_class = EventRegistry().retrieve_class(frame.message_type)
+
+    return message_class.deserialize(frame.format_type, frame.data)
+
+
+@dataclass(kw_only=True)
+class StreamCredits:
+    """
+    Credits available to sender: a frame can be sent only if a credit is available (and stream is not aborted)
+
+    Author: Nicola Ricciardi
+    """
+
+    available: int
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, init=False)
+    _error: Optional[StreamError] = field(default=None, init=False)
+
+    def grant(self, credits: int):
+        self.available += credits
+        self._changed.set()
+
+    def abort(self, error: StreamError):
+        """
+        Abort stream: waiting and next acquisitions raise error
+        """
+
+        self._error = error
+        self._changed.set()
+
+    async def acquire(self, timeout: Optional[float] = None):
+        while self.available <= 0 and self._error is None:
+            self._changed.clear()
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise StreamError("no credits granted by receiver")
+
+        if self._error is not None:
+            raise self._error
+
+        self.available -= 1
+
+
+_END_OF_STREAM = object()
+
+
+@dataclass(kw_only=True)
+class MessageStream(AsyncIterator[Message]):
+    """
+    Async iterator over items of an incoming stream.
+    Items are buffered in a bounded queue, consumed items are periodically granted back to sender as credits:
+    every half of the smaller window between sender's one (if known) and `buffer_size`, so sender never waits for credits
+    which would be granted only after more items than it can send
+
+    Author: Nicola Ricciardi
+    """
+
+    stream_id: str
+    buffer_size: int
+    publish: Callable[[str, Message], Awaitable] = field(repr=False)
+    credit_topic: Optional[str] = field(default=None)
+    sender_window: Optional[int] = field(default=None)
+
+    _queue: asyncio.Queue = field(init=False)
+    _consumed: int = field(default=0, init=False)
+    _error: Optional[StreamError] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self._queue = asyncio.Queue(maxsize=self.buffer_size + 1)   # + 1: end/error is not counted by credits
+
+    @property
+    def buffered(self) -> int:
+        """
+        Items received, but not yet consumed
+        """
+
+        return self._queue.qsize()
+
+    @property
+    def _credit_batch(self) -> int:
+        window = self.buffer_size
+        if self.sender_window is not None:
+            window = min(window, self.sender_window)
+
+        return max(1, window // 2)
+
+    async def put(self, item: Any):
+        await self._queue.put(item)
+
+    def abort(self, error: StreamError):
+        """
+        Abort stream without waiting for room in buffer: error is raised after already buffered items
+        """
+
+        if self._error is not None:
+            return
+
+        self._error = error
+
+        if not self._queue.full():
+            self._queue.put_nowait(error)     # wake up consumer
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Message:
+        if self._error is not None and self._queue.empty():
+            raise self._error
+
+        item = await self._queue.get()
+
+        if item is _END_OF_STREAM:
+            raise StopAsyncIteration
+
+        if isinstance(item, StreamError):
+            raise item
+
+        self._consumed += 1
+        if self._consumed >= self._credit_batch:
+            await self._grant()
+
+        return item
+
+    async def _grant(self):
+        credits, self._consumed = self._consumed, 0
+
+        if self.credit_topic is None:
+            return
+
+        try:
+            await self.publish(self.credit_topic, StreamCreditMessage(stream_id=self.stream_id, credits=credits))
+        except Exception as e:
+            logging.warning("stream %s: credits can not be granted: %s", self.stream_id, repr(e))
+
+
+def tee_stream(items: AsyncIterable[Any], count: int, buffer_size: int) -> List[AsyncIterator[Any]]:
+    """
+    Split items in `count` async iterators, each one buffers at most `buffer_size` items (i.e. the slowest one sets the pace).
+    Items are pulled by the first iteration of any returned iterator; if items iteration fails, all iterators raise the same exception
+    """
+
+    if count == 1:
+        return [aiter(items)]
+
+    queues = [asyncio.Queue(maxsize=max(1, buffer_size)) for _ in range(count)]
+    abandoned: List[asyncio.Queue] = []     # queues whose iterator was closed early, they are skipped
+    pump: List[asyncio.Task] = []
+
+    async def put_all(item: Any):
+        for queue in queues:
+            if not any(queue is q for q in abandoned):
+                await queue.put(item)
+
+    async def pump_items():
+        try:
+            async for item in items:
+                await put_all(item)
+
+            await put_all(_END_OF_STREAM)
+
+        except Exception as e:
+            await put_all(e)
+
+    async def iterate(queue: asyncio.Queue):
+        if len(pump) == 0:
+            pump.append(asyncio.create_task(pump_items()))
+
+        try:
+            while True:
+                item = await queue.get()
+
+                if item is _END_OF_STREAM:
+                    return
+
+                if isinstance(item, Exception):
+                    raise item
+
+                yield item
+
+        finally:
+            abandoned.append(queue)
+
+            while not queue.empty():    # unblock pump
+                queue.get_nowait()
+
+    return [iterate(queue) for queue in queues]
+
+
+@dataclass(kw_only=True)
+class _IncomingStream:
+    stream: MessageStream
+    topic: Optional[str] = field(default=None)
+    next_sequence: int = field(default=0)
+    out_of_order: Dict[int, StreamFrameMessage] = field(default_factory=dict)
+    last_frame_at: float = field(default=0.0)     # event loop time
+    idle_timer: Optional[asyncio.TimerHandle] = field(default=None)
+
+
+@dataclass(kw_only=True)
+class StreamReceiver:
+    """
+    Reassemble incoming stream frames in order, frames which arrive early are kept (at most `buffer_size` per stream).
+
+    A stream is aborted if no frame arrives for `idle_timeout` seconds while its consumer is waiting for items (i.e. sender is dead),
+    or if its topic is aborted (i.e. connection is closed)
+
+    Author: Nicola Ricciardi
+    """
+
+    _streams: Dict[str, _IncomingStream] = field(default_factory=dict, init=False)     # stream_id => _IncomingStream
+
+    @property
+    def open_streams(self) -> int:
+        return len(self._streams)
+
+    async def feed(self, frame: StreamFrameMessage, *, buffer_size: int, publish: Callable[[str, Message], Awaitable],
+                   topic: Optional[str] = None, idle_timeout: Optional[float] = None) -> Optional[MessageStream]:
+        """
+        Feed a frame arrived on topic, return a new stream if frame opens it
+        """
+
+        new_stream: Optional[MessageStream] = None
+
+        incoming = self._streams.get(frame.stream_id)
+
+        if incoming is None:
+            new_stream = MessageStream(
+                stream_id=frame.stream_id,
+                buffer_size=buffer_size,
+                publish=publish
+            )
+
+            incoming = _IncomingStream(stream=new_stream, topic=topic)
+            self._streams[frame.stream_id] = incoming
+
+        incoming.last_frame_at = asyncio.get_running_loop().time()
+
+        if idle_timeout is not None and incoming.idle_timer is None:
+            self._arm_idle_timer(incoming, idle_timeout, idle_timeout)
+
+        if frame.sequence != incoming.next_sequence:
+            if frame.sequence < incoming.next_sequence:
+                logging.warning("stream %s: duplicated frame %s discarded", frame.stream_id, frame.sequence)
+                return new_stream
+
+            if len(incoming.out_of_order) >= buffer_size:
+                self._abort(incoming, StreamError(f"too many out of order frames in stream {frame.stream_id}"))
+                return new_stream
+
+            incoming.out_of_order[frame.sequence] = frame
+            return new_stream
+
+        await self._deliver(incoming, frame)
+
+        while incoming.next_sequence in incoming.out_of_order and frame.stream_id in self._streams:
+            await self._deliver(incoming, incoming.out_of_order.pop(incoming.next_sequence))
+
+        return new_stream
+
+    async def _deliver(self, incoming: _IncomingStream, frame: StreamFrameMessage):
+        incoming.next_sequence += 1
+
+        if frame.credit_topic is not None:
+            incoming.stream.credit_topic = frame.credit_topic
+
+        if frame.window is not None:
+            incoming.stream.sender_window = frame.window
+
+        if frame.error is not None:
+            self._abort(incoming, StreamError(frame.error))
+            return
+
+        if frame.data is not None:
+            await incoming.stream.put(decode_stream_frame(frame))
+
+        if frame.end:
+            self._close(incoming)
+            await incoming.stream.put(_END_OF_STREAM)
+
+    def abort_topic(self, topic: str, error: StreamError) -> int:
+        """
+        Abort all open streams arrived on topic, return the number of aborted streams
+        """
+
+        aborted = [incoming for incoming in self._streams.values() if incoming.topic == topic]
+
+        for incoming in aborted:
+            self._abort(incoming, error)
+
+        return len(aborted)
+
+    def _arm_idle_timer(self, incoming: _IncomingStream, delay: float, idle_timeout: float):
+        """
+        Only one timer per stream is armed, it is re-armed when it expires (instead of for each frame)
+        """
+
+        incoming.idle_timer = asyncio.get_running_loop().call_later(delay, self._on_idle, incoming, idle_timeout)
+
+    def _on_idle(self, incoming: _IncomingStream, idle_timeout: float):
+        incoming.idle_timer = None
+
+        if self._streams.get(incoming.stream.stream_id) is not incoming:
+            return
+
+        idle = asyncio.get_running_loop().time() - incoming.last_frame_at
+
+        if idle < idle_timeout:
+            self._arm_idle_timer(incoming, idle_timeout - idle, idle_timeout)
+            return
+
+        if incoming.stream.buffered > 0:    # consumer is slow, sender waits for credits
+            self._arm_idle_timer(incoming, idle_timeout, idle_timeout)
+            return
+
+        self._abort(incoming, StreamError(f"no frames in stream {incoming.stream.stream_id} for {idle_timeout} seconds"))
+
+    def _close(self, incoming: _IncomingStream):
+        if self._streams.get(incoming.stream.stream_id) is incoming:
+            del self._streams[incoming.stream.stream_id]
+
+        if incoming.idle_timer is not None:
+            incoming.idle_timer.cancel()
+            incoming.idle_timer = None
+
+    def _abort(self, incoming: _IncomingStream, error: StreamError):
+        self._close(incoming)
+        incoming.stream.abort(error)
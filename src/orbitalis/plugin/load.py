@@ -0,0 +1,82 @@
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from orbitalis.events.load import OperationLoad
+from orbitalis.orbiter.stream import MessageStream
+
+
+DEFAULT_LOAD_DURATIONS_WINDOW = 256
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile (q in [0, 1]) of already sorted values, None if there are no values
+    """
+
+    if len(sorted_values) == 0:
+        return None
+
+    rank = max(1, math.ceil(q * len(sorted_values)))
+
+    return sorted_values[rank - 1]
+
+
+@dataclass(kw_only=True)
+class OperationLoadTracker:
+    """
+    Track runtime load of an operation: in flight invocations, items buffered in incoming streams and durations of recent invocations.
+    Durations are measured using event loop's clock, so they are consistent with virtual time during simulations
+
+    Author: Nicola Ricciardi
+    """
+
+    operation_name: str
+    durations_window: int = field(default=DEFAULT_LOAD_DURATIONS_WINDOW)
+
+    in_flight: int = field(default=0, init=False)
+    invocations: int = field(default=0, init=False)
+
+    _durations: Deque[float] = field(default_factory=deque, init=False)
+    _streams: Dict[int, MessageStream] = field(default_factory=dict, init=False)     # id => open incoming stream of operation
+
+    def __post_init__(self):
+        if self.durations_window < 1:
+            raise ValueError("durations_window must be >= 1")
+
+        self._durations = deque(maxlen=self.durations_window)
+
+    def started(self):
+        self.in_flight += 1
+
+    def finished(self, duration: float):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.invocations += 1
+        self._durations.append(duration)
+
+    def track_stream(self, stream: MessageStream):
+        self._streams[id(stream)] = stream
+
+    def untrack_stream(self, stream: MessageStream):
+        self._streams.pop(id(stream), None)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Items buffered in open incoming streams, not yet consumed by handler
+        """
+
+        return sum(stream.buffered for stream in self._streams.values())
+
+    def report(self, free_slots: Optional[int] = None) -> OperationLoad:
+        durations = sorted(self._durations)
+
+        return OperationLoad(
+            name=self.operation_name,
+            in_flight=self.in_flight,
+            queue_depth=self.queue_depth,
+            p50=percentile(durations, 0.5),
+            p99=percentile(durations, 0.99),
+            free_slots=free_slots
+        )
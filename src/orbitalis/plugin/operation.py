@@ -1,14 +1,50 @@
+import asyncio
+import functools
 import inspect
+from contextvars import ContextVar
 from abc import ABC
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Self, Any, Type
+from dataclasses import dataclass, field, replace
+from typing import Optional, Dict, Self, Any, Type, Tuple, FrozenSet, ClassVar
+from busline.event.event import Event
 from busline.event.message.avro_message import AvroMessageMixin
 from busline.client.subscriber.event_handler import event_handler
 from busline.client.subscriber.event_handler.event_handler import EventHandler
+from orbitalis.events.stream import StreamFrameMessage
+from orbitalis.orbiter.compression import decompress_event
+from orbitalis.orbiter.resolution import resolve_event
+from orbitalis.orbiter.connection import Connection
 from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.orbiter.stream import MessageStream
+from orbitalis.utils.descriptors import collect_class_descriptors
+from orbitalis.utils.task import fire_and_forget_task
 from orbitalis.utils.allowblocklist import AllowBlockListMixin
 
 
+Signature = Tuple[bool, bool, bool, FrozenSet[int]]
+
+
+_current_operation_event: ContextVar[Optional[Event]] = ContextVar("current_operation_event", default=None)
+
+
+_current_operation_connection: ContextVar[Optional[Connection]] = ContextVar("current_operation_connection", default=None)
+
+
+def get_current_operation_event() -> Optional[Event]:
+    """
+    Return the input event which is being handled by current operation invocation (if any)
+    """
+
+    return _current_operation_event.get()
+
+
+def get_current_operation_connection() -> Optional[Connection]:
+    """
+    Return the connection through which current operation invocation was requested (if it is known)
+    """
+
+    return _current_operation_connection.get()
+
+
 @dataclass
 class Policy(AllowBlockListMixin):
     maximum: Optional[int] = field(default=None)
@@ -25,12 +61,97 @@ class Operation:
     policy: Policy
     input: Input
     output: Output
+    with_connection: bool = field(default=False)    # handler receives also the connection
 
     def __post_init__(self):
         if self.input.has_input and self.handler is None:
             raise ValueError("Missed handler")
 
 
+@dataclass(kw_only=True)
+class OperationEventHandler(EventHandler):
+    """
+    Event handler subscribed by plugins on operation input topics.
+    It wraps operation's handler in order to trace and profile its invocations, and to track operation's load (see `Plugin.load_tracker`).
+
+    Stream frames are reassembled: operation's handler is invoked once per stream (in background)
+    and it receives the stream (async iterator of items) instead of the event.
+    Compressed payloads are decompressed.
+
+    Connection is bound by plugin when it is created, so handlers which require it (`with_connection`) receive it
+    without looking for it. In this case, connection is touched for each input.
+
+    Author: Nicola Ricciardi
+    """
+
+    plugin: Any
+    operation_name: str
+    handler: EventHandler
+    with_connection: bool = field(default=False)
+    connection: Optional[Connection] = field(default=None)
+
+    async def handle(self, topic: str, event: Event):
+        event = resolve_event(decompress_event(event), self.plugin.schema_registry)
+
+        if self.with_connection:
+            if self.connection is None:
+                # input arrived before binding
+                connections = self.plugin.retrieve_connections(input_topic=topic, operation_name=self.operation_name)
+                self.connection = connections[0] if len(connections) > 0 else None
+
+            if self.connection is not None:
+                self.connection.touch()
+
+        if isinstance(event.payload, StreamFrameMessage):
+            stream = await self.plugin._feed_stream(event.payload, topic=topic)
+
+            if stream is not None:
+                self.plugin.load_tracker(self.operation_name).track_stream(stream)
+                fire_and_forget_task(self._invoke(topic, event, stream))
+
+            return
+
+        await self._invoke(topic, event, event)
+
+    async def _invoke(self, topic: str, event: Event, argument: Any):
+        event_token = _current_operation_event.set(event)
+        connection_token = _current_operation_connection.set(self.connection)
+
+        load_tracker = self.plugin.load_tracker(self.operation_name)
+        loop = asyncio.get_running_loop()
+
+        load_tracker.started()
+        started_at = loop.time()
+
+        try:
+            await self._traced_invoke(topic, event, argument)
+        finally:
+            load_tracker.finished(loop.time() - started_at)
+
+            if isinstance(argument, MessageStream):
+                load_tracker.untrack_stream(argument)
+
+            _current_operation_connection.reset(connection_token)
+            _current_operation_event.reset(event_token)
+
+    async def _traced_invoke(self, topic: str, event: Event, argument: Any):
+        tracer = self.plugin.tracer
+
+        invocation = self.plugin._profiled(f"operation {self.operation_name}", self.handler.handle(topic, argument))
+
+        if tracer is None:
+            await invocation
+            return
+
+        with tracer.consume(
+            f"operation {self.operation_name}",
+            event,
+            orbiter_identifier=self.plugin.identifier,
+            attributes={"topic": topic}
+        ):
+            await invocation
+
+
 @dataclass(kw_only=True)
 class _OperationDescriptor:
     operation_name: str
@@ -38,29 +159,45 @@ class _OperationDescriptor:
     policy: Policy
     input: Input
     output: Output
+    with_connection: bool = field(default=False)
 
     def __post_init__(self):
         self.func = event_handler(self.func)
 
-    def __get__(self, instance, owner):
-        if instance is None:
-            return self
+    def bind(self, instance):
+        """
+        Add operation to instance's operations, unless an operation with the same name was already provided
+        """
 
         if self.operation_name not in instance.operations:
             instance.operations[self.operation_name] = Operation(
                 name=self.operation_name,
-                handler=self.func.__get__(instance, owner),
+                handler=self.func.__get__(instance, type(instance)),
                 policy=self.policy,
                 input=self.input,
-                output=self.output
+                output=self.output,
+                with_connection=self.with_connection
             )
 
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
         return self.func.__get__(instance, owner)
 
 
-def operation(*, input: Optional[Input | Type[AvroMessageMixin]] = None, default_policy: Optional[Policy] = None, output: Optional[Output | Type[AvroMessageMixin]] = None, name: Optional[str] = None):
+def operation(*, input: Optional[Input | Type[AvroMessageMixin]] = None, default_policy: Optional[Policy] = None, output: Optional[Output | Type[AvroMessageMixin]] = None, name: Optional[str] = None,
+              streaming: bool = False, with_connection: bool = False):
     """
-    Transform a function of a method in an operation and append it to operations provider
+    Transform a function of a method in an operation and append it to operations provider.
+
+    If streaming, input is related to stream items and handler receives (topic, stream) where stream is an async iterator of items.
+
+    If with_connection, handler receives also the connection through which operation was requested, i.e. (topic, event, connection),
+    and it is already touched, so `retrieve_and_touch_connections` is not needed.
+
+    If handler is an async generator, output is a stream: yielded items are sent as result stream to cores
+    which are connected through input topic (see `Plugin.send_stream_to_all`)
     """
 
     if input is None:
@@ -88,41 +225,133 @@ def operation(*, input: Optional[Input | Type[AvroMessageMixin]] = None, default
             raise TypeError("output must be either Output or AvroMessageMixin subclass")    
     
 
+    if streaming:
+        if not input.has_input:
+            raise ValueError("A streaming operation must have an input")
+
+        input = replace(input, streaming=True)
+
     if default_policy is None:
         default_policy = Policy.no_constraints()
 
     def decorator(func):
+        op_name = name or func.__name__
+
+        if inspect.isasyncgenfunction(func):
+            func = _results_streamer(func, op_name, with_connection)
+            output_ = replace(output, streaming=True)
+        else:
+            output_ = output
+
+            if with_connection:
+                func = _connection_injector(func)
+
         if not inspect.iscoroutinefunction(func):
             raise TypeError("Event handler must be async")
 
-        op_name = name or func.__name__
+        if output_.streaming and not output_.has_output:
+            raise ValueError("A result streaming operation must have an output")
 
         return _OperationDescriptor(
             func=func,
             operation_name=op_name,
             policy=default_policy,
             input=input,
-            output=output
+            output=output_,
+            with_connection=with_connection
         )
 
     return decorator
 
 
+def _connection_injector(func):
+    """
+    Wrap a method which receives (topic, event, connection) in a handler, connection is the one bound to operation event handler
+    """
+
+    @functools.wraps(func)
+    async def inject_connection(self, topic: str, event):
+        await func(self, topic, event, _current_operation_connection.get())
+
+    return inject_connection
+
+
+def _results_streamer(generator_function, operation_name: str, with_connection: bool = False):
+    """
+    Wrap an async generator method in a handler which sends yielded items as result stream
+    """
+
+    @functools.wraps(generator_function)
+    async def stream_results(self, topic: str, event):
+        if with_connection:
+            connection = _current_operation_connection.get()
+            await self.send_stream_to_all([connection], generator_function(self, topic, event, connection))
+            return
+
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name=operation_name)
+
+        await self.send_stream_to_all(connections, generator_function(self, topic, event))
+
+    return stream_results
+
+
 @dataclass(kw_only=True)
 class OperationsProviderMixin(ABC):
 
+    _operation_descriptors: ClassVar[Dict[str, _OperationDescriptor]] = {}    # attribute name => descriptor, collected once per class
+
     operations: Dict[str, Operation] = field(default_factory=dict)     # operation_name => Operation
 
+    _operations_index: Dict[str, Tuple[Operation, Input, Output, Signature, Signature]] = field(default_factory=dict, init=False)    # operation_name => (operation, input, output, input signature, output signature)
+
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._operation_descriptors = collect_class_descriptors(cls, _OperationDescriptor)
 
     def __post_init__(self):
+        for descriptor in self._operation_descriptors.values():
+            descriptor.bind(self)
+
+        if hasattr(super(), "__post_init__"):
+            super().__post_init__()
+
+    def compile_operations_index(self):
+        """
+        Precompile input/output signatures of all operations, they are used to answer discover queries using set lookups
+        """
+
+        self._operations_index = {}
+
+        for operation_name in self.operations.keys():
+            self.operation_signatures(operation_name)
+
+    def operation_signatures(self, operation_name: str) -> Optional[Tuple[Signature, Signature]]:
+        """
+        Return (input signature, output signature) of operation, None if operation is not provided.
+        Index entry is recompiled if operation (or its input/output) was replaced
+        """
 
-        # used to refresh operations
-        for attr_name in dir(self):
-            _ = getattr(self, attr_name)
+        operation = self.operations.get(operation_name)
+
+        if operation is None:
+            self._operations_index.pop(operation_name, None)
+            return None
+
+        entry = self._operations_index.get(operation_name)
+
+        if entry is None or entry[0] is not operation or entry[1] is not operation.input or entry[2] is not operation.output:
+            entry = (operation, operation.input, operation.output, operation.input.signature, operation.output.signature)
+            self._operations_index[operation_name] = entry
+
+        return entry[3], entry[4]
 
     def with_operation(self, operation_name: str, operation: Operation) -> Self:
         self.operations[operation_name] = operation
 
+        self.operation_signatures(operation_name)
+
         return self
 
     def with_custom_policy(self, operation_name: str, policy: Policy) -> Self:
@@ -2,24 +2,33 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import override, List, Optional, Any
-from dataclasses import dataclass
-
-from uuid import uuid4
+from typing import override, List, Optional, Any, AsyncIterable, Dict, Iterable
+from dataclasses import dataclass, field
 
 from busline.client.subscriber.event_handler import event_handler
 from busline.event.event import Event
 from orbitalis.core.requirement import Constraint
 from orbitalis.events.discover import DiscoverMessage, DiscoverQuery
+from orbitalis.events.keepalive import KeepaliveMessage, LoadKeepaliveMessage
+from orbitalis.events.load import OperationLoad
 from orbitalis.events.offer import OfferMessage, OfferedOperation
 from orbitalis.events.reply import RejectOperationMessage, RequestOperationMessage
 from orbitalis.events.response import ConfirmConnectionMessage, OperationNoLongerAvailableMessage
 from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.compatibility import SchemaCompatibility
+from orbitalis.orbiter.compression import CompressionCodec, choose_compression_codec
 from orbitalis.orbiter.orbiter import Orbiter
 from orbitalis.orbiter.pending_request import PendingRequest
-from orbitalis.plugin.operation import OperationsProviderMixin
+from orbitalis.orbiter.schemaspec import SchemaSpec
+from orbitalis.orbiter.stream import StreamItem, tee_stream
+from orbitalis.plugin.load import OperationLoadTracker
+from orbitalis.plugin.operation import OperationsProviderMixin, OperationEventHandler, get_current_operation_event, Signature
 from orbitalis.plugin.state import PluginState
 from orbitalis.state_machine.state_machine import StateMachine
+from orbitalis.tracing.span import SpanKind
+from orbitalis.tracing.tracer import Tracer
+from orbitalis.utils.event_headers import event_headers, REPLY_TO_HEADER
+from orbitalis.utils import clock, rng
 
 
 @dataclass(kw_only=True)
@@ -30,9 +39,20 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
     Author: Nicola Ricciardi
     """
 
+    compression_codecs: List[str] = field(default_factory=lambda: list(CompressionCodec))    # codecs which can be negotiated with cores
+
+    report_load: bool = field(default=True)     # piggyback load reports on keepalives and offers (see `load_report`)
+    load_report_interval: Optional[float] = field(default=None)     # if set, keepalives (i.e. load reports) are sent to connected cores at least every interval seconds
+
+    _operation_event_handlers: Dict[str, OperationEventHandler] = field(default_factory=dict, init=False)    # input_topic => OperationEventHandler
+    _load_trackers: Dict[str, OperationLoadTracker] = field(default_factory=dict, init=False)    # operation_name => OperationLoadTracker
+
     def __post_init__(self):
         super().__post_init__()
 
+        if self.load_report_interval is not None and self.load_report_interval <= 0:
+            raise ValueError("load_report_interval must be > 0")
+
         self.state = PluginState.CREATED
 
     @property
@@ -43,6 +63,12 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
     async def _internal_start(self, *args, **kwargs):
         await super()._internal_start(*args, **kwargs)
 
+        self.compile_operations_index()
+
+        for operation in self.operations.values():
+            self.schema_registry.register_spec(operation.input)
+            self.schema_registry.register_spec(operation.output)
+
         await self.eventbus_client.subscribe(
             self.reply_topic,
             self.__reply_event_handler
@@ -76,6 +102,7 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
     async def _on_close_connection(self, connection: Connection):
 
         if connection.has_input:
+            self._operation_event_handlers.pop(connection.input_topic, None)
             await self.eventbus_client.unsubscribe(connection.input_topic)
 
     def __can_lend_to_core(self, core_identifier: str, operation_name: str) -> bool:
@@ -87,8 +114,109 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
 
         return False
 
+    @staticmethod
+    def _query_spec_matches(query_spec: SchemaSpec, spec: SchemaSpec, signature: Signature) -> bool:
+        """
+        Signatures are compared first, schema resolution is used only if query spec is not exact
+        """
+
+        if query_spec.signature == signature:
+            return True
+
+        return query_spec.compatibility != SchemaCompatibility.EXACT and query_spec.is_compatible(spec)
+
+    def free_slots_for_operation(self, operation_name: str) -> Optional[int]:
+        """
+        Return number of slots not reserved by connections or pending requests, None if operation has not a maximum
+        """
+
+        maximum = self.operations[operation_name].policy.maximum
+
+        if maximum is None:
+            return None
+
+        current_reserved_slot_for_operation: int = len(self.retrieve_connections(operation_name=operation_name))
+
+        for operations in self._pending_requests.values():
+            if operation_name in operations.keys():
+                current_reserved_slot_for_operation += 1
+
+        return max(0, maximum - current_reserved_slot_for_operation)
+
+    def load_tracker(self, operation_name: str) -> OperationLoadTracker:
+        """
+        Return load tracker of operation, it is created if it does not exist
+        """
+
+        load_tracker = self._load_trackers.get(operation_name)
+
+        if load_tracker is None:
+            load_tracker = OperationLoadTracker(operation_name=operation_name)
+            self._load_trackers[operation_name] = load_tracker
+
+        return load_tracker
+
+    def operation_load(self, operation_name: str) -> OperationLoad:
+        return self.load_tracker(operation_name).report(self.free_slots_for_operation(operation_name))
+
+    def load_report(self, operation_names: Optional[Iterable[str]] = None) -> List[OperationLoad]:
+        """
+        Return current load of given operations (all operations by default)
+        """
+
+        if operation_names is None:
+            operation_names = self.operations.keys()
+
+        return [self.operation_load(operation_name) for operation_name in operation_names if operation_name in self.operations]
+
+    @override
+    def _build_keepalive_message(self, remote_identifier: str) -> KeepaliveMessage:
+        if not self.report_load:
+            return super()._build_keepalive_message(remote_identifier)
+
+        operation_names = {connection.operation_name for connection in self.retrieve_connections(remote_identifier=remote_identifier)}
+
+        if len(operation_names) == 0:
+            return super()._build_keepalive_message(remote_identifier)
+
+        return LoadKeepaliveMessage(
+            from_identifier=self.identifier,
+            load=self.load_report(sorted(operation_names))
+        )
+
+    async def send_load_reports_based_on_interval(self):
+        """
+        Send keepalive messages (which carry load reports) to connected cores if last one was sent more than `load_report_interval` seconds ago
+        """
+
+        if self.load_report_interval is None or not self.report_load:
+            return
+
+        now = clock.now()
+
+        tasks = []
+        for remote_identifier, operations in list(self._connections.items()):
+            if len(operations) == 0 or remote_identifier not in self._remote_keepalive_topics:
+                continue
+
+            last_keepalive_sent = self._last_keepalive_sent.get(remote_identifier)
+
+            if last_keepalive_sent is None or (now - last_keepalive_sent).total_seconds() >= self.load_report_interval:
+                tasks.append(self.send_keepalive(remote_identifier))
+
+        await asyncio.gather(*tasks)
+
+    @override
+    async def _on_loop_iteration(self):
+        await super()._on_loop_iteration()
+
+        await self.send_load_reports_based_on_interval()
+
     def __allow_offer(self, core_identifier: str, core_needed_operation_name: str, core_discover_query: DiscoverQuery) -> bool:
-        if core_needed_operation_name not in self.operations:
+        signatures = self.operation_signatures(core_needed_operation_name)
+
+        # operation is not provided
+        if signatures is None:
             return False
 
         # check compatibility with block/allow list
@@ -106,28 +234,29 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
             return False
 
         # check if there are slot available
-        if self.operations[core_needed_operation_name].policy.maximum is not None:
-            current_reserved_slot_for_operation: int = len(
-                self.retrieve_connections(operation_name=core_needed_operation_name))
-
-            for core_identifier, operations in self._pending_requests.items():
-                if core_needed_operation_name in operations.keys():
-                    current_reserved_slot_for_operation += 1
+        free_slots = self.free_slots_for_operation(core_needed_operation_name)
+        if free_slots is not None and free_slots <= 0:
+            return False
 
-            if current_reserved_slot_for_operation >= self.operations[core_needed_operation_name].policy.maximum:
-                return False
+        input_signature, output_signature = signatures
+        operation = self.operations[core_needed_operation_name]
 
         # check input_schemas compatibility
-        if not core_discover_query.input_is_compatible(self.operations[core_needed_operation_name].input):
+        if not any(Plugin._query_spec_matches(query_input, operation.input, input_signature) for query_input in core_discover_query.inputs):
             return False
 
         # check output_schemas compatibility
-        if not core_discover_query.output_is_compatible(self.operations[core_needed_operation_name].output):
+        if not any(Plugin._query_spec_matches(query_output, operation.output, output_signature) for query_output in core_discover_query.outputs):
             return False
 
         if not self.__can_lend_to_core(core_identifier, core_needed_operation_name):
             return False
 
+        # core's input schemas are needed to read its inputs if they are resolved (see `SchemaTaggedMessage`)
+        for query_input in core_discover_query.inputs:
+            if query_input.compatibility != SchemaCompatibility.EXACT:
+                self.schema_registry.register_spec(query_input)
+
         return True
 
     async def _on_new_discover(self, discover_message: DiscoverMessage):
@@ -145,7 +274,8 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
             event.payload.core_identifier,
             keepalive_topic=event.payload.core_keepalive_topic,
             keepalive_request_topic=event.payload.core_keepalive_request_topic,
-            consider_me_dead_after=event.payload.considered_dead_after
+            consider_me_dead_after=event.payload.considered_dead_after,
+            schema_request_topic=event.payload.schema_request_topic
         )
 
         self.have_seen(event.payload.core_identifier)
@@ -169,7 +299,7 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
 
 
     def _build_operation_input_topic_for_core(self, core_identifier: str, operation_name: str) -> str:
-        return f"{operation_name}.{core_identifier}.{self.identifier}.input.{uuid4()}"
+        return f"{operation_name}.{core_identifier}.{self.identifier}.input.{rng.uuid4()}"
 
     async def _on_send_offer(self, offer_message: OfferMessage):
         """
@@ -191,8 +321,10 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
             offered_operations.append(
                 OfferedOperation(
                     name=operation_name,
-                    input=self.operations[operation_name].input,
-                    output=self.operations[operation_name].output
+                    input=self._shipped_schema_spec(self.operations[operation_name].input),
+                    output=self._shipped_schema_spec(self.operations[operation_name].output),
+                    free_slots=self.free_slots_for_operation(operation_name),
+                    load=self.operation_load(operation_name) if self.report_load else None
                 )
             )
 
@@ -213,7 +345,8 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
                     reply_topic=self.reply_topic,
                     plugin_keepalive_topic=self.keepalive_topic,
                     plugin_keepalive_request_topic=self.keepalive_request_topic,
-                    considered_dead_after=self.consider_others_dead_after
+                    considered_dead_after=self.consider_others_dead_after,
+                    schema_request_topic=self.schema_request_topic
                 )
 
             await self._on_send_offer(offer_message)
@@ -252,12 +385,14 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
         except Exception as e:
             logging.warning("%s: pending request ('%s', '%s') can not be removed", self, event.payload.core_identifier, event.payload.operation_name)
 
-    async def _setup_operation(self, core_identifier: str, operation_name: str, setup_data: Optional[bytes]):
+    async def _setup_operation(self, core_identifier: str, operation_name: str, setup_data: Optional[memoryview]):
         """
-        Hook called to set up operation when connection is created
+        Hook called to set up operation when connection is created.
+        Setup data is given as a memoryview, slice it instead of copying large payloads (use `bytes(setup_data)` if you need a copy)
         """
 
-    async def _plug_operation_into_core(self, core_identifier: str, response_topic: str, operation_name: str, setup_data: Optional[bytes]):
+    async def _plug_operation_into_core(self, core_identifier: str, response_topic: str, operation_name: str, setup_data: Optional[bytes],
+                                        compression_codec: Optional[str] = None):
         """
 
         Return (operation_input_topic, plugin_side_close_operation_connection_topic)
@@ -273,7 +408,24 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
         )
 
         try:
-            await self.eventbus_client.subscribe(operation_input_topic, self.operations[operation_name].handler)
+            operation = self.operations[operation_name]
+
+            operation_event_handler: Optional[OperationEventHandler] = None
+            if operation.handler is not None:
+                operation_event_handler = OperationEventHandler(
+                    plugin=self,
+                    operation_name=operation_name,
+                    handler=operation.handler,
+                    with_connection=operation.with_connection
+                )
+
+                # connection will be bound when it is created
+                self._operation_event_handlers[operation_input_topic] = operation_event_handler
+
+            await self.eventbus_client.subscribe(
+                operation_input_topic,
+                operation_event_handler
+            )
             topics_to_unsubscribe_if_error.append(operation_input_topic)
 
             await self.eventbus_client.subscribe(
@@ -286,7 +438,7 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
                 await self._setup_operation(
                     core_identifier,
                     operation_name,
-                    setup_data
+                    memoryview(setup_data)
                 )
 
             await self.eventbus_client.publish(
@@ -295,7 +447,8 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
                     plugin_identifier=self.identifier,
                     operation_name=operation_name,
                     operation_input_topic=operation_input_topic,
-                    plugin_side_close_operation_connection_topic=plugin_side_close_operation_connection_topic
+                    plugin_side_close_operation_connection_topic=plugin_side_close_operation_connection_topic,
+                    compression_codec=compression_codec
                 )
             )
 
@@ -305,6 +458,7 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
             logging.error("%s: error during plug operation '%s' into core '%s': %s", self, operation_name, core_identifier, repr(e))
 
             await self.eventbus_client.multi_unsubscribe(topics_to_unsubscribe_if_error, parallelize=True)
+            self._operation_event_handlers.pop(operation_input_topic, None)
 
             raise e
 
@@ -348,20 +502,30 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
                     self._remove_pending_request(pending_request)
 
                 else:
+                    compression_codec = choose_compression_codec(event.payload.compression_codecs, self.compression_codecs)
 
                     operation_input_topic, plugin_side_close_operation_connection_topic = await self._plug_operation_into_core(
                         core_identifier,
                         event.payload.response_topic,
                         operation_name,
-                        event.payload.setup_data
+                        event.payload.setup_data,
+                        compression_codec
                     )
 
+                    pending_request.compression_codec = compression_codec
+                    pending_request.compression_threshold = event.payload.compression_threshold
+                    pending_request.schema_resolution = event.payload.schema_resolution
+
                     pending_request.incoming_close_connection_topic = plugin_side_close_operation_connection_topic
                     pending_request.input_topic = operation_input_topic
                     pending_request.output_topic = event.payload.output_topic
                     pending_request.close_connection_to_remote_topic = event.payload.core_side_close_operation_connection_topic
 
-                    self._promote_pending_request_to_connection(pending_request)
+                    connection = self._promote_pending_request_to_connection(pending_request)
+
+                    operation_event_handler = self._operation_event_handlers.get(operation_input_topic)
+                    if connection is not None and operation_event_handler is not None:
+                        operation_event_handler.connection = connection
 
             except Exception as e:
                 logging.error("%s: error during confirm pending request': %s", self, repr(e))
@@ -405,15 +569,107 @@ class Plugin(OperationsProviderMixin, StateMachine, Orbiter):
             if connection.has_output:
                 tasks.append(
                     asyncio.create_task(
-                        self.eventbus_client.publish(
-                            connection.output_topic,
-                            data
-                        )
+                        self._publish_result(connection, data)
                     )
                 )
 
         await asyncio.gather(*tasks)  # wait publishes
 
+    async def reply(self, connection: Connection, data):
+        """
+        Send data as result directly on output topic of given connection (e.g. the one received by `with_connection` handlers,
+        or `get_current_operation_connection()`), nothing is sent if connection has not an output
+        """
+
+        if not connection.has_output:
+            return
+
+        await self._publish_result(connection, data)
+
+    async def reply_many(self, connection: Connection, data: Iterable):
+        """
+        Send each data as result on output topic of given connection, in order
+        """
+
+        if not connection.has_output:
+            return
+
+        headers = self._result_headers()
+
+        for item in data:
+            await self._publish_result(connection, item, headers=headers)
+
+    def _result_headers(self) -> Dict[str, str]:
+        """
+        Headers of results: correlation identifier of input event (if any) is copied, so core can match a call
+        """
+
+        headers: Dict[str, str] = {}
+
+        event = get_current_operation_event()
+        if event is not None:
+            reply_to = event_headers(event).get(REPLY_TO_HEADER)
+
+            if reply_to is not None:
+                headers[REPLY_TO_HEADER] = reply_to
+
+        return headers
+
+    async def _publish_result(self, connection: Connection, data, *, headers: Optional[Dict[str, str]] = None):
+        """
+        Publish data on output topic of connection (see `Connection.prepare`).
+        If tracer is set, a producer span is created and propagated
+        """
+
+        if headers is None:
+            headers = self._result_headers()
+        data = connection.prepare(data)
+
+        if self.tracer is None:
+            await self._publish(connection.output_topic, data, headers=headers)
+            return
+
+        with self.tracer.span(
+            f"result {connection.operation_name}",
+            kind=SpanKind.PRODUCER,
+            orbiter_identifier=self.identifier,
+            attributes={"topic": connection.output_topic, "core_identifier": connection.remote_identifier}
+        ) as span:
+            await self._publish(connection.output_topic, data, headers=Tracer.inject(span, headers))
+
+    async def send_stream_to_all(self, connections: List[Connection], items: AsyncIterable[StreamItem]):
+        """
+        Send items as a result stream to all connections which have a streaming output.
+        Items are pulled once, the slowest core sets the pace (see `stream_window`)
+        """
+
+        connections = [connection for connection in connections if connection.has_output and connection.output.streaming]
+
+        if len(connections) == 0:
+            return
+
+        await asyncio.gather(*[
+            self._publish_result_stream(connection, connection_items)
+            for connection, connection_items in zip(connections, tee_stream(items, len(connections), self.stream_window))
+        ])
+
+    async def _publish_result_stream(self, connection: Connection, items: AsyncIterable[StreamItem]):
+        """
+        Publish items as stream on output topic of connection. If tracer is set, a producer span is created and propagated
+        """
+
+        if self.tracer is None:
+            await self._publish_stream(connection.output_topic, items)
+            return
+
+        with self.tracer.span(
+            f"result {connection.operation_name}",
+            kind=SpanKind.PRODUCER,
+            orbiter_identifier=self.identifier,
+            attributes={"topic": connection.output_topic, "core_identifier": connection.remote_identifier, "stream": True}
+        ) as span:
+            await self._publish_stream(connection.output_topic, items, headers=Tracer.inject(span))
+
     def __str__(self):
         return f"Plugin('{self.identifier}')"
 
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from busline.client.subscriber.subscriber import Subscriber
+from busline.event.event import Event
+from busline.local.eventbus.eventbus import EventBus
+from orbitalis.utils.task import fire_and_forget_task
+
+
+@dataclass
+class SimulatedEventBus(EventBus):
+    """
+    In-memory event bus which simulates links: each delivery is delayed by `delay` plus a random jitter (up to `jitter` seconds)
+    and it is lost with probability `loss`. Randomness is seeded, and subscribers are notified in subscription order,
+    therefore simulations are deterministic.
+
+    It counts published messages by payload type, e.g. to measure control-plane traffic.
+
+    Author: Nicola Ricciardi
+    """
+
+    delay: float = field(default=0.0)
+    jitter: float = field(default=0.0)
+    loss: float = field(default=0.0)
+    seed: int = field(default=0)
+
+    subscriptions: Dict[str, Dict[Subscriber, None]] = field(default_factory=dict, init=False)     # topic => ordered subscribers
+
+    published: int = field(default=0, init=False)
+    delivered: int = field(default=0, init=False)
+    lost: int = field(default=0, init=False)
+    published_by_type: Counter = field(default_factory=Counter, init=False)     # payload type name => count
+
+    _random: random.Random = field(init=False)
+
+    def __post_init__(self):
+        if not 0 <= self.loss <= 1:
+            raise ValueError("loss must be in [0, 1]")
+
+        if self.delay < 0 or self.jitter < 0:
+            raise ValueError("delay and jitter must be >= 0")
+
+        self._random = random.Random(self.seed)
+
+    def reset_subscriptions(self):
+        self.subscriptions = dict()
+
+    def reset_counters(self):
+        self.published = 0
+        self.delivered = 0
+        self.lost = 0
+        self.published_by_type = Counter()
+
+    def add_subscriber(self, topic: str, subscriber: Subscriber):
+        self.subscriptions.setdefault(topic, dict())[subscriber] = None
+
+    def remove_subscriber(self, subscriber: Subscriber, topic: Optional[str] = None, raise_if_topic_missed: bool = False):
+        topics = list(self.subscriptions.keys()) if topic is None else [topic]
+
+        for name in topics:
+            subscribers = self.subscriptions.get(name)
+
+            if subscribers is None:
+                continue
+
+            subscribers.pop(subscriber, None)
+
+            if len(subscribers) == 0:
+                del self.subscriptions[name]
+
+    def _get_topic_subscriptions(self, topic: str) -> Set[Subscriber]:
+        return set(self.subscriptions.get(topic, ()))
+
+    def count(self, *message_types: type) -> int:
+        """
+        Return how many messages of given types were published
+        """
+
+        return sum(self.published_by_type[message_type.__name__] for message_type in message_types)
+
+    async def put_event(self, topic: str, event: Event):
+        self.published += 1
+        self.published_by_type[type(event.payload).__name__] += 1
+
+        subscribers = self.subscriptions.get(topic)
+
+        if not subscribers:
+            return
+
+        logging.debug("Simulated event on %s: %s", topic, event)
+
+        loop = asyncio.get_running_loop()
+
+        for subscriber in list(subscribers.keys()):
+            if self.loss > 0 and self._random.random() < self.loss:
+                self.lost += 1
+                continue
+
+            delay = self.delay
+
+            if self.jitter > 0:
+                delay += self._random.uniform(0, self.jitter)
+
+            loop.call_later(delay, self._deliver, subscriber, topic, event)
+
+    def _deliver(self, subscriber: Subscriber, topic: str, event: Event):
+        self.delivered += 1
+
+        fire_and_forget_task(subscriber.notify(topic, event))
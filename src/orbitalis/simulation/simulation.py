@@ -0,0 +1,145 @@
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Callable, Iterable, Coroutine, Any, TypeVar
+
+from busline.client.pubsub_client import PubSubClient, PubSubClientBuilder
+from busline.local.local_publisher import LocalPublisher
+from busline.local.local_subscriber import LocalSubscriber
+from orbitalis.core.core import Core
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.orbiter import Orbiter
+from orbitalis.simulation.eventbus import SimulatedEventBus
+from orbitalis.simulation.virtual_loop import VirtualTimeEventLoop
+from orbitalis.utils import clock, rng
+
+
+T = TypeVar("T")
+
+DEFAULT_CHECK_INTERVAL = 0.1
+
+
+@dataclass(kw_only=True)
+class Simulation:
+    """
+    Run orbiters in virtual time (see `VirtualTimeEventLoop`) over a simulated bus (see `SimulatedEventBus`),
+    so large fleets, link delays and message loss can be simulated deterministically without waiting wall-clock time.
+
+    Orbiters must be created using clients built by `build_client`, and they must be run using `run`,
+    which uses virtual time also as orbiters' clock.
+
+    Randomness of orbiters (e.g. plugin choice) and generated identifiers (orbiters' default identifiers, stream ids, topics, ...)
+    are drawn from a private generator seeded by `seed` (see `orbitalis.utils.rng`), which is used during `run` and, if simulation
+    is used as context manager, also while orbiters are created. Global random generator is not touched.
+    Therefore, orbiters created outside both of them must have explicit identifiers to be reproducible.
+
+    Author: Nicola Ricciardi
+    """
+
+    delay: float = field(default=0.0)
+    jitter: float = field(default=0.0)
+    loss: float = field(default=0.0)
+    seed: int = field(default=0)
+    start: Optional[datetime] = field(default=None)
+
+    loop: VirtualTimeEventLoop = field(init=False)
+    eventbus: SimulatedEventBus = field(init=False)
+    generator: random.Random = field(init=False)
+
+    _previous_generator: Optional[random.Random] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self.loop = VirtualTimeEventLoop(start=self.start)
+        self.eventbus = SimulatedEventBus(delay=self.delay, jitter=self.jitter, loss=self.loss, seed=self.seed)
+        self.generator = random.Random(self.seed)
+
+    def __enter__(self):
+        self._previous_generator = rng.set_generator(self.generator)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.close()
+        finally:
+            rng.set_generator(self._previous_generator)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Virtual seconds elapsed since simulation start
+        """
+
+        return self.loop.time()
+
+    def build_client(self) -> PubSubClient:
+        return PubSubClientBuilder().with_subscriber(LocalSubscriber(eventbus=self.eventbus)).with_publisher(
+            LocalPublisher(eventbus=self.eventbus)).build()
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run coroutine in virtual time and return its result, using simulation's random generator
+        """
+
+        with clock.using_clock(self.loop.now), rng.using_generator(self.generator):
+            return self.loop.run_until_complete(coroutine)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait_until(self, predicate: Callable[[], bool], *, timeout: float, check_interval: float = DEFAULT_CHECK_INTERVAL) -> Optional[float]:
+        """
+        Wait until predicate is true, return virtual seconds waited or None if timeout expired
+        """
+
+        started_at = self.loop.time()
+
+        while not predicate():
+            if self.loop.time() - started_at >= timeout:
+                return None
+
+            await asyncio.sleep(check_interval)
+
+        return self.loop.time() - started_at
+
+    async def wait_for_compliance(self, cores: Iterable[Core], *, timeout: float, check_interval: float = DEFAULT_CHECK_INTERVAL) -> Optional[float]:
+        """
+        Wait until all cores are compliant, return convergence time (virtual seconds) or None if timeout expired
+        """
+
+        cores = list(cores)
+
+        return await self.wait_until(
+            lambda: all(core.state == CoreState.COMPLIANT for core in cores),
+            timeout=timeout,
+            check_interval=check_interval
+        )
+
+    @staticmethod
+    async def start_all(orbiters: Iterable[Orbiter]):
+        await asyncio.gather(*[orbiter.start() for orbiter in orbiters])
+
+    @staticmethod
+    async def stop_all(orbiters: Iterable[Orbiter]):
+        await asyncio.gather(*[orbiter.stop() for orbiter in orbiters])
+
+    def close(self):
+        """
+        Cancel pending tasks (e.g. loops of orbiters which are not stopped) and close event loop
+        """
+
+        if self.loop.is_closed():
+            return
+
+        tasks = asyncio.all_tasks(self.loop)
+
+        for task in tasks:
+            task.cancel()
+
+        if len(tasks) > 0:
+            with clock.using_clock(self.loop.now):
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
@@ -0,0 +1,85 @@
+import asyncio
+import selectors
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+DEFAULT_SIMULATION_START = datetime(2025, 1, 1)
+
+
+class _VirtualTimeSelector(selectors.BaseSelector):
+    """
+    Selector which does not wait: when event loop would sleep until next timer, virtual time is advanced instead.
+    Real file objects (e.g. loop's self-pipe) are still polled
+    """
+
+    def __init__(self, loop: "VirtualTimeEventLoop"):
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        ready = self._selector.select(0)
+
+        if len(ready) > 0:
+            return ready
+
+        if timeout is None:
+            # nothing is scheduled, only real I/O (e.g. threads) can wake up event loop
+            return self._selector.select(None)
+
+        if timeout > 0:
+            self._loop.advance(timeout)
+
+        return []
+
+    def close(self):
+        self._selector.close()
+
+    def get_key(self, fileobj):
+        return self._selector.get_key(fileobj)
+
+    def get_map(self):
+        return self._selector.get_map()
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop in which time is virtual: timers (e.g. `asyncio.sleep`, `asyncio.wait_for`) fire as soon as
+    nothing else is ready, therefore loops of orbiters run without waiting wall-clock time.
+    Given the same inputs, execution is deterministic.
+
+    `now` returns virtual datetime, it should be used as orbiters' clock (see `orbitalis.utils.clock`).
+
+    Author: Nicola Ricciardi
+    """
+
+    def __init__(self, *, start: Optional[datetime] = None):
+        self._virtual_time = 0.0
+        self.start = DEFAULT_SIMULATION_START if start is None else start
+
+        super().__init__(_VirtualTimeSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        """
+        Move virtual time forward
+        """
+
+        if seconds < 0:
+            raise ValueError("virtual time can not go back")
+
+        self._virtual_time += seconds
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self._virtual_time)
@@ -0,0 +1,56 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List
+
+from orbitalis.tracing.span import Span
+
+
+class SpanExporter(ABC):
+    """
+    Receive ended spans, e.g. to send them to a tracing backend
+
+    Author: Nicola Ricciardi
+    """
+
+    @abstractmethod
+    def export(self, span: Span):
+        raise NotImplementedError()
+
+
+@dataclass
+class InMemorySpanExporter(SpanExporter):
+    """
+    Store ended spans in memory, useful in tests
+
+    Author: Nicola Ricciardi
+    """
+
+    spans: List[Span] = field(default_factory=list)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def spans_of_trace(self, trace_id: str) -> List[Span]:
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+    def spans_by_name(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self):
+        self.spans = []
+
+
+@dataclass
+class LoggingSpanExporter(SpanExporter):
+    """
+    Log ended spans
+
+    Author: Nicola Ricciardi
+    """
+
+    level: int = field(default=logging.DEBUG)
+
+    def export(self, span: Span):
+        logging.log(self.level, "span %s (trace: %s, span: %s, parent: %s): %.6fs", span.name, span.trace_id,
+                    span.span_id, span.parent_span_id, span.duration)
@@ -0,0 +1,92 @@
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Optional, Dict, Any, Self
+
+
+TRACEPARENT_VERSION = "00"
+TRACEPARENT_FLAGS = "01"
+
+
+def generate_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def generate_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+@dataclass(frozen=True)
+class TraceContext:
+    """
+    Minimal trace context propagated through messages (W3C traceparent-like)
+
+    Author: Nicola Ricciardi
+    """
+
+    trace_id: str
+    span_id: str
+
+    def to_traceparent(self) -> str:
+        return f"{TRACEPARENT_VERSION}-{self.trace_id}-{self.span_id}-{TRACEPARENT_FLAGS}"
+
+    @classmethod
+    def from_traceparent(cls, traceparent: str) -> Optional[Self]:
+        parts = traceparent.split("-")
+
+        if len(parts) != 4:
+            return None
+
+        _, trace_id, span_id, _ = parts
+
+        if len(trace_id) == 0 or len(span_id) == 0:
+            return None
+
+        return cls(trace_id=trace_id, span_id=span_id)
+
+
+class SpanKind(StrEnum):
+    PRODUCER = "PRODUCER"
+    CONSUMER = "CONSUMER"
+    INTERNAL = "INTERNAL"
+
+
+@dataclass(kw_only=True)
+class Span:
+    """
+    Timed unit of work. Timestamps are UNIX epoch seconds, because they must be comparable among orbiters
+
+    Author: Nicola Ricciardi
+    """
+
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=generate_span_id)
+    parent_span_id: Optional[str] = field(default=None)
+    kind: SpanKind = field(default=SpanKind.INTERNAL)
+    orbiter_identifier: Optional[str] = field(default=None)
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = field(default=None)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = field(default=None)
+
+    @property
+    def context(self) -> TraceContext:
+        return TraceContext(trace_id=self.trace_id, span_id=self.span_id)
+
+    @property
+    def is_ended(self) -> bool:
+        return self.end_time is not None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+
+        return self.end_time - self.start_time
+
+    def end(self, *, when: Optional[float] = None):
+        if self.end_time is None:
+            self.end_time = time.time() if when is None else when
@@ -0,0 +1,131 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterator, Tuple
+
+from busline.event.event import Event
+from orbitalis.tracing.exporter import SpanExporter, InMemorySpanExporter
+from orbitalis.tracing.span import Span, SpanKind, TraceContext, generate_trace_id
+from orbitalis.utils.event_headers import event_headers
+
+
+TRACEPARENT_HEADER = "traceparent"
+SENT_AT_HEADER = "sent_at"
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("orbitalis_current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@dataclass(kw_only=True)
+class Tracer:
+    """
+    Create spans and send them to exporter when they end.
+    Trace context is propagated through event headers (see `inject` and `extract`)
+
+    Author: Nicola Ricciardi
+    """
+
+    exporter: SpanExporter = field(default_factory=InMemorySpanExporter)
+
+    def start_span(self, name: str, *, kind: SpanKind = SpanKind.INTERNAL, parent: Optional[TraceContext] = None,
+                   orbiter_identifier: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """
+        Start a new span. If parent is not provided, current span is used as parent (if any)
+        """
+
+        if parent is None:
+            current_span = get_current_span()
+            if current_span is not None:
+                parent = current_span.context
+
+        return Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent is not None else generate_trace_id(),
+            parent_span_id=parent.span_id if parent is not None else None,
+            orbiter_identifier=orbiter_identifier,
+            attributes=attributes if attributes is not None else {}
+        )
+
+    def end_span(self, span: Span):
+        span.end()
+
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logging.error("%s: unable to export span %s: %s", self, span.name, repr(e))
+
+    @contextmanager
+    def span(self, name: str, **kwargs) -> Iterator[Span]:
+        """
+        Start a span, which becomes the current span until the end of the context
+        """
+
+        span = self.start_span(name, **kwargs)
+        token = _current_span.set(span)
+
+        try:
+            yield span
+
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    @classmethod
+    def inject(cls, span: Span, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Add span context and sending time to headers
+        """
+
+        if headers is None:
+            headers = {}
+
+        headers[TRACEPARENT_HEADER] = span.context.to_traceparent()
+        headers[SENT_AT_HEADER] = repr(time.time())
+
+        return headers
+
+    @classmethod
+    def extract(cls, event: Event) -> Tuple[Optional[TraceContext], Optional[float]]:
+        """
+        Return (trace context, sending time) carried by event, if any
+        """
+
+        headers = event_headers(event)
+
+        context: Optional[TraceContext] = None
+        if TRACEPARENT_HEADER in headers:
+            context = TraceContext.from_traceparent(headers[TRACEPARENT_HEADER])
+
+        sent_at: Optional[float] = None
+        if SENT_AT_HEADER in headers:
+            try:
+                sent_at = float(headers[SENT_AT_HEADER])
+            except ValueError:
+                pass
+
+        return context, sent_at
+
+    @contextmanager
+    def consume(self, name: str, event: Event, **kwargs) -> Iterator[Span]:
+        """
+        Open a consumer span child of the span which produced the event.
+        Time spent in broker (if sending time is known) is stored in `broker_latency` attribute
+        """
+
+        parent, sent_at = self.extract(event)
+
+        with self.span(name, kind=SpanKind.CONSUMER, parent=parent, **kwargs) as span:
+            if sent_at is not None:
+                span.attributes["broker_latency"] = max(0.0, span.start_time - sent_at)
+
+            yield span
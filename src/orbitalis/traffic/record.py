@@ -0,0 +1,165 @@
+import struct
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Optional, Tuple, Iterator
+
+from busline.event.event import Event
+from busline.event.message.message import Message
+from busline.event.message.number_message import Int64Message, Float64Message
+from busline.event.message.string_message import StringMessage
+from busline.event.registry import EventRegistry
+from orbitalis.utils.message import serialize_message
+
+
+TRAFFIC_FILE_MAGIC = b"ORBTRF\x00\x01"
+
+# kind, timestamp, lengths of: topic, source, message type, format type, event identifier, data
+_RECORD_HEADER = struct.Struct("<BdHHHHHI")
+
+
+class TrafficRecordKind(StrEnum):
+    """
+    - PUBLISH: message published by recorded client
+    - DELIVER: event delivered to recorded client
+
+    Author: Nicola Ricciardi
+    """
+
+    PUBLISH = "PUBLISH"
+    DELIVER = "DELIVER"
+
+
+_KIND_CODES = {TrafficRecordKind.PUBLISH: 0, TrafficRecordKind.DELIVER: 1}
+_KINDS = {code: kind for kind, code in _KIND_CODES.items()}
+
+
+def as_message(message: Optional[Message | str | int | float]) -> Optional[Message]:
+    """
+    Wrap primitive values as Busline publishers do
+    """
+
+    if isinstance(message, str):
+        return StringMessage(message)
+
+    if isinstance(message, int):
+        return Int64Message(message)
+
+    if isinstance(message, float):
+        return Float64Message(message)
+
+    return message
+
+
+@dataclass(frozen=True, kw_only=True)
+class TrafficRecord:
+    """
+    A recorded message. Payload is kept serialized: `message` deserializes it, message type must be in `EventRegistry`
+
+    Author: Nicola Ricciardi
+    """
+
+    kind: TrafficRecordKind
+    timestamp: float
+    topic: str
+    source: str
+    message_type: str       # empty if there is no payload
+    format_type: str
+    event_identifier: str
+    data: bytes
+
+    @classmethod
+    def from_message(cls, kind: TrafficRecordKind, timestamp: float, topic: str, source: str, message: Optional[Message],
+                     event_identifier: Optional[str] = None) -> "TrafficRecord":
+
+        if message is None:
+            message_type, format_type, data = "", "", b""
+        else:
+            message_type = EventRegistry.obj_to_type(message)
+            EventRegistry().add(type(message), message_type=message_type)
+            format_type, data = serialize_message(message)
+
+        return cls(
+            kind=kind,
+            timestamp=timestamp,
+            topic=topic,
+            source=source,
+            message_type=message_type,
+            format_type=format_type,
+            event_identifier="" if event_identifier is None else str(event_identifier),
+            data=data
+        )
+
+    @classmethod
+    def from_event(cls, kind: TrafficRecordKind, timestamp: float, topic: str, source: str, event: Event) -> "TrafficRecord":
+        return cls.from_message(kind, timestamp, topic, source, event.payload, event.identifier)
+
+    @property
+    def message(self) -> Optional[Message]:
+        if self.message_type == "":
+            return None
+
+        return EventRegistry().retrieve_class(self.message_type).deserialize(self.format_type, self.data)
+
+    def encode(self) -> bytes:
+        topic = self.topic.encode("utf-8")
+        source = self.source.encode("utf-8")
+        message_type = self.message_type.encode("utf-8")
+        format_type = self.format_type.encode("utf-8")
+        event_identifier = self.event_identifier.encode("utf-8")
+
+        return b"".join((
+            _RECORD_HEADER.pack(
+                _KIND_CODES[self.kind], self.timestamp,
+                len(topic), len(source), len(message_type), len(format_type), len(event_identifier), len(self.data)
+            ),
+            topic, source, message_type, format_type, event_identifier, self.data
+        ))
+
+    @classmethod
+    def decode_from(cls, buffer, offset: int) -> Tuple["TrafficRecord", int]:
+        """
+        Decode record which starts at offset of buffer (bytes, memoryview or mmap), return (record, offset of next record)
+        """
+
+        kind, timestamp, *lengths = _RECORD_HEADER.unpack_from(buffer, offset)
+        offset += _RECORD_HEADER.size
+
+        fields = []
+        for length in lengths:
+            fields.append(buffer[offset:offset + length])
+            offset += length
+
+        topic, source, message_type, format_type, event_identifier, data = fields
+
+        return cls(
+            kind=_KINDS[kind],
+            timestamp=timestamp,
+            topic=bytes(topic).decode("utf-8"),
+            source=bytes(source).decode("utf-8"),
+            message_type=bytes(message_type).decode("utf-8"),
+            format_type=bytes(format_type).decode("utf-8"),
+            event_identifier=bytes(event_identifier).decode("utf-8"),
+            data=bytes(data)
+        ), offset
+
+
+def iter_records(buffer) -> Iterator[TrafficRecord]:
+    """
+    Iterate records of a traffic file content (a truncated last record, e.g. due to a crash, is ignored)
+    """
+
+    if bytes(buffer[:len(TRAFFIC_FILE_MAGIC)]) != TRAFFIC_FILE_MAGIC:
+        raise ValueError("not a traffic file")
+
+    offset = len(TRAFFIC_FILE_MAGIC)
+    end = len(buffer)
+
+    while offset + _RECORD_HEADER.size <= end:
+        lengths = _RECORD_HEADER.unpack_from(buffer, offset)[2:]
+
+        if offset + _RECORD_HEADER.size + sum(lengths) > end:
+            return
+
+        record, offset = TrafficRecord.decode_from(buffer, offset)
+
+        yield record
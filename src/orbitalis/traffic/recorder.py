@@ -0,0 +1,138 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional, BinaryIO, Callable, Awaitable, List
+
+from busline.client.pubsub_client import PubSubClient
+from busline.client.subscriber.event_handler import event_handler
+from busline.client.subscriber.event_handler.event_handler import EventHandler
+from busline.event.event import Event
+from busline.event.message.message import Message
+from orbitalis.traffic.record import TrafficRecord, TrafficRecordKind, TRAFFIC_FILE_MAGIC, as_message
+from orbitalis.utils import clock
+
+
+@dataclass(kw_only=True)
+class TrafficRecorder:
+    """
+    Append traffic records to a file. Records are buffered, call `flush` (or `close`) to be sure they are written.
+    If file already exists, new records are appended
+
+    Author: Nicola Ricciardi
+    """
+
+    path: str
+    raise_exceptions: bool = field(default=False)
+
+    records: int = field(default=0, init=False)
+
+    _file: Optional[BinaryIO] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self._file = open(self.path, "ab")
+
+        if self._file.tell() == 0:
+            self._file.write(TRAFFIC_FILE_MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def append(self, record: TrafficRecord):
+        if self._file is None:
+            raise ValueError("recorder is closed")
+
+        self._file.write(record.encode())
+        self.records += 1
+
+    def record(self, kind: TrafficRecordKind, topic: str, source: str, message: Optional[Message], event_identifier: Optional[str] = None):
+        """
+        Record a message, errors are logged (raised only if raise_exceptions), so recording never breaks traffic
+        """
+
+        try:
+            self.append(TrafficRecord.from_message(kind, clock.now().timestamp(), topic, source, message, event_identifier))
+
+        except Exception as e:
+            logging.error("%s: %s", self, repr(e))
+
+            if self.raise_exceptions:
+                raise e
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __str__(self):
+        return f"TrafficRecorder('{os.path.basename(self.path)}')"
+
+
+@dataclass(kw_only=True)
+class _RecordingEventHandler(EventHandler):
+    handler: EventHandler
+    recorder: TrafficRecorder
+    source: str
+
+    async def handle(self, topic: str, event: Event):
+        self.recorder.record(TrafficRecordKind.DELIVER, topic, self.source, event.payload, event.identifier)
+
+        await self.handler.handle(topic, event)
+
+
+@dataclass(kw_only=True, eq=False)
+class RecordingPubSubClient(PubSubClient):
+    """
+    Client which records every published message and every delivered event (see `TrafficRecorder`),
+    then it works as the wrapped client. `source` is recorded together with messages (e.g. orbiter's identifier).
+
+    Events delivered to subscribers' default handler (i.e. subscribe without handler) are not recorded.
+
+    Author: Nicola Ricciardi
+    """
+
+    recorder: TrafficRecorder
+    source: str = field(default="")
+
+    @classmethod
+    def wrap(cls, client: PubSubClient, recorder: TrafficRecorder, source: str = "") -> "RecordingPubSubClient":
+        return cls(
+            publishers=client.publishers.copy(),
+            subscribers=client.subscribers.copy(),
+            recorder=recorder,
+            source=source
+        )
+
+    async def publish(self, topic: str, message: Optional[Message | str | int | float] = None, **kwargs):
+        message = as_message(message)
+
+        self.recorder.record(TrafficRecordKind.PUBLISH, topic, self.source, message, kwargs.get("event_identifier"))
+
+        await super().publish(topic, message, **kwargs)
+
+    async def multi_publish(self, topics: List[str], message: Optional[Message | str | int | float] = None, *, parallelize: bool = True, **kwargs):
+        message = as_message(message)
+
+        for topic in topics:
+            self.recorder.record(TrafficRecordKind.PUBLISH, topic, self.source, message, kwargs.get("event_identifier"))
+
+        await super().multi_publish(topics, message, parallelize=parallelize, **kwargs)
+
+    async def subscribe(self, topic: str, handler: Optional[EventHandler | Callable[[str, Event], Awaitable]] = None, **kwargs):
+        if handler is not None:
+            if not isinstance(handler, EventHandler):
+                handler = event_handler(handler)
+
+            handler = _RecordingEventHandler(handler=handler, recorder=self.recorder, source=self.source)
+
+        await super().subscribe(topic, handler, **kwargs)
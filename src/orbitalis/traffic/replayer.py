@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import mmap
+from dataclasses import dataclass, field
+from typing import Optional, Iterator, Set
+
+from busline.client.pubsub_client import PubSubClient
+from orbitalis.traffic.record import TrafficRecord, TrafficRecordKind, iter_records
+
+
+def read_traffic(path: str) -> Iterator[TrafficRecord]:
+    """
+    Iterate records of a traffic file, file is memory-mapped so it is not loaded in memory
+    """
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from iter_records(buffer)
+
+
+@dataclass(kw_only=True)
+class TrafficReplayer:
+    """
+    Publish again recorded messages (only PUBLISH records) using eventbus_client, respecting original timing
+    divided by `speed` (e.g. 10 means 10 times faster). If speed is None, messages are published as fast as possible.
+
+    Records can be filtered by source (e.g. replay only plugins' traffic to drive real cores) and by topic prefix.
+    Message types must be in `EventRegistry`, records which can not be deserialized are skipped.
+
+    Author: Nicola Ricciardi
+    """
+
+    path: str
+    eventbus_client: PubSubClient
+    speed: Optional[float] = field(default=1.0)
+    sources: Optional[Set[str]] = field(default=None)
+    topic_prefix: Optional[str] = field(default=None)
+    raise_exceptions: bool = field(default=False)
+
+    replayed: int = field(default=0, init=False)
+    skipped: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.speed is not None and self.speed <= 0:
+            raise ValueError("speed must be > 0")
+
+    def _must_be_replayed(self, record: TrafficRecord) -> bool:
+        if record.kind != TrafficRecordKind.PUBLISH:
+            return False
+
+        if self.sources is not None and record.source not in self.sources:
+            return False
+
+        if self.topic_prefix is not None and not record.topic.startswith(self.topic_prefix):
+            return False
+
+        return True
+
+    async def replay(self) -> int:
+        """
+        Replay traffic, return number of replayed messages
+        """
+
+        loop = asyncio.get_running_loop()
+
+        started_at: Optional[float] = None
+        first_timestamp: Optional[float] = None
+
+        for record in read_traffic(self.path):
+            if not self._must_be_replayed(record):
+                continue
+
+            if self.speed is not None:
+                if first_timestamp is None:
+                    first_timestamp = record.timestamp
+                    started_at = loop.time()
+
+                delay = started_at + (record.timestamp - first_timestamp) / self.speed - loop.time()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            try:
+                await self.eventbus_client.publish(
+                    record.topic,
+                    record.message,
+                    event_identifier=record.event_identifier if record.event_identifier != "" else None
+                )
+
+                self.replayed += 1
+
+            except Exception as e:
+                self.skipped += 1
+
+                logging.error("%s: %s", self, repr(e))
+
+                if self.raise_exceptions:
+                    raise e
+
+        return self.replayed
+
+    def __str__(self):
+        return f"TrafficReplayer('{self.path}')"
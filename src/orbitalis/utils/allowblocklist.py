@@ -1,17 +1,67 @@
+import fnmatch
+import re
 from dataclasses import dataclass,field
 from abc import ABC
-from typing import Optional, Dict, Set, List, Self
+from typing import Optional, Dict, Set, List, Self, FrozenSet, Tuple
 
 from dataclasses_avroschema import AvroModel
 
 
+GLOB_PREFIX = "glob:"      # entries which start with it are glob patterns, e.g. "glob:tenant-a.*"
+
+
+@dataclass(frozen=True)
+class IdentifierMatcher:
+    """
+    Membership test over a list of identifiers, compiled once:
+    plain identifiers are stored in a frozenset, glob patterns (entries prefixed by `GLOB_PREFIX`, e.g. "glob:tenant-a.*")
+    are joined in a single regex. Identifiers are never interpreted as patterns without prefix
+
+    Author: Nicola Ricciardi
+    """
+
+    identifiers: FrozenSet[str]
+    pattern: Optional[re.Pattern] = field(default=None)
+
+    @classmethod
+    def is_glob(cls, identifier: str) -> bool:
+        return identifier.startswith(GLOB_PREFIX)
+
+    @classmethod
+    def compile(cls, identifiers: List[str]) -> Self:
+        plain: Set[str] = set()
+        globs: List[str] = []
+
+        for identifier in identifiers:
+            if cls.is_glob(identifier):
+                globs.append(identifier[len(GLOB_PREFIX):])
+            else:
+                plain.add(identifier)
+
+        pattern: Optional[re.Pattern] = None
+        if len(globs) > 0:
+            pattern = re.compile("|".join(f"(?:{fnmatch.translate(glob)})" for glob in globs))
+
+        return cls(identifiers=frozenset(plain), pattern=pattern)
+
+    def __contains__(self, identifier: str) -> bool:
+        if identifier in self.identifiers:
+            return True
+
+        return self.pattern is not None and self.pattern.match(identifier) is not None
+
+
 @dataclass(kw_only=True)
 class AllowBlockListMixin(AvroModel, ABC):
     """
-    allowlist: admitted Orbs (by identifiers)
-    blocklist: not admitted Orbs (by identifiers)
+    allowlist: admitted Orbs (by identifiers or glob patterns, see `GLOB_PREFIX`)
+    blocklist: not admitted Orbs (by identifiers or glob patterns, see `GLOB_PREFIX`)
     priority: identifier => priority (int)
 
+    Lists are still serialized as lists, but membership is checked using cached matchers (see `IdentifierMatcher`).
+    Each matcher is cached together with its list and it is rebuilt when list is replaced;
+    call `refresh_matchers` after in-place modifications (e.g. `blocklist[0] = "x"`).
+
     Author: Nicola Ricciardi
     """
 
@@ -26,12 +76,42 @@ class AllowBlockListMixin(AvroModel, ABC):
     def allow_only(cls, identifier: str) -> Self:
         return cls(allowlist=[identifier])
 
+    def refresh_matchers(self):
+        """
+        Drop cached matchers, they are rebuilt on next check. It must be called after lists are modified in-place
+        """
+
+        object.__setattr__(self, "_matchers", {})
+
+    def _matcher(self, list_name: str) -> Optional[IdentifierMatcher]:
+        identifiers: Optional[List[str]] = getattr(self, list_name)
+
+        if identifiers is None:
+            return None
+
+        matchers: Optional[Dict[str, Tuple[List[str], IdentifierMatcher]]] = self.__dict__.get("_matchers")    # list_name => (list, matcher)
+
+        if matchers is None:
+            matchers = {}
+            object.__setattr__(self, "_matchers", matchers)
+
+        cached = matchers.get(list_name)
+
+        if cached is not None and cached[0] is identifiers:
+            return cached[1]
+
+        matcher = IdentifierMatcher.compile(identifiers)
+        matchers[list_name] = (identifiers, matcher)
+
+        return matcher
+
     def is_compatible(self, identifier: str) -> bool:
-        if self.blocklist is not None and identifier in self.blocklist:
+        blocklist = self._matcher("blocklist")
+        if blocklist is not None and identifier in blocklist:
             return False
 
-        if self.allowlist is not None and identifier not in self.allowlist:
+        allowlist = self._matcher("allowlist")
+        if allowlist is not None and identifier not in allowlist:
             return False
 
         return True
-
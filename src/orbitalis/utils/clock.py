@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+
+_clock: Callable[[], datetime] = datetime.now
+
+
+def now() -> datetime:
+    """
+    Return current datetime according to orbiters' clock, i.e. system clock unless another clock is set (e.g. by simulations)
+    """
+
+    return _clock()
+
+
+def set_clock(clock: Optional[Callable[[], datetime]] = None):
+    """
+    Set function used by orbiters to know current datetime, system clock is restored if None
+    """
+
+    global _clock
+
+    _clock = datetime.now if clock is None else clock
+
+
+@contextmanager
+def using_clock(clock: Callable[[], datetime]):
+    """
+    Use clock in the context, then previous clock is restored
+    """
+
+    previous = _clock
+    set_clock(clock)
+
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
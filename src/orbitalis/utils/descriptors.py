@@ -0,0 +1,21 @@
+from typing import Dict, Type, TypeVar
+
+D = TypeVar("D")
+
+
+def collect_class_descriptors(cls: type, descriptor_type: Type[D]) -> Dict[str, D]:
+    """
+    Return attribute name => descriptor of all descriptors of given type defined by class or its bases,
+    following MRO (i.e. an attribute overridden by a subclass is not a descriptor anymore if subclass redefines it as something else)
+    """
+
+    descriptors: Dict[str, D] = {}
+
+    for klass in reversed(cls.__mro__):
+        for attr_name, value in vars(klass).items():
+            if isinstance(value, descriptor_type):
+                descriptors[attr_name] = value
+            else:
+                descriptors.pop(attr_name, None)
+
+    return descriptors
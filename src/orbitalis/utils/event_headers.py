@@ -0,0 +1,59 @@
+from typing import Dict, Optional, Tuple
+
+from busline.event.event import Event
+from orbitalis.utils import rng
+
+
+HEADERS_SEPARATOR = ";"
+HEADER_KEY_VALUE_SEPARATOR = "="
+
+REPLY_TO_HEADER = "reply_to"     # correlation identifier of a call, it is copied by plugins in related results
+
+
+def encode_event_identifier(headers: Dict[str, str], identifier: Optional[str] = None) -> str:
+    """
+    Busline events have no headers, therefore headers are appended to the event identifier:
+
+    <identifier>;<key>=<value>;<key>=<value>
+
+    If identifier is not provided, a new UUID is generated
+    """
+
+    if identifier is None:
+        identifier = str(rng.uuid4())
+
+    if len(headers) == 0:
+        return identifier
+
+    return HEADERS_SEPARATOR.join(
+        [identifier] + [f"{key}{HEADER_KEY_VALUE_SEPARATOR}{value}" for key, value in headers.items()]
+    )
+
+
+def decode_event_identifier(event_identifier: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Split an event identifier built by `encode_event_identifier` into (identifier, headers)
+    """
+
+    if HEADERS_SEPARATOR not in event_identifier:
+        return event_identifier, {}
+
+    identifier, *raw_headers = event_identifier.split(HEADERS_SEPARATOR)
+
+    headers: Dict[str, str] = {}
+    for raw_header in raw_headers:
+        key, _, value = raw_header.partition(HEADER_KEY_VALUE_SEPARATOR)
+        headers[key] = value
+
+    return identifier, headers
+
+
+def event_headers(event: Event) -> Dict[str, str]:
+    """
+    Return headers carried by event identifier
+    """
+
+    if not isinstance(event.identifier, str):
+        return {}
+
+    return decode_event_identifier(event.identifier)[1]
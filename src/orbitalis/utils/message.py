@@ -0,0 +1,20 @@
+from typing import Tuple
+
+from busline.event.message.avro_message import AvroMessageMixin, AVRO_FORMAT_TYPE
+from busline.event.message.message import Message, BYTES_FORMAT_TYPE
+from orbitalis.events.raw import RawMessage
+
+
+def serialize_message(message: Message) -> Tuple[str, bytes]:
+    """
+    Serialize message using its natural format: raw messages as bytes, Avro messages as Avro
+    (some Busline messages do not support a default format), otherwise message's default format is used
+    """
+
+    if isinstance(message, RawMessage):
+        return message.serialize(format_type=BYTES_FORMAT_TYPE)
+
+    if isinstance(message, AvroMessageMixin):
+        return message.serialize(format_type=AVRO_FORMAT_TYPE)
+
+    return message.serialize()
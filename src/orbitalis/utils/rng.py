@@ -0,0 +1,67 @@
+import random
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Sequence, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+_generator: Optional[random.Random] = None
+
+
+def choice(sequence: Sequence[T]) -> T:
+    """
+    Choose a random element, using the set generator if any (e.g. by simulations), otherwise the global one
+    """
+
+    if _generator is None:
+        return random.choice(sequence)
+
+    return _generator.choice(sequence)
+
+
+def sample(sequence: Sequence[T], k: int) -> List[T]:
+    if _generator is None:
+        return random.sample(sequence, k)
+
+    return _generator.sample(sequence, k)
+
+
+def uuid4() -> uuid.UUID:
+    """
+    Return a random UUID: it is generated using the set generator if any (so it is reproducible), otherwise `uuid.uuid4` is used
+    """
+
+    if _generator is None:
+        return uuid.uuid4()
+
+    return uuid.UUID(int=_generator.getrandbits(128), version=4)
+
+
+def set_generator(random_generator: Optional[random.Random] = None) -> Optional[random.Random]:
+    """
+    Set random generator used by orbiters (global one is restored if None), return previous one
+    """
+
+    global _generator
+
+    previous = _generator
+    _generator = random_generator
+
+    return previous
+
+
+@contextmanager
+def using_generator(random_generator: random.Random):
+    """
+    Use random generator in the context, then previous generator is restored
+    """
+
+    previous = _generator
+    set_generator(random_generator)
+
+    try:
+        yield random_generator
+    finally:
+        set_generator(previous)
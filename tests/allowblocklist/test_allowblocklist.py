@@ -0,0 +1,70 @@
+import copy
+import unittest
+
+from orbitalis.core.requirement import Constraint
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import Policy
+
+
+class TestAllowBlockList(unittest.TestCase):
+
+    def test_allowlist(self):
+        policy = Policy(allowlist=["core1", "glob:tenant-a.*"])
+
+        self.assertTrue(policy.is_compatible("core1"))
+        self.assertTrue(policy.is_compatible("tenant-a.core"))
+        self.assertFalse(policy.is_compatible("core2"))
+        self.assertFalse(policy.is_compatible("tenant-b.core"))
+
+        policy.allowlist.append("core2")
+        policy.refresh_matchers()
+        self.assertTrue(policy.is_compatible("core2"))
+
+        policy.allowlist = ["core3"]
+        self.assertFalse(policy.is_compatible("core1"))
+        self.assertTrue(policy.is_compatible("core3"))
+
+    def test_blocklist(self):
+        constraint = Constraint(
+            blocklist=["glob:plugin?"],
+            inputs=[Input.empty()],
+            outputs=[Output.no_output()]
+        )
+
+        self.assertFalse(constraint.is_compatible("plugin1"))
+        self.assertTrue(constraint.is_compatible("plugin10"))
+
+        constraint_copy = copy.deepcopy(constraint)
+        constraint_copy.blocklist.remove("glob:plugin?")
+        constraint_copy.refresh_matchers()
+
+        self.assertTrue(constraint_copy.is_compatible("plugin1"))
+        self.assertFalse(constraint.is_compatible("plugin1"))
+
+    def test_in_place_replacement(self):
+        policy = Policy(blocklist=["tenant-b", "tenant-c"])
+
+        self.assertTrue(policy.is_compatible("tenant-a"))
+
+        policy.blocklist[0] = "tenant-a"
+        policy.refresh_matchers()
+        self.assertFalse(policy.is_compatible("tenant-a"))
+        self.assertTrue(policy.is_compatible("tenant-b"))
+
+        policy.blocklist[1] = "glob:tenant-?"
+        policy.refresh_matchers()
+        self.assertFalse(policy.is_compatible("tenant-d"))
+
+    def test_plain_identifiers_are_not_globs(self):
+        policy = Policy(allowlist=["core[1]", "core*"])
+
+        self.assertTrue(policy.is_compatible("core[1]"))
+        self.assertTrue(policy.is_compatible("core*"))
+        self.assertFalse(policy.is_compatible("core1"))
+        self.assertFalse(policy.is_compatible("core2"))
+
+    def test_serialization(self):
+        policy = Policy(allowlist=["core1", "glob:core*"])
+        policy.is_compatible("core1")
+
+        self.assertEqual(Policy.deserialize(policy.serialize()), policy)
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from busline.event.event import Event
+from busline.event.message.number_message import Int64Message
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class BurstPlugin(Plugin):
+
+    @operation(
+        name="burst",
+        input=Input.int64(),
+        output=Output.int64()
+    )
+    async def burst_event_handler(self, topic: str, event: Event[Int64Message]):
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="burst")
+
+        for i in range(event.payload.value):
+            await self.send_result_to_all(connections, Int64Message(i))
+
+
+@dataclass
+class BatchCore(Core):
+    batches: List[List[int]] = field(default_factory=list)
+
+    @sink("burst", batch_size=10, max_delay=0.5)
+    async def burst_sink(self, operation_name: str, batch: List[Tuple[str, Event[Int64Message]]]):
+        self.batches.append([event.payload.value for topic, event in batch])
+
+
+class TestBatchSink(unittest.IsolatedAsyncioTestCase):
+
+    async def test_batches(self):
+        plugin = BurstPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = BatchCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "burst": OperationRequirement(Constraint(
+                    inputs=[Input.int64()],
+                    outputs=[Output.int64()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("burst", Int64Message(25), any=True)
+
+        await asyncio.sleep(0.2)
+
+        self.assertEqual([len(batch) for batch in core.batches], [10, 10])
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual([len(batch) for batch in core.batches], [10, 10, 5])
+        self.assertEqual(sum(core.batches, []), list(range(25)))
+
+        await core.execute("burst", Int64Message(3), any=True)
+        await asyncio.sleep(0.1)
+
+        await plugin.stop()
+        await core.stop()
+
+        self.assertEqual(core.batches[-1], [0, 1, 2])   # flushed on stop
+
+        await asyncio.sleep(1)
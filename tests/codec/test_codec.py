@@ -0,0 +1,116 @@
+import unittest
+
+from busline.event.message.avro_message import AVRO_FORMAT_TYPE
+from busline.event.message.string_message import StringMessage
+from dataclasses_avroschema import AvroModel
+from dataclasses import dataclass
+
+from orbitalis.core.requirement import Constraint
+from orbitalis.events.close_connection import GracefulCloseConnectionMessage, CloseConnectionAckMessage
+from orbitalis.events.codec import COMPACT_FORMAT_TYPE, CompactMessageMixin, encode_compact, _Writer
+from orbitalis.events.discover import DiscoverMessage, DiscoverQuery
+from orbitalis.events.keepalive import KeepaliveMessage
+from orbitalis.events.offer import OfferMessage, OfferedOperation
+from orbitalis.events.reply import RequestOperationMessage
+from orbitalis.orbiter.schemaspec import Input, Output
+
+
+@dataclass(frozen=True, kw_only=True)
+class Pep604Message(CompactMessageMixin):
+    name: str
+    count: int | None = None
+    tags: list[str] | None = None
+
+
+@dataclass
+class CustomMessage(AvroModel):
+    text: str
+    counter: int
+
+
+class TestCodec(unittest.TestCase):
+
+    def build_discover_message(self) -> DiscoverMessage:
+        queries = {}
+        for operation_name in ("lowercase", "uppercase", "reverse"):
+            queries[operation_name] = DiscoverQuery.from_constraint(operation_name, Constraint(
+                inputs=[Input.string(), Input.from_message(CustomMessage)],
+                outputs=[Output.string()],
+                blocklist=["plugin-1", "plugin-2"]
+            ))
+
+        return DiscoverMessage(
+            core_identifier="core-identifier",
+            offer_topic="$handshake.core-identifier.offer",
+            core_keepalive_topic="$keepalive.core-identifier",
+            core_keepalive_request_topic="$keepalive.core-identifier.request",
+            considered_dead_after=120.5,
+            queries=queries
+        )
+
+    def assert_round_trip(self, message):
+        format_type, serialized_data = message.serialize()
+        self.assertEqual(format_type, COMPACT_FORMAT_TYPE)
+
+        self.assertEqual(type(message).deserialize(format_type, serialized_data), message)
+
+        format_type, serialized_data = message.serialize(format_type=AVRO_FORMAT_TYPE)
+        self.assertEqual(type(message).deserialize(format_type, serialized_data), message)
+
+    def test_round_trip(self):
+        self.assert_round_trip(self.build_discover_message())
+
+        self.assert_round_trip(OfferMessage(
+            plugin_identifier="plugin",
+            offered_operations=[OfferedOperation(name="lowercase", input=Input.string(), output=Output.string().as_stream())],
+            reply_topic="$handshake.plugin.reply",
+            considered_dead_after=-1.0,
+            plugin_keepalive_topic="$keepalive.plugin",
+            plugin_keepalive_request_topic="$keepalive.plugin.request"
+        ))
+
+        self.assert_round_trip(RequestOperationMessage(
+            core_identifier="core",
+            operation_name="lowercase",
+            response_topic="$handshake.core.response",
+            output_topic=None,
+            core_side_close_operation_connection_topic="lowercase.core.plugin.close",
+            setup_data=b"\x00\x01"
+        ))
+
+        self.assert_round_trip(GracefulCloseConnectionMessage(from_identifier="core", operation_name="lowercase", ack_topic="ack", data=None))
+        self.assert_round_trip(CloseConnectionAckMessage(from_identifier="core", operation_name="lowercase"))
+        self.assert_round_trip(KeepaliveMessage(from_identifier="àèì"))
+
+    def test_size(self):
+        message = self.build_discover_message()
+
+        _, compact = message.serialize()
+        _, avro = message.serialize(format_type=AVRO_FORMAT_TYPE)
+
+        self.assertLess(len(compact) * 3, len(avro))
+
+        _, compact = KeepaliveMessage(from_identifier="core").serialize()
+        self.assertEqual(compact, b"\x04core")
+
+    def test_known_schema_by_fingerprint(self):
+        _, compact = OfferMessage(
+            plugin_identifier="p",
+            offered_operations=[OfferedOperation(name="op", input=Input.string(), output=Output.no_output())],
+            reply_topic="r",
+            considered_dead_after=1.0,
+            plugin_keepalive_topic="k",
+            plugin_keepalive_request_topic="kr"
+        ).serialize()
+
+        self.assertNotIn(StringMessage.avro_schema().encode(), compact)
+
+    def test_pep604_optional(self):
+        for message in (Pep604Message(name="a"), Pep604Message(name="a", count=-3, tags=["x", "x"])):
+            self.assertEqual(Pep604Message.deserialize(*message.serialize()), message)
+
+    def test_negative_varint(self):
+        with self.assertRaises(ValueError):
+            _Writer().varint(-1)
+
+        self.assertIsInstance(encode_compact(Pep604Message(name="a", count=-(2 ** 62))), bytes)    # signed ints are zig-zag encoded
@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field, replace
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.events.compressed import CompressedMessage
+from orbitalis.orbiter.compression import Compression, CompressionCodec, compress_message, decompress_message, \
+    choose_compression_codec
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.utils.message import serialize_message
+from tests.utils import build_new_local_client
+
+
+LONG_TEXT = "lorem ipsum dolor sit amet " * 200
+
+
+@dataclass
+class UppercasePlugin(Plugin):
+    received: List[object] = field(default_factory=list)
+
+    @operation(
+        name="uppercase",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def uppercase_event_handler(self, topic: str, event: Event[StringMessage]):
+        self.received.append(event.payload)
+
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="uppercase")
+
+        await self.send_result_to_all(connections, StringMessage(event.payload.value.upper()))
+
+
+@dataclass
+class UppercaseCore(Core):
+    results: List[object] = field(default_factory=list)
+
+    @sink("uppercase")
+    async def uppercase_sink(self, topic: str, event: Event[StringMessage]):
+        self.results.append(event.payload)
+
+
+class TestCompressMessage(unittest.TestCase):
+
+    def test_round_trip(self):
+        for codec in CompressionCodec:
+            compressed = compress_message(StringMessage(LONG_TEXT), codec, 1024)
+
+            self.assertIsInstance(compressed, CompressedMessage)
+            self.assertLess(len(compressed.data), len(LONG_TEXT))
+            self.assertEqual(decompress_message(compressed), StringMessage(LONG_TEXT))
+
+            # compressed envelope survives serialization
+            format_type, data = compressed.serialize()
+            self.assertEqual(decompress_message(CompressedMessage.deserialize(format_type, data)), StringMessage(LONG_TEXT))
+
+    def test_threshold(self):
+        wrapped = compress_message(StringMessage("short"), CompressionCodec.ZLIB, 1024)
+
+        # serialized payload is reused as it is
+        self.assertIsNone(wrapped.codec)
+        self.assertEqual(wrapped.data, serialize_message(StringMessage("short"))[1])
+        self.assertEqual(decompress_message(wrapped), StringMessage("short"))
+
+        self.assertIsNone(compress_message(None, CompressionCodec.ZLIB, 0))
+
+    def test_unknown_codec(self):
+        compressed = compress_message(StringMessage(LONG_TEXT), CompressionCodec.ZLIB, 0)
+
+        with self.assertRaises(ValueError):
+            decompress_message(replace(compressed, codec="snappy"))
+
+    def test_negotiation(self):
+        self.assertEqual(choose_compression_codec(["lzma", "zlib"], ["zlib"]), "zlib")
+        self.assertIsNone(choose_compression_codec(["lzma"], ["zlib"]))
+        self.assertIsNone(choose_compression_codec([], list(CompressionCodec)))
+
+        with self.assertRaises(ValueError):
+            Compression(codecs=("snappy",))
+
+
+class TestConnectionCompression(unittest.IsolatedAsyncioTestCase):
+
+    async def run_scenario(self, compression, plugin_codecs) -> tuple:
+        plugin = UppercasePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            compression_codecs=plugin_codecs
+        )
+
+        core = UppercaseCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "uppercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ), compression=compression)
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("uppercase", StringMessage(LONG_TEXT), all=True)
+        await core.execute("uppercase", StringMessage("short"), all=True)
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(plugin.received, [StringMessage(LONG_TEXT), StringMessage("short")])
+        self.assertEqual(core.results, [StringMessage(LONG_TEXT.upper()), StringMessage("SHORT")])
+
+        core_connection = core.retrieve_connections(operation_name="uppercase")[0]
+        plugin_connection = plugin.retrieve_connections(operation_name="uppercase")[0]
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+        return core_connection, plugin_connection
+
+    async def test_negotiated(self):
+        core_connection, plugin_connection = await self.run_scenario(
+            Compression(codecs=(CompressionCodec.LZMA, CompressionCodec.ZLIB), threshold=512),
+            [CompressionCodec.ZLIB]
+        )
+
+        self.assertEqual(core_connection.compression_codec, CompressionCodec.ZLIB)
+        self.assertEqual(plugin_connection.compression_codec, CompressionCodec.ZLIB)
+        self.assertEqual(plugin_connection.compression_threshold, 512)
+        self.assertIsInstance(core_connection.prepare(StringMessage(LONG_TEXT)), CompressedMessage)
+
+    async def test_not_supported_by_plugin(self):
+        core_connection, plugin_connection = await self.run_scenario(Compression(), [])
+
+        self.assertIsNone(core_connection.compression_codec)
+        self.assertIsNone(plugin_connection.compression_codec)
@@ -0,0 +1,105 @@
+import unittest
+from dataclasses import FrozenInstanceError
+
+from orbitalis.orbiter.compatibility import SchemaCompatibility
+from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.pending_request import PendingRequest
+from orbitalis.orbiter.schemaspec import Input, Output
+
+
+def build_connection(remote_identifier: str) -> Connection:
+    return Connection(
+        operation_name="".join(["op", "eration"]),
+        remote_identifier=remote_identifier,
+        incoming_close_connection_topic=f"operation.core.{remote_identifier}.close",
+        close_connection_to_remote_topic=f"operation.{remote_identifier}.core.close",
+        input_topic=f"operation.{remote_identifier}.input",
+        output_topic="".join(["operation.core.", "output"]),
+        input=Input.string(),
+        output=Output.float64()
+    )
+
+
+class TestConnectionRecords(unittest.IsolatedAsyncioTestCase):
+
+    def test_slots(self):
+        connection = build_connection("plugin")
+
+        self.assertFalse(hasattr(connection, "__dict__"))
+        self.assertFalse(hasattr(PendingRequest(operation_name="operation", remote_identifier="plugin"), "__dict__"))
+
+    async def test_lazy_lock(self):
+        connection = build_connection("plugin")
+        pending_request = PendingRequest(operation_name="operation", remote_identifier="plugin")
+
+        self.assertIsNone(connection._lock)
+        self.assertIsNone(pending_request._lock)
+
+        async with connection.lock:
+            self.assertTrue(connection.lock.locked())
+
+        self.assertIs(connection.lock, connection._lock)
+
+        async with pending_request.lock:
+            self.assertTrue(pending_request.lock.locked())
+
+    def test_shared_values(self):
+        a = build_connection("plugin1")
+        b = build_connection("plugin2")
+
+        self.assertIs(a.operation_name, b.operation_name)
+        self.assertIs(a.output_topic, b.output_topic)
+        self.assertIs(a.input, b.input)
+        self.assertIs(a.output, b.output)
+
+        # shared spec is a copy, therefore original one can be still modified
+        input = Input.string()
+        shared = input.interned()
+        input.schemas.append("other")
+
+        self.assertIsNot(shared, input)
+        self.assertEqual(shared, Input.string())
+
+    def test_shared_spec_is_frozen(self):
+        a = build_connection("plugin1")
+        b = build_connection("plugin2")
+
+        with self.assertRaises(FrozenInstanceError):
+            a.input.streaming = True
+
+        stream_input = a.input.as_stream()
+
+        self.assertTrue(stream_input.streaming)
+        self.assertFalse(b.input.streaming)
+        self.assertFalse(a.input.with_compatibility(SchemaCompatibility.FULL) is a.input)
+        self.assertEqual(b.input.compatibility, SchemaCompatibility.EXACT)
+        self.assertIsInstance(a.input.schemas, tuple)
+        self.assertEqual(a.input, Input.string())
+
+    def test_builders_in_place(self):
+        input = Input.string()
+
+        self.assertIs(input.as_stream(), input)
+        self.assertIs(input.with_empty_support(), input)
+        self.assertTrue(input.streaming)
+        self.assertTrue(input.support_empty_schema)
+
+        # not interned specs can be assigned
+        input.streaming = False
+        self.assertFalse(input.streaming)
+
+    def test_promotion(self):
+        pending_request = PendingRequest(
+            operation_name="operation",
+            remote_identifier="plugin",
+            input=Input.string(),
+            output=Output.no_output(),
+            input_topic="operation.plugin.input",
+            incoming_close_connection_topic="operation.core.plugin.close",
+            close_connection_to_remote_topic="operation.plugin.core.close",
+        )
+
+        connection = pending_request.into_connection()
+
+        self.assertEqual(connection.input, Input.string())
+        self.assertIs(connection.output, Output.no_output().interned())
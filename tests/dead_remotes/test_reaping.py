@@ -0,0 +1,194 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.events.discover import DiscoverMessage
+from orbitalis.orbiter.pending_request import PendingRequest
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+    @operation(
+        name="silent",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def silent_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass    # result is never sent
+
+
+@dataclass
+class EchoCore(Core):
+    discovers: List[DiscoverMessage] = field(default_factory=list)
+    reaped: List[str] = field(default_factory=list)
+
+    async def _on_send_discover(self, discover_message: DiscoverMessage):
+        self.discovers.append(discover_message)
+
+    async def _on_dead_remotes_reaped(self, remote_identifiers: List[str]):
+        self.reaped.extend(remote_identifiers)
+
+        await super()._on_dead_remotes_reaped(remote_identifiers)
+
+
+class TestDeadRemotesReaping(unittest.IsolatedAsyncioTestCase):
+
+    def test_deadline_index(self):
+        core = EchoCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            consider_others_dead_after=10
+        )
+
+        now = datetime.now()
+        core.have_seen("alive", when=now - timedelta(seconds=5))
+        core.have_seen("dead", when=now - timedelta(seconds=20))
+
+        # keepalive does not push new entries
+        for _ in range(100):
+            core.have_seen("alive")
+
+        self.assertEqual(len(core._dead_deadlines), 2)
+        self.assertEqual(core.pop_dead_remote_identifiers(), ["dead"])
+        self.assertEqual(core.pop_dead_remote_identifiers(), [])
+        self.assertEqual(core._scheduled_dead_deadlines.keys(), {"alive"})
+
+    async def test_reaping(self):
+        plugin = EchoPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = EchoCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            consider_others_dead_after=10,
+            operation_requirements={
+                "echo": OperationRequirement(Constraint(
+                    minimum=1,
+                    inputs=[Input.string()],
+                    outputs=[Output.no_output()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+        self.assertEqual(len(core.retrieve_connections(remote_identifier=plugin.identifier)), 1)
+
+        discovers = len(core.discovers)
+
+        # plugin silent for too long
+        core.have_seen(plugin.identifier, when=datetime.now() - timedelta(seconds=60))
+
+        self.assertEqual(await core.reap_dead_remotes(), 1)
+
+        self.assertEqual(core.reaped, [plugin.identifier])
+        self.assertEqual(core.retrieve_connections(remote_identifier=plugin.identifier), [])
+        self.assertNotIn(plugin.identifier, core._remote_keepalive_topics)
+        self.assertNotIn(plugin.identifier, core._remote_keepalive_request_topics)
+        self.assertNotIn(plugin.identifier, core._last_seen)
+        self.assertNotIn(plugin.identifier, core._pending_requests)
+        self.assertEqual(core.state, CoreState.NOT_COMPLIANT)
+
+        # rediscovery is immediate
+        self.assertEqual(len(core.discovers), discovers + 1)
+
+        self.assertEqual(await core.reap_dead_remotes(), 0)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+    async def test_forget_remote_takes_pending_request_locks(self):
+        core = EchoCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False
+        )
+
+        pending_request = PendingRequest("echo", "dead")
+        core._add_pending_request(pending_request)
+
+        async with pending_request.lock:
+            forget = asyncio.create_task(core._forget_remote("dead"))
+            await asyncio.sleep(0.1)
+
+            self.assertFalse(forget.done())
+            self.assertTrue(core._is_pending("dead", "echo"))
+
+        await forget
+
+        self.assertNotIn("dead", core._pending_requests)
+
+    async def test_pending_call_of_reaped_plugin(self):
+        plugin = EchoPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = EchoCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            consider_others_dead_after=10,
+            operation_requirements={
+                "silent": OperationRequirement(Constraint(
+                    minimum=1,
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        call = asyncio.create_task(core.call("silent", StringMessage("hello")))     # no timeout
+        await asyncio.sleep(0.5)
+
+        core.have_seen(plugin.identifier, when=datetime.now() - timedelta(seconds=60))
+
+        self.assertEqual(await core.reap_dead_remotes(), 1)
+
+        with self.assertRaises(ConnectionError):
+            await asyncio.wait_for(call, 1)
+
+        self.assertEqual(len(core._pending_calls), 0)
+        self.assertEqual(len(core._pending_call_plugins), 0)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
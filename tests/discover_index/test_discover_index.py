@@ -0,0 +1,52 @@
+import unittest
+
+from busline.event.message.number_message import Int64Message
+from busline.event.message.string_message import StringMessage
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import Operation, Policy
+from tests.text_processor.lowercase_text_processor_plugin import LowercaseTextProcessorPlugin
+from tests.utils import build_new_local_client
+
+
+class TestDiscoverIndex(unittest.TestCase):
+
+    def test_schema_fingerprint(self):
+        self.assertEqual(
+            schema_fingerprint('{"type": "record", "name": "A", "fields": []}'),
+            schema_fingerprint('{"fields":[],"name":"A","type":"record"}')
+        )
+
+        self.assertNotEqual(
+            schema_fingerprint(StringMessage.avro_schema()),
+            schema_fingerprint(Int64Message.avro_schema())
+        )
+
+        self.assertEqual(schema_fingerprint("not a json"), schema_fingerprint("not a json"))
+
+    def test_operations_index(self):
+        plugin = LowercaseTextProcessorPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False
+        )
+
+        plugin.compile_operations_index()
+
+        input_signature, output_signature = plugin.operation_signatures("lowercase")
+
+        self.assertEqual(input_signature, Input.string().signature)
+        self.assertEqual(output_signature, Output.string().signature)
+        self.assertNotEqual(input_signature, Input.int64().signature)
+
+        self.assertIsNone(plugin.operation_signatures("uppercase"))
+
+        # operation replaced without `with_operation`, index must be refreshed lazily
+        plugin.operations["lowercase"] = Operation(
+            name="lowercase",
+            handler=None,
+            input=Input.no_input(),
+            output=Output.int64(),
+            policy=Policy.no_constraints()
+        )
+
+        self.assertEqual(plugin.operation_signatures("lowercase"), (Input.no_input().signature, Output.int64().signature))
@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.failure_detector import PhiAccrualFailureDetector
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+    received: List[str] = field(default_factory=list)
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        self.received.append(event.payload.value)
+
+
+class TestPhiAccrualFailureDetector(unittest.IsolatedAsyncioTestCase):
+
+    def test_phi(self):
+        detector = PhiAccrualFailureDetector(min_std=0.1)
+
+        start = datetime.now()
+        for i in range(10):
+            detector.heartbeat("remote", start + timedelta(seconds=i))
+
+        last = start + timedelta(seconds=9)
+
+        self.assertEqual(detector.phi("unknown"), 0)
+        self.assertLess(detector.phi("remote", now=last + timedelta(seconds=0.5)), 1)
+        self.assertGreater(detector.phi("remote", now=last + timedelta(seconds=2)), 8)
+
+        # suspicion grows over time
+        self.assertLess(
+            detector.phi("remote", now=last + timedelta(seconds=1.2)),
+            detector.phi("remote", now=last + timedelta(seconds=1.5))
+        )
+
+    def test_jitter(self):
+        detector = PhiAccrualFailureDetector()
+
+        start = datetime.now()
+        when = start
+        detector.heartbeat("jittery", start)
+        detector.heartbeat("regular", start)
+        for i in range(20):
+            when += timedelta(seconds=1 if i % 2 == 0 else 3)
+            detector.heartbeat("jittery", when)
+            detector.heartbeat("regular", start + timedelta(seconds=2 * (i + 1)))
+
+        self.assertAlmostEqual(detector.jitter("jittery"), 1, places=3)
+        self.assertAlmostEqual(detector.jitter("regular"), 0, places=3)
+
+        # same silence, jittery remote is less suspected
+        now = when + timedelta(seconds=5)
+        self.assertLess(detector.phi("jittery", now=now), detector.phi("regular", now=start + timedelta(seconds=45)))
+
+    def test_keepalive_margin(self):
+        plugin = EchoPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            send_keepalive_before_timelimit=2
+        )
+
+        plugin._others_considers_me_dead_after["core"] = 100
+
+        # only keepalive arrivals widen margin (e.g. handshake messages do not)
+        when = datetime.now()
+        for i in range(20):
+            when += timedelta(seconds=0.1 if i % 2 == 0 else 30)
+            plugin.have_seen("core", when=when)
+
+        self.assertEqual(plugin.keepalive_margin("core"), 2)
+        self.assertNotIn("core", plugin.failure_detector)      # phi learns from the same keepalive arrivals
+
+        when = datetime.now()
+        plugin.have_seen("core", when=when, keepalive=True)
+        for i in range(20):
+            when += timedelta(seconds=1 if i % 2 == 0 else 3)
+            plugin.have_seen("core", when=when, keepalive=True)
+
+        self.assertAlmostEqual(plugin.keepalive_jitter("core"), 2, places=3)
+        self.assertAlmostEqual(plugin.keepalive_margin("core"), 8, places=3)
+
+        # widening is bounded to a fraction of dead time
+        plugin.keepalive_jitter_multiplier = 100
+        self.assertEqual(plugin.keepalive_margin("core"), 25)
+
+    async def test_avoid_suspected_plugins(self):
+        plugins = [
+            EchoPlugin(
+                identifier=f"plugin{i}",
+                eventbus_client=build_new_local_client(),
+                with_loop=False,
+                raise_exceptions=True
+            )
+            for i in range(2)
+        ]
+
+        core = Core(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "echo": OperationRequirement(Constraint(
+                    minimum=2,
+                    inputs=[Input.string()],
+                    outputs=[Output.no_output()],
+                ))
+            }
+        )
+
+        for plugin in plugins:
+            await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        healthy, suspected = plugins
+
+        # forget keepalive arrived after handshake
+        core.failure_detector.clear()
+
+        now = datetime.now()
+        for i in range(10, 0, -1):
+            core.have_seen(healthy.identifier, when=now - timedelta(seconds=i), keepalive=True)
+            core.have_seen(suspected.identifier, when=now - timedelta(seconds=30 + i), keepalive=True)
+
+        self.assertFalse(core.is_suspected(healthy.identifier))
+        self.assertTrue(core.is_suspected(suspected.identifier))
+        self.assertEqual(core.suspected_remote_identifiers, [suspected.identifier])
+
+        for i in range(10):
+            plugin_identifier = await core.execute("echo", StringMessage(str(i)), any=True)
+            self.assertEqual(plugin_identifier, {healthy.identifier})
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(len(healthy.received), 10)
+        self.assertEqual(len(suspected.received), 0)
+
+        # if every plugin is suspected, they are used anyway
+        core.suspicion_threshold = 0
+        await core.execute("echo", StringMessage("all suspected"), any=True)
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(len(healthy.received) + len(suspected.received), 11)
+
+        for plugin in plugins:
+            await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,249 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.load import PluginLoadTable
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.events.keepalive import KeepaliveMessage, LoadKeepaliveMessage
+from orbitalis.events.load import OperationLoad
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.load import OperationLoadTracker, percentile
+from orbitalis.plugin.operation import operation, Policy
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.simulation.simulation import Simulation
+from orbitalis.utils import clock
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class GatedEchoPlugin(Plugin):
+    """
+    Plugin whose operation waits until gate is open
+    """
+
+    received: List[str] = field(default_factory=list)
+    gate: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output(),
+        default_policy=Policy(maximum=5)
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        await self.gate.wait()
+        self.received.append(event.payload.value)
+
+
+def build_core(**kwargs) -> Core:
+    return Core(
+        eventbus_client=kwargs.pop("eventbus_client", None) or build_new_local_client(),
+        raise_exceptions=True,
+        operation_requirements={
+            "echo": OperationRequirement(Constraint(
+                minimum=kwargs.pop("minimum", 1),
+                inputs=[Input.string()],
+                outputs=[Output.no_output()],
+            ))
+        },
+        **kwargs
+    )
+
+
+class TestLoadReports(unittest.IsolatedAsyncioTestCase):
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+
+        self.assertIsNone(percentile([], 0.5))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3.0], 0.99), 3)
+
+    def test_tracker(self):
+        tracker = OperationLoadTracker(operation_name="echo", durations_window=4)
+
+        tracker.started()
+        tracker.started()
+        tracker.finished(1)
+
+        for duration in (2, 3, 4, 5):
+            tracker.started()
+            tracker.finished(duration)
+
+        report = tracker.report(free_slots=3)
+
+        self.assertEqual(report, OperationLoad(name="echo", in_flight=1, queue_depth=0, p50=3, p99=5, free_slots=3))
+        self.assertEqual(report.pressure, 1)
+        self.assertEqual(tracker.invocations, 5)
+
+        with self.assertRaises(ValueError):
+            OperationLoadTracker(operation_name="echo", durations_window=0)
+
+    def test_load_table(self):
+        table = PluginLoadTable()
+        now = clock.now()
+
+        table.update("plugin", [OperationLoad(name="echo", in_flight=2)], when=now - timedelta(seconds=10))
+
+        self.assertIn("plugin", table)
+        self.assertEqual(table.get("plugin", "echo").in_flight, 2)
+        self.assertIsNone(table.get("plugin", "echo", max_age=5, now=now))
+        self.assertIsNone(table.get("plugin", "unknown"))
+        self.assertEqual(list(table.of_plugin("plugin").keys()), ["echo"])
+
+        table.forget("plugin")
+        self.assertNotIn("plugin", table)
+
+    def test_default_max_age(self):
+        core = Core(eventbus_client=build_new_local_client(), with_loop=False)
+
+        # report piggybacked on a regular keepalive, minutes ago
+        core.plugin_loads.update("plugin", [OperationLoad(name="echo", in_flight=2)], when=clock.now() - timedelta(seconds=110))
+        self.assertIsNone(core.plugin_load("plugin", "echo"))
+
+        core.plugin_loads.update("plugin", [OperationLoad(name="echo", in_flight=3)])
+        self.assertEqual(core.plugin_load("plugin", "echo").in_flight, 3)
+
+    async def test_keepalive_carries_load(self):
+        plugin = GatedEchoPlugin(
+            identifier="plugin",
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = build_core(with_loop=False)
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        # offer carries load too
+        self.assertEqual(core.plugin_load("plugin", "echo"), OperationLoad(name="echo", free_slots=5))
+
+        for i in range(3):
+            await core.execute("echo", StringMessage(str(i)), any=True, fire_and_forget=True)
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(plugin.operation_load("echo").in_flight, 3)
+
+        self.assertIsInstance(plugin._build_keepalive_message(core.identifier), LoadKeepaliveMessage)
+
+        await plugin.send_keepalive(core.identifier)
+        await asyncio.sleep(0.5)
+
+        load = core.plugin_load("plugin", "echo")
+        self.assertEqual(load.in_flight, 3)
+        self.assertEqual(load.free_slots, 4)
+        self.assertIsNone(load.p50)
+
+        plugin.gate.set()
+        await asyncio.sleep(0.5)
+
+        await plugin.send_keepalive(core.identifier)
+        await asyncio.sleep(0.5)
+
+        load = core.plugin_load("plugin", "echo")
+        self.assertEqual(load.in_flight, 0)
+        self.assertIsNotNone(load.p50)
+        self.assertGreaterEqual(load.p99, load.p50)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+    def test_keepalive_without_load(self):
+        plugin = GatedEchoPlugin(eventbus_client=build_new_local_client(), with_loop=False, report_load=False)
+
+        self.assertEqual(plugin._build_keepalive_message("core"), KeepaliveMessage(from_identifier=plugin.identifier))
+
+        # no operations lent to core
+        plugin.report_load = True
+        self.assertEqual(plugin._build_keepalive_message("core"), KeepaliveMessage(from_identifier=plugin.identifier))
+
+        with self.assertRaises(ValueError):
+            GatedEchoPlugin(eventbus_client=build_new_local_client(), load_report_interval=0)
+
+    async def test_load_aware_routing(self):
+        plugins = [
+            GatedEchoPlugin(
+                identifier=f"plugin{i}",
+                eventbus_client=build_new_local_client(),
+                with_loop=False,
+                raise_exceptions=True
+            )
+            for i in range(2)
+        ]
+
+        core = build_core(with_loop=False, minimum=2, load_aware_routing=True)
+
+        for plugin in plugins:
+            plugin.gate.set()
+            await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        busy, free = plugins
+        core.plugin_loads.update(busy.identifier, [OperationLoad(name="echo", in_flight=10)])
+
+        for i in range(10):
+            plugin_identifier = await core.execute("echo", StringMessage(str(i)), any=True)
+            self.assertEqual(plugin_identifier, {free.identifier})
+
+        # stale reports are ignored
+        core.load_report_max_age = 10
+        core.plugin_loads.update(free.identifier, [OperationLoad(name="echo", in_flight=20)], when=clock.now() - timedelta(seconds=60))
+
+        for i in range(10):
+            plugin_identifier = await core.execute("echo", StringMessage(str(i)), any=True)
+            self.assertEqual(plugin_identifier, {free.identifier})
+
+        for plugin in plugins:
+            await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+
+class TestPeriodicLoadReports(unittest.TestCase):
+
+    def test_load_report_interval(self):
+        with Simulation(delay=0.01) as simulation:
+            plugin = GatedEchoPlugin(identifier="plugin", eventbus_client=simulation.build_client(), load_report_interval=1)
+            core = build_core(eventbus_client=simulation.build_client())
+
+            async def scenario():
+                await simulation.start_all([plugin, core])
+
+                convergence_time = await simulation.wait_for_compliance([core], timeout=30)
+
+                simulation.eventbus.reset_counters()
+                await simulation.sleep(20)
+
+                keepalives = simulation.eventbus.count(LoadKeepaliveMessage)
+                reported_at = core.plugin_loads.reported_at("plugin", "echo")
+
+                await simulation.stop_all([core, plugin])
+
+                return convergence_time, keepalives, (clock.now() - reported_at).total_seconds()
+
+            convergence_time, keepalives, report_age = simulation.run(scenario())
+
+            self.assertIsNotNone(convergence_time)
+            self.assertGreaterEqual(keepalives, 15)     # at least one each load_report_interval
+            self.assertLessEqual(report_age, 2)
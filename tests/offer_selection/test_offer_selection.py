@@ -0,0 +1,168 @@
+import unittest
+from dataclasses import dataclass
+from typing import List, Optional
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.offer_selection import OfferCandidate
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.events.offer import OfferedOperation
+from orbitalis.orbiter.pending_request import PendingRequest
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation, Policy
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.simulation.simulation import Simulation
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+def build_core(identifier: str, eventbus_client, *, maximum: Optional[int] = 1, mandatory: Optional[List[str]] = None,
+               offer_collection_window: Optional[float] = 1) -> Core:
+    return Core(
+        identifier=identifier,
+        eventbus_client=eventbus_client,
+        discovering_interval=5,
+        offer_collection_window=offer_collection_window,
+        operation_requirements={
+            "echo": OperationRequirement(Constraint(
+                minimum=1,
+                maximum=maximum,
+                mandatory=mandatory or [],
+                inputs=[Input.string()],
+                outputs=[Output.no_output()],
+            ))
+        }
+    )
+
+
+def build_plugin(identifier: str, eventbus_client, maximum: Optional[int]) -> EchoPlugin:
+    plugin = EchoPlugin(identifier=identifier, eventbus_client=eventbus_client)
+    plugin.operations["echo"].policy = Policy(maximum=maximum)
+
+    return plugin
+
+
+def candidate(plugin_identifier: str, free_slots: Optional[int], latency: float) -> OfferCandidate:
+    return OfferCandidate(
+        plugin_identifier=plugin_identifier,
+        reply_topic=f"{plugin_identifier}.reply",
+        offered_operation=OfferedOperation(name="echo", input=Input.string(), output=Output.no_output(), free_slots=free_slots),
+        latency=latency
+    )
+
+
+class TestOfferSelection(unittest.IsolatedAsyncioTestCase):
+
+    async def test_ranking(self):
+        core = build_core("core", build_new_local_client(), maximum=2, mandatory=["mandatory_plugin"])
+
+        selected, rejected = core._select_offers_for_operation("echo", [
+            candidate("busy_plugin", 1, 0.01),
+            candidate("free_plugin", 10, 0.5),
+            candidate("mandatory_plugin", 1, 0.9),
+            candidate("unlimited_plugin", None, 0.2),
+        ])
+
+        self.assertEqual([c.plugin_identifier for c in selected], ["mandatory_plugin", "unlimited_plugin"])
+        self.assertEqual({c.plugin_identifier for c in rejected}, {"busy_plugin", "free_plugin"})
+
+    async def test_latency_breaks_ties(self):
+        core = build_core("core", build_new_local_client(), maximum=1)
+
+        selected, rejected = core._select_offers_for_operation("echo", [
+            candidate("slow_plugin", 5, 0.5),
+            candidate("fast_plugin", 5, 0.1),
+        ])
+
+        self.assertEqual([c.plugin_identifier for c in selected], ["fast_plugin"])
+        self.assertEqual([c.plugin_identifier for c in rejected], ["slow_plugin"])
+
+    async def test_pending_requests_reserve_slots(self):
+        core = build_core("core", build_new_local_client(), maximum=1)
+        core._add_pending_request(PendingRequest(
+            operation_name="echo",
+            remote_identifier="requested_plugin",
+            input=Input.string(),
+            output=Output.no_output()
+        ))
+
+        selected, rejected = core._select_offers_for_operation("echo", [candidate("plugin", 5, 0.1)])
+
+        self.assertEqual(len(selected), 0)
+        self.assertEqual(len(rejected), 1)
+
+    async def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            build_core("core", build_new_local_client(), offer_collection_window=-1)
+
+
+class TestOfferCollectionWindow(unittest.TestCase):
+
+    def test_least_busy_plugin_is_selected(self):
+        with Simulation(delay=0.05, jitter=0.05, seed=1) as simulation:
+            plugins = [
+                build_plugin("small_plugin", simulation.build_client(), maximum=2),
+                build_plugin("big_plugin", simulation.build_client(), maximum=10),
+                build_plugin("medium_plugin", simulation.build_client(), maximum=4),
+            ]
+
+            core = build_core("core", simulation.build_client())
+
+            async def scenario():
+                await simulation.start_all(plugins)
+                await simulation.start_all([core])
+
+                convergence_time = await simulation.wait_for_compliance([core], timeout=30)
+
+                await simulation.sleep(2)
+
+                connected = {connection.remote_identifier for connection in core.retrieve_connections(operation_name="echo")}
+                free_slots = {plugin.identifier: plugin.free_slots_for_operation("echo") for plugin in plugins}
+
+                await simulation.stop_all([core])
+                await simulation.stop_all(plugins)
+
+                return convergence_time, connected, free_slots
+
+            convergence_time, connected, free_slots = simulation.run(scenario())
+
+            self.assertIsNotNone(convergence_time)
+            self.assertEqual(connected, {"big_plugin"})
+            self.assertEqual(free_slots, {"small_plugin": 2, "big_plugin": 9, "medium_plugin": 4})    # rejected offers release slots
+
+    def test_maximum_is_not_exceeded(self):
+        with Simulation(delay=0.05, jitter=0.05, seed=1) as simulation:
+            plugins = [build_plugin(f"plugin{i}", simulation.build_client(), maximum=None) for i in range(5)]
+            cores = [build_core(f"core{i}", simulation.build_client(), maximum=2) for i in range(10)]
+
+            async def scenario():
+                await simulation.start_all(plugins)
+                await simulation.start_all(cores)
+
+                convergence_time = await simulation.wait_for_compliance(cores, timeout=30)
+
+                await simulation.sleep(10)
+
+                connections = [len(core.retrieve_connections(operation_name="echo")) for core in cores]
+
+                await simulation.stop_all(cores)
+                await simulation.stop_all(plugins)
+
+                return convergence_time, connections
+
+            convergence_time, connections = simulation.run(scenario())
+
+            self.assertIsNotNone(convergence_time)
+            self.assertEqual(connections, [2] * 10)
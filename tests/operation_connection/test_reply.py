@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation, get_current_operation_connection
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class SplitPlugin(Plugin):
+
+    @operation(
+        name="split",
+        input=Input.string(),
+        output=Output.string(),
+        with_connection=True
+    )
+    async def split_event_handler(self, topic: str, event: Event[StringMessage], connection: Connection):
+        await self.reply_many(connection, (StringMessage(word) for word in event.payload.value.split()))
+
+    @operation(
+        name="upper",
+        input=Input.string(),
+        output=Output.string(),
+        with_connection=True
+    )
+    async def upper_event_handler(self, topic: str, event: Event[StringMessage], connection: Connection):
+        await self.reply(get_current_operation_connection(), StringMessage(event.payload.value.upper()))
+
+
+@dataclass
+class SplitCore(Core):
+    words: List[str] = field(default_factory=list)
+
+    @sink("split")
+    async def split_sink(self, topic: str, event: Event[StringMessage]):
+        self.words.append(event.payload.value)
+
+
+class TestReply(unittest.IsolatedAsyncioTestCase):
+
+    async def test_reply(self):
+        plugin = SplitPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = SplitCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "split": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                )),
+                "upper": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                )),
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("split", StringMessage("a quick brown fox"), all=True)
+
+        # reply keeps correlation of calls
+        result = await core.call("upper", StringMessage("hello"), timeout=2)
+        self.assertEqual(result.value, "HELLO")
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(core.words, ["a", "quick", "brown", "fox"])
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class TextPlugin(Plugin):
+    connections: List[Connection] = field(default_factory=list)
+
+    @operation(
+        name="uppercase",
+        input=Input.string(),
+        output=Output.string(),
+        with_connection=True
+    )
+    async def uppercase_event_handler(self, topic: str, event: Event[StringMessage], connection: Connection):
+        self.connections.append(connection)
+
+        await self.send_result_to_all([connection], StringMessage(event.payload.value.upper()))
+
+    @operation(
+        name="letters",
+        input=Input.string(),
+        output=Output.string(),
+        with_connection=True
+    )
+    async def letters_event_handler(self, topic: str, event: Event[StringMessage], connection: Connection):
+        for letter in event.payload.value:
+            yield StringMessage(letter)
+
+
+@dataclass
+class TextCore(Core):
+    results: List[str] = field(default_factory=list)
+    letters: List[str] = field(default_factory=list)
+
+    @sink("uppercase")
+    async def uppercase_sink(self, topic: str, event: Event[StringMessage]):
+        self.results.append(event.payload.value)
+
+    @sink("letters")
+    async def letters_sink(self, topic: str, event: Event[StringMessage]):
+        self.letters.append(event.payload.value)
+
+
+class TestWithConnection(unittest.IsolatedAsyncioTestCase):
+
+    async def test_connection_injection(self):
+        plugin = TextPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = TextCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "uppercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                )),
+                "letters": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string().as_stream()],
+                )),
+            }
+        )
+
+        self.assertTrue(plugin.operations["uppercase"].with_connection)
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        connection = plugin.retrieve_connections(operation_name="uppercase")[0]
+        self.assertIsNone(connection.last_use)
+
+        # connection is bound at plug time
+        self.assertIs(plugin._operation_event_handlers[connection.input_topic].connection, connection)
+
+        await core.execute("uppercase", StringMessage("hello"), all=True)
+        await core.execute("uppercase", StringMessage("world"), all=True)
+        await core.execute("letters", StringMessage("abc"), all=True)
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(core.results, ["HELLO", "WORLD"])
+        self.assertEqual(core.letters, ["a", "b", "c"])
+        self.assertEqual(plugin.connections, [connection, connection])
+        self.assertIsNotNone(connection.last_use)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(plugin._operation_event_handlers, {})
@@ -0,0 +1,117 @@
+import unittest
+from dataclasses import dataclass
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.sink import sink
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation, Operation, Policy
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+evaluated_properties: List[str] = []
+
+
+@dataclass
+class BasePlugin(Plugin):
+
+    @property
+    def expensive(self) -> int:
+        evaluated_properties.append("expensive")
+        return 42
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+    @operation(
+        name="shout",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def shout_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+@dataclass
+class DerivedPlugin(BasePlugin):
+
+    async def shout_event_handler(self, topic: str, event: Event[StringMessage]):     # no longer an operation
+        pass
+
+    @operation(
+        name="whisper",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def whisper_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+@dataclass
+class EchoCore(Core):
+
+    @property
+    def expensive(self) -> int:
+        evaluated_properties.append("expensive")
+        return 42
+
+    @sink("echo")
+    async def echo_sink(self, topic: str, event: Event):
+        pass
+
+
+class TestClassRegistry(unittest.TestCase):
+
+    def setUp(self):
+        evaluated_properties.clear()
+
+    def test_operations_collected_per_class(self):
+        self.assertEqual(set(BasePlugin._operation_descriptors.keys()), {"echo_event_handler", "shout_event_handler"})
+        self.assertEqual(set(DerivedPlugin._operation_descriptors.keys()), {"echo_event_handler", "whisper_event_handler"})
+
+        plugin = DerivedPlugin(eventbus_client=build_new_local_client(), with_loop=False)
+
+        self.assertEqual(set(plugin.operations.keys()), {"echo", "whisper"})
+
+        # properties are not evaluated on creation
+        self.assertEqual(evaluated_properties, [])
+
+    def test_provided_operations_are_kept(self):
+        custom = Operation(
+            name="echo",
+            handler=None,
+            input=Input.no_input(),
+            output=Output.no_output(),
+            policy=Policy.no_constraints()
+        )
+
+        plugin = BasePlugin(eventbus_client=build_new_local_client(), with_loop=False, operations={"echo": custom})
+
+        self.assertIs(plugin.operations["echo"], custom)
+        self.assertIn("shout", plugin.operations)
+
+    def test_instances_do_not_share_operations(self):
+        plugins = [BasePlugin(eventbus_client=build_new_local_client(), with_loop=False) for _ in range(2)]
+
+        self.assertIsNot(plugins[0].operations["echo"], plugins[1].operations["echo"])
+
+    def test_sinks_collected_per_class(self):
+        core = EchoCore(eventbus_client=build_new_local_client(), with_loop=False)
+
+        self.assertEqual(set(core.operation_sinks.keys()), {"echo"})
+        self.assertEqual(evaluated_properties, [])
+
+    def test_orbiter_post_init_runs(self):
+        with self.assertRaises(ValueError):
+            BasePlugin(eventbus_client=build_new_local_client(), with_loop=False, send_keepalive_before_timelimit=-1)
+
+        with self.assertRaises(ValueError):
+            EchoCore(eventbus_client=build_new_local_client(), with_loop=False, send_keepalive_before_timelimit=-1)
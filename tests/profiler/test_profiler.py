@@ -0,0 +1,91 @@
+import asyncio
+import time
+import unittest
+from dataclasses import dataclass
+from typing import override
+
+from orbitalis.orbiter.profiler import Profiler
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class BlockingPlugin(Plugin):
+    """
+    Plugin which blocks event loop during every loop iteration
+    """
+
+    @override
+    async def _on_loop_iteration(self):
+        time.sleep(0.05)
+
+
+class TestProfiler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_slow_invocation_stack(self):
+        profiler = Profiler(slow_threshold=0.01)
+
+        async def slow():
+            await asyncio.sleep(0.05)
+
+        async def fast():
+            return 42
+
+        self.assertEqual(await profiler.measure("fast", fast()), 42)
+        await profiler.measure("slow", slow())
+
+        self.assertEqual(profiler.phases["fast"].count, 1)
+        self.assertEqual(profiler.phases["slow"].count, 1)
+
+        self.assertEqual(len(profiler.slow_invocations), 1)
+
+        slow_invocation = profiler.slow_invocations[0]
+        self.assertEqual(slow_invocation.name, "slow")
+        self.assertIn("slow", slow_invocation.location)
+        self.assertIn("sleep", slow_invocation.stack)
+
+    async def test_single_watchdog(self):
+        profiler = Profiler(slow_threshold=0.05)
+
+        async def fast():
+            return 42
+
+        async def slow():
+            await asyncio.sleep(0.1)
+
+        for _ in range(100):
+            await profiler.measure("fast", fast())
+
+        watchdog = profiler._watchdog
+        self.assertIsNotNone(watchdog)
+
+        await asyncio.gather(*[profiler.measure("slow", slow()) for _ in range(3)])
+
+        self.assertEqual(len(profiler._running), 0)
+        self.assertEqual(len(profiler.slow_invocations), 3)
+        self.assertTrue(all("sleep" in slow_invocation.stack for slow_invocation in profiler.slow_invocations))
+
+        await asyncio.sleep(0.1)
+        self.assertIsNone(profiler._watchdog)     # not re-armed without running invocations
+
+    async def test_loop_profiling(self):
+        plugin = BlockingPlugin(
+            eventbus_client=build_new_local_client(),
+            loop_interval=0.1,
+            profiler=Profiler(slow_threshold=0.02)
+        )
+
+        await plugin.start()
+
+        await asyncio.sleep(0.5)
+
+        await plugin.stop()
+
+        report = plugin.profiler.report()
+
+        self.assertGreater(report["loop._on_loop_iteration"]["count"], 0)
+        self.assertGreaterEqual(report["loop._on_loop_iteration"]["max"], 0.05)
+        self.assertIn("loop.send_keepalive_based_on_connections_and_threshold", report)
+        self.assertIn("loop_lag", report)
+
+        self.assertTrue(any(s.name == "loop._on_loop_iteration" for s in plugin.profiler.slow_invocations))
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import Optional, List
+
+from busline.event.event import Event
+from busline.event.message.message import BYTES_FORMAT_TYPE
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.events.raw import RawMessage
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class ChecksumPlugin(Plugin):
+    setup_data: Optional[memoryview] = None
+    received: List[RawMessage] = field(default_factory=list)
+
+    async def _setup_operation(self, core_identifier: str, operation_name: str, setup_data: Optional[memoryview]):
+        self.setup_data = setup_data
+
+    @operation(
+        name="checksum",
+        input=Input.raw(),
+        output=Output.raw()
+    )
+    async def checksum_event_handler(self, topic: str, event: Event[RawMessage]):
+        self.received.append(event.payload)
+
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="checksum")
+
+        await self.send_result_to_all(connections, RawMessage(event.payload.view[:4]))
+
+
+@dataclass
+class MyCore(Core):
+    last_result: Optional[RawMessage] = None
+
+    @sink("checksum")
+    async def checksum_sink(self, topic: str, event: Event[RawMessage]):
+        self.last_result = event.payload
+
+
+class TestRaw(unittest.TestCase):
+
+    def test_serde(self):
+        buffer = bytearray(b"\x00\x01\x02\x03")
+
+        message = RawMessage(memoryview(buffer)[1:])
+        format_type, serialized_data = message.serialize()
+
+        self.assertEqual(format_type, BYTES_FORMAT_TYPE)
+        self.assertEqual(serialized_data, b"\x01\x02\x03")
+
+        deserialized = RawMessage.deserialize(format_type, serialized_data)
+        self.assertIsInstance(deserialized.data, memoryview)
+        self.assertEqual(len(deserialized), 3)
+
+        self.assertEqual(bytes(RawMessage.deserialize(*RawMessage(b"abc").serialize(format_type="avro")).data), b"abc")
+
+        # hashable also if it wraps a writable memoryview
+        self.assertIn(message, {message})
+        self.assertEqual(message.view, memoryview(b"\x01\x02\x03"))
+
+
+class TestRawOperation(unittest.IsolatedAsyncioTestCase):
+
+    async def test_zero_copy(self):
+        blob = bytes(range(256)) * 4096
+        setup_blob = b"weights" * 1024
+
+        plugin = ChecksumPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = MyCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "checksum": OperationRequirement(Constraint(
+                    inputs=[Input.raw()],
+                    outputs=[Output.raw()],
+                ), default_setup_data=setup_blob)
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        self.assertIsInstance(plugin.setup_data, memoryview)
+        self.assertIs(plugin.setup_data.obj, setup_blob)
+
+        view = memoryview(blob)
+        await core.execute("checksum", RawMessage(view), any=True)
+
+        await asyncio.sleep(1)
+
+        self.assertIs(plugin.received[0].data, view)
+        self.assertIs(core.last_result.view.obj, blob)
+        self.assertEqual(bytes(core.last_result.data), blob[:4])
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
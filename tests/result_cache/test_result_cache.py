@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.cache import ResultCache
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class LowercasePlugin(Plugin):
+    invocations: int = 0
+
+    @operation(
+        name="lowercase",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def lowercase_event_handler(self, topic: str, event: Event[StringMessage]):
+        self.invocations += 1
+
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="lowercase")
+
+        await self.send_result_to_all(connections, StringMessage(event.payload.value.lower()))
+
+
+@dataclass
+class MyCore(Core):
+    sink_results: List[str] = field(default_factory=list)
+
+    @sink("lowercase")
+    async def lowercase_sink(self, topic: str, event: Event[StringMessage]):
+        self.sink_results.append(event.payload.value)
+
+
+class TestResultCache(unittest.IsolatedAsyncioTestCase):
+
+    def test_ttl_and_lru(self):
+        now = [0.0]
+        cache = ResultCache(ttl=10, max_entries=2, clock=lambda: now[0])
+
+        a, b, c = (cache.key_of(StringMessage(value)) for value in ("a", "b", "c"))
+        self.assertEqual(a, cache.key_of(StringMessage("a")))
+
+        cache.put(a, "A")
+        cache.put(b, "B")
+        self.assertEqual(cache.get(a), (True, "A"))
+
+        cache.put(c, "C")       # b is least recently used
+        self.assertEqual(cache.get(b), (False, None))
+        self.assertEqual(cache.metrics.evictions, 1)
+
+        now[0] = 11
+        self.assertEqual(cache.get(a), (False, None))
+        self.assertEqual(cache.metrics.expirations, 1)
+
+        self.assertEqual(cache.metrics.hits, 1)
+        self.assertEqual(cache.metrics.misses, 2)
+
+    async def test_call(self):
+        plugin = LowercasePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        result_cache = ResultCache(ttl=60)
+
+        core = MyCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "lowercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ), result_cache=result_cache)
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        result = await core.call("lowercase", StringMessage("HELLO"), timeout=2)
+        self.assertEqual(result.value, "hello")
+
+        result = await core.call("lowercase", StringMessage("HELLO"), timeout=2)
+        self.assertEqual(result.value, "hello")
+
+        result = await core.call("lowercase", StringMessage("WORLD"), timeout=2)
+        self.assertEqual(result.value, "world")
+
+        self.assertEqual(plugin.invocations, 2)
+        self.assertEqual(result_cache.metrics.hits, 1)
+        self.assertEqual(result_cache.metrics.misses, 2)
+        self.assertEqual(len(core._pending_calls), 0)
+
+        await core.execute("lowercase", StringMessage("SINK"), any=True)
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(core.sink_results, ["sink"])      # call results are not sent to sink
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+from dataclasses import dataclass
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class SlowUppercasePlugin(Plugin):
+    invocations: int = 0
+
+    @operation(
+        name="uppercase",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def uppercase_event_handler(self, topic: str, event: Event[StringMessage]):
+        self.invocations += 1
+
+        await asyncio.sleep(0.3)
+
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="uppercase")
+
+        await self.send_result_to_all(connections, StringMessage(event.payload.value.upper()))
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_coalescing(self):
+        plugin = SlowUppercasePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = Core(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "uppercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ), single_flight=True)
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        results = await asyncio.gather(
+            *[core.call("uppercase", StringMessage("hello"), timeout=2) for _ in range(10)],
+            core.call("uppercase", StringMessage("world"), timeout=2)
+        )
+
+        self.assertEqual([result.value for result in results], ["HELLO"] * 10 + ["WORLD"])
+        self.assertEqual(plugin.invocations, 2)
+        self.assertEqual(core.coalesced_calls, 9)
+        self.assertEqual(len(core._in_flight_calls), 0)
+
+        await core.call("uppercase", StringMessage("hello"), timeout=2)    # nothing in flight anymore
+        self.assertEqual(plugin.invocations, 3)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+    async def _start(self):
+        plugin = SlowUppercasePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = Core(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "uppercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ), single_flight=True)
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        return plugin, core
+
+    async def test_cancelled_leader(self):
+        plugin, core = await self._start()
+
+        leader = asyncio.create_task(core.call("uppercase", StringMessage("hello")))
+        await asyncio.sleep(0.1)
+
+        follower = asyncio.create_task(core.call("uppercase", StringMessage("hello")))
+        await asyncio.sleep(0.1)
+
+        leader.cancel()
+
+        result = await asyncio.wait_for(follower, 2)     # follower has not a timeout, it must not hang
+
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(result.value, "HELLO")
+        self.assertEqual(core.coalesced_calls, 1)
+        self.assertEqual(len(core._in_flight_calls), 0)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
+
+    async def test_leader_timeout_is_not_shared(self):
+        plugin, core = await self._start()
+
+        results = await asyncio.gather(
+            core.call("uppercase", StringMessage("hello"), timeout=0.1),
+            core.call("uppercase", StringMessage("hello"), timeout=2),
+            return_exceptions=True
+        )
+
+        self.assertIsInstance(results[0], TimeoutError)
+        self.assertEqual(results[1].value, "HELLO")
+        self.assertEqual(len(core._in_flight_calls), 0)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
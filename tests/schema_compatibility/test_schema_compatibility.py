@@ -0,0 +1,203 @@
+import asyncio
+import json
+import unittest
+from dataclasses import dataclass
+from typing import Optional
+
+from busline.event.event import Event
+from busline.event.message.avro_message import AvroMessageMixin
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.events.raw import RawMessage
+from orbitalis.orbiter.compatibility import can_read, SchemaCompatibility
+from orbitalis.orbiter.resolution import tag_message, read_tagged_message, writer_fingerprint_of
+from orbitalis.orbiter.schema_registry import SchemaRegistry
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass(frozen=True)
+class MeasureV1(AvroMessageMixin):
+    sensor: str
+    value: float
+
+    class Meta:
+        schema_name = "Measure"
+
+
+@dataclass(frozen=True)
+class MeasureV2(AvroMessageMixin):
+    sensor: str
+    value: float
+    unit: Optional[str] = None
+
+    class Meta:
+        schema_name = "Measure"
+
+
+@dataclass
+class MeasurePlugin(Plugin):
+
+    @operation(
+        name="measure",
+        input=Input.from_message(MeasureV2),
+        output=Output.string()
+    )
+    async def measure_event_handler(self, topic: str, event: Event[MeasureV1]):
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="measure")
+
+        await self.send_result_to_all(connections, StringMessage(event.payload.sensor))
+
+
+@dataclass
+class MeasureCore(Core):
+    received: list = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.received = []
+
+    @sink("measure")
+    async def measure_sink(self, topic: str, event: Event[StringMessage]):
+        self.received.append(event.payload.value)
+
+
+def record(name: str, *fields) -> str:
+    return json.dumps({"type": "record", "name": name, "fields": list(fields)})
+
+
+class TestCanRead(unittest.TestCase):
+
+    def test_added_field(self):
+        old = record("Measure", {"name": "value", "type": "double"})
+        new_with_default = record("Measure", {"name": "value", "type": "double"}, {"name": "unit", "type": ["null", "string"], "default": None})
+        new_without_default = record("Measure", {"name": "value", "type": "double"}, {"name": "unit", "type": "string"})
+
+        self.assertTrue(can_read(new_with_default, old))
+        self.assertTrue(can_read(old, new_with_default))     # writer's extra fields are ignored
+        self.assertFalse(can_read(new_without_default, old))
+
+    def test_promotion_and_names(self):
+        as_int = record("Measure", {"name": "value", "type": "int"})
+        as_long = record("Measure", {"name": "value", "type": "long"})
+        as_string = record("Measure", {"name": "value", "type": "string"})
+
+        self.assertTrue(can_read(as_long, as_int))
+        self.assertFalse(can_read(as_int, as_long))
+        self.assertFalse(can_read(as_string, as_int))
+        self.assertFalse(can_read(record("Other", {"name": "value", "type": "int"}), as_int))
+
+    def test_complex_types(self):
+        enum_writer = record("E", {"name": "e", "type": {"type": "enum", "name": "Color", "symbols": ["RED", "BLUE"]}})
+        enum_reader = record("E", {"name": "e", "type": {"type": "enum", "name": "Color", "symbols": ["RED"]}})
+
+        self.assertTrue(can_read(enum_writer, enum_reader))
+        self.assertFalse(can_read(enum_reader, enum_writer))
+
+        array_of_int = record("A", {"name": "a", "type": {"type": "array", "items": "int"}})
+        array_of_double = record("A", {"name": "a", "type": {"type": "array", "items": "double"}})
+        self.assertTrue(can_read(array_of_double, array_of_int))
+
+        recursive = record("Node", {"name": "next", "type": ["null", "Node"], "default": None})
+        self.assertTrue(can_read(recursive, recursive.replace('"next"', '"next" ')))
+
+    def test_cache(self):
+        can_read.cache_clear()
+
+        old = MeasureV1.avro_schema()
+        new = MeasureV2.avro_schema()
+
+        self.assertTrue(can_read(new, old))
+        self.assertTrue(can_read(new, old))
+
+        self.assertEqual(can_read.cache_info().hits, 1)
+
+    def test_spec_modes(self):
+        old = Input.from_message(MeasureV1)
+        new = Input.from_message(MeasureV2)
+
+        self.assertFalse(old.is_compatible(new))
+        self.assertTrue(Input.from_message(MeasureV2).with_compatibility(SchemaCompatibility.BACKWARD).is_compatible(old))
+        self.assertTrue(Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FORWARD).is_compatible(new))
+        self.assertTrue(Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FULL).is_compatible(new))
+        self.assertFalse(Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FULL).is_compatible(Input.string()))
+
+        # schemas must be shipped to be resolved
+        compacted = Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FORWARD).compacted()
+        self.assertTrue(compacted.is_resolved)
+        self.assertFalse(Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FORWARD).is_compatible(new.compacted()))
+
+
+class TestSchemaResolution(unittest.TestCase):
+
+    def test_read_with_writer_schema(self):
+        registry = SchemaRegistry()
+        registry.register(MeasureV1.avro_schema())
+
+        tagged = tag_message(MeasureV1(sensor="s1", value=5), "MeasureV1", writer_fingerprint_of(MeasureV1))
+
+        self.assertEqual(read_tagged_message(tagged, registry, MeasureV2), MeasureV2(sensor="s1", value=5))
+        self.assertEqual(read_tagged_message(tagged, SchemaRegistry(), MeasureV1), MeasureV1(sensor="s1", value=5))
+
+        # writer schema must be known to be resolved
+        with self.assertRaises(ValueError):
+            read_tagged_message(tagged, SchemaRegistry(), MeasureV2)
+
+    def test_not_resolvable(self):
+        self.assertIsNone(writer_fingerprint_of(RawMessage))
+
+
+class TestSchemaEvolution(unittest.IsolatedAsyncioTestCase):
+
+    async def test_evolved_plugin(self):
+        plugin = MeasurePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            schema_negotiation=True
+        )
+
+        core = MeasureCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            schema_negotiation=True,
+            operation_requirements={
+                "measure": OperationRequirement(Constraint(
+                    inputs=[Input.from_message(MeasureV1).with_compatibility(SchemaCompatibility.FORWARD)],
+                    outputs=[Output.string()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        # plugin offered only fingerprints, its schema was fetched to be resolved
+        self.assertIn(Input.from_message(MeasureV2).fingerprints[0], core.schema_registry)
+
+        self.assertEqual(await core.execute_sending_all("measure", MeasureV1(sensor="s1", value=1.5)), {plugin.identifier})
+        self.assertEqual(core._execution_input("measure", MeasureV1).compatibility, SchemaCompatibility.FORWARD)
+
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(core.received, ["s1"])
+
+        # payloads are tagged with their writer schema, which is known by both sides
+        self.assertTrue(core.retrieve_connections(operation_name="measure")[0].schema_resolution)
+        self.assertTrue(plugin.retrieve_connections(operation_name="measure")[0].schema_resolution)
+        self.assertIn(Input.from_message(MeasureV1).fingerprints[0], plugin.schema_registry)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,143 @@
+import asyncio
+import unittest
+from dataclasses import dataclass
+
+from busline.event.event import Event
+from busline.event.message.avro_message import AvroMessageMixin
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.events.codec import COMPACT_FORMAT_TYPE
+from orbitalis.events.discover import DiscoverMessage, DiscoverQuery
+from orbitalis.orbiter.fingerprint import schema_fingerprint
+from orbitalis.orbiter.schema_registry import SchemaRegistry
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass(frozen=True)
+class MeasureMessage(AvroMessageMixin):
+    sensor: str
+    value: float
+    unit: str
+
+
+@dataclass
+class MeasurePlugin(Plugin):
+
+    @operation(
+        name="measure",
+        input=Input.from_message(MeasureMessage),
+        output=Output.string()
+    )
+    async def measure_event_handler(self, topic: str, event: Event[MeasureMessage]):
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="measure")
+
+        await self.send_result_to_all(connections, StringMessage(f"{event.payload.value}{event.payload.unit}"))
+
+
+class TestSchemaNegotiation(unittest.TestCase):
+
+    def test_compacted_spec(self):
+        spec = Input.from_message(MeasureMessage)
+        compacted = spec.compacted()
+
+        self.assertEqual(compacted.schemas, [])
+        self.assertEqual(compacted.schema_fingerprints, [schema_fingerprint(MeasureMessage.avro_schema())])
+        self.assertFalse(compacted.is_resolved)
+        self.assertTrue(compacted.has_input)
+        self.assertTrue(compacted.is_compatible(spec))
+        self.assertTrue(spec.is_compatible(compacted))
+        self.assertTrue(compacted.is_compatible_with_schema(MeasureMessage.avro_schema()))
+        self.assertEqual(compacted.signature, spec.signature)
+        self.assertFalse(compacted.is_compatible(Input.string().compacted()))
+
+    def test_registry_resolve(self):
+        registry = SchemaRegistry()
+        compacted = Input.from_message(MeasureMessage).compacted()
+
+        self.assertEqual(registry.resolve(compacted), compacted)
+        self.assertEqual(registry.missing(compacted.schema_fingerprints), compacted.schema_fingerprints)
+
+        registry.register_spec(Input.from_message(MeasureMessage))
+
+        resolved = registry.resolve(compacted)
+        self.assertIsInstance(resolved, Input)
+        self.assertTrue(resolved.is_resolved)
+        self.assertEqual(resolved.schemas, [MeasureMessage.avro_schema()])
+        self.assertEqual(registry.missing(compacted.schema_fingerprints), [])
+
+    def test_compacted_discover_is_smaller(self):
+
+        def build(compacted: bool) -> DiscoverMessage:
+            constraint = Constraint(inputs=[Input.from_message(MeasureMessage)], outputs=[Output.string()])
+
+            return DiscoverMessage(
+                core_identifier="core",
+                offer_topic="offer",
+                core_keepalive_topic="keepalive",
+                core_keepalive_request_topic="keepalive.request",
+                considered_dead_after=10,
+                queries={"measure": DiscoverQuery.from_constraint("measure", constraint, compacted=compacted)},
+                schema_request_topic="schema.request"
+            )
+
+        full = build(False).serialize()[1]
+        compacted_message = build(True)
+        format_type, compacted = compacted_message.serialize()
+
+        self.assertEqual(format_type, COMPACT_FORMAT_TYPE)
+        self.assertLess(len(compacted), len(full))
+        self.assertEqual(DiscoverMessage.deserialize(format_type, compacted), compacted_message)
+
+
+class TestSchemaNegotiationHandshake(unittest.IsolatedAsyncioTestCase):
+
+    async def test_handshake_and_fetch(self):
+        plugin = MeasurePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            schema_negotiation=True
+        )
+
+        core = Core(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            schema_negotiation=True,
+            operation_requirements={
+                "measure": OperationRequirement(Constraint(
+                    inputs=[Input.from_message(MeasureMessage)],
+                    outputs=[Output.string()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        connection = core.retrieve_connections(operation_name="measure")[0]
+        self.assertTrue(connection.input.is_resolved)
+        self.assertTrue(connection.input.is_compatible_with_schema(MeasureMessage.avro_schema()))
+
+        # schemas which are unknown are fetched lazily
+        core.schema_registry = SchemaRegistry()
+        fingerprint = schema_fingerprint(MeasureMessage.avro_schema())
+
+        self.assertEqual(await core.fetch_schemas(plugin.identifier, [fingerprint]), [])
+        self.assertEqual(core.schema_registry.get(fingerprint), MeasureMessage.avro_schema())
+
+        self.assertEqual(await core.fetch_schemas(plugin.identifier, [42]), [42])
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,161 @@
+import asyncio
+import random
+import time
+import unittest
+from dataclasses import dataclass
+from typing import Tuple, List
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.events.discover import DiscoverMessage
+from orbitalis.events.keepalive import KeepaliveMessage, LoadKeepaliveMessage
+from orbitalis.events.offer import OfferMessage
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.simulation.simulation import Simulation
+from orbitalis.utils import clock
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+def build_fleet(simulation: Simulation, n_cores: int, n_plugins: int) -> Tuple[List[Core], List[EchoPlugin]]:
+    plugins = [
+        EchoPlugin(identifier=f"plugin{i}", eventbus_client=simulation.build_client())
+        for i in range(n_plugins)
+    ]
+
+    cores = [
+        Core(
+            identifier=f"core{i}",
+            eventbus_client=simulation.build_client(),
+            discovering_interval=5,
+            operation_requirements={
+                "echo": OperationRequirement(Constraint(
+                    minimum=1,
+                    maximum=1,
+                    inputs=[Input.string()],
+                    outputs=[Output.no_output()],
+                ))
+            }
+        )
+        for i in range(n_cores)
+    ]
+
+    return cores, plugins
+
+
+async def converge(simulation: Simulation, cores: List[Core], plugins: List[EchoPlugin]):
+    await simulation.start_all(plugins)
+    await simulation.start_all(cores)
+
+    convergence_time = await simulation.wait_for_compliance(cores, timeout=120)
+
+    # keep fleet alive for a while (keepalive, discover, ...)
+    await simulation.sleep(60)
+
+    await simulation.stop_all(cores)
+    await simulation.stop_all(plugins)
+
+    return convergence_time
+
+
+async def keep_alive_for(simulation: Simulation, cores: List[Core], plugins: List[EchoPlugin], seconds: float):
+    await simulation.start_all(plugins)
+    await simulation.start_all(cores)
+
+    await simulation.wait_for_compliance(cores, timeout=120)
+
+    simulation.eventbus.reset_counters()
+
+    await simulation.sleep(seconds)
+
+    await simulation.stop_all(cores)
+    await simulation.stop_all(plugins)
+
+
+async def virtual_now():
+    return clock.now()
+
+
+class TestSimulation(unittest.TestCase):
+
+    def test_virtual_time(self):
+        with Simulation() as simulation:
+            started_at = time.monotonic()
+            virtual_started_at = simulation.run(virtual_now())
+
+            simulation.run(asyncio.sleep(3600))
+
+            self.assertLess(time.monotonic() - started_at, 1)
+            self.assertAlmostEqual(simulation.elapsed, 3600)
+            self.assertAlmostEqual((simulation.run(virtual_now()) - virtual_started_at).total_seconds(), 3600)
+
+    def test_fleet(self):
+        with Simulation(delay=0.05, jitter=0.05) as simulation:
+            cores, plugins = build_fleet(simulation, 20, 20)
+
+            convergence_time = simulation.run(converge(simulation, cores, plugins))
+
+            self.assertIsNotNone(convergence_time)
+            self.assertGreaterEqual(simulation.elapsed, 60)
+            self.assertEqual(simulation.eventbus.count(DiscoverMessage), 20)    # one discover for each core, then they are compliant
+            self.assertEqual(simulation.eventbus.count(OfferMessage), 20 * 20)
+
+    def test_determinism(self):
+        results = []
+
+        for _ in range(2):
+            with Simulation(delay=0.05, jitter=0.2, loss=0.1, seed=42) as simulation:
+                cores, plugins = build_fleet(simulation, 10, 10)
+
+                convergence_time = simulation.run(converge(simulation, cores, plugins))
+
+                results.append((convergence_time, simulation.eventbus.published, simulation.eventbus.lost, dict(simulation.eventbus.published_by_type)))
+
+        self.assertGreater(results[0][2], 0)
+        self.assertEqual(results[0], results[1])
+
+    def test_private_random_generator(self):
+        identifiers = []
+
+        for _ in range(2):
+            state = random.getstate()
+
+            with Simulation(seed=7) as simulation:
+                plugin = EchoPlugin(eventbus_client=simulation.build_client())     # default identifier
+                identifiers.append(plugin.identifier)
+
+                simulation.run(asyncio.sleep(1))
+
+            self.assertEqual(random.getstate(), state)
+
+        self.assertEqual(identifiers[0], identifiers[1])
+
+        # outside simulations, identifiers are random again
+        self.assertNotEqual(EchoPlugin(eventbus_client=build_new_local_client()).identifier, identifiers[0])
+
+    def test_keepalive_rate(self):
+        with Simulation(delay=0.05, jitter=0.05, seed=3) as simulation:
+            cores, plugins = build_fleet(simulation, 1, 1)
+
+            simulation.run(keep_alive_for(simulation, cores, plugins, 1800))
+
+            keepalives = simulation.eventbus.count(KeepaliveMessage, LoadKeepaliveMessage)
+
+            # with default dead time (120 s) and margin (10 s), each side sends a keepalive about every 110 seconds
+            self.assertGreater(keepalives, 0)
+            self.assertLessEqual(keepalives, 2 * (1800 // 100 + 1))
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import Optional, AsyncIterator, List
+
+from busline.event.event import Event
+from busline.event.message.number_message import Int64Message
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.orbiter.stream import StreamError
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class GeneratorPlugin(Plugin):
+
+    @operation(
+        name="count",
+        input=Input.int64(),
+        output=Output.int64()
+    )
+    async def count_event_handler(self, topic: str, event: Event[Int64Message]):
+        for i in range(event.payload.value):
+            yield Int64Message(i)
+
+        if event.payload.value < 0:
+            raise ValueError("negative value")
+
+    @operation(
+        name="split",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def split_event_handler(self, topic: str, event: Event[StringMessage]):
+        for word in event.payload.value.split():
+            yield StringMessage(word)
+
+
+@dataclass
+class CollectorCore(Core):
+    numbers: List[int] = field(default_factory=list)
+    words: List[str] = field(default_factory=list)
+    error: Optional[StreamError] = None
+    count_done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @sink("count", streaming=True)
+    async def count_sink(self, topic: str, stream: AsyncIterator[Int64Message]):
+        try:
+            async for message in stream:
+                self.numbers.append(message.value)
+
+        except StreamError as e:
+            self.error = e
+
+        self.count_done.set()
+
+    @sink("split")
+    async def split_sink(self, topic: str, event: Event[StringMessage]):
+        self.words.append(event.payload.value)
+
+
+class TestResultStream(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.plugin = GeneratorPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            stream_window=4
+        )
+
+        self.core = CollectorCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            stream_window=4,
+            operation_requirements={
+                "count": OperationRequirement(Constraint(
+                    inputs=[Input.int64()],
+                    outputs=[Output.int64().as_stream()],
+                )),
+                "split": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string().as_stream()],
+                ))
+            }
+        )
+
+        await self.plugin.start()
+        await self.core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(self.core.state, CoreState.COMPLIANT)
+
+    async def asyncTearDown(self):
+        await self.plugin.stop()
+        await self.core.stop()
+
+        await asyncio.sleep(1)
+
+    async def test_streaming_sink(self):
+        await self.core.execute("count", Int64Message(50), any=True)
+
+        await asyncio.wait_for(self.core.count_done.wait(), 5)
+
+        self.assertEqual(self.core.numbers, list(range(50)))
+        self.assertIsNone(self.core.error)
+
+    async def test_stream_error(self):
+        await self.core.execute("count", Int64Message(-1), any=True)
+
+        await asyncio.wait_for(self.core.count_done.wait(), 5)
+
+        self.assertEqual(self.core.numbers, [])
+        self.assertIsNotNone(self.core.error)
+
+    async def test_item_by_item_sink(self):
+        await self.core.execute("split", StringMessage("hello streaming world"), any=True)
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(self.core.words, ["hello", "streaming", "world"])
@@ -0,0 +1,222 @@
+import asyncio
+import unittest
+from dataclasses import dataclass, field
+from typing import Optional, AsyncIterator
+
+from busline.event.message.number_message import Int64Message
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.events.raw import RawMessage
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.orbiter.stream import StreamError
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class CounterPlugin(Plugin):
+    total: int = 0
+    received_bytes: int = 0
+    chunks: int = 0
+    max_in_flight: int = 0
+    produced: int = 0
+    error: Optional[StreamError] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @operation(
+        name="sum",
+        input=Input.int64(),
+        streaming=True
+    )
+    async def sum_event_handler(self, topic: str, stream: AsyncIterator[Int64Message]):
+        try:
+            async for message in stream:
+                self.total += message.value
+                self.max_in_flight = max(self.max_in_flight, self.produced - self.total)
+                await asyncio.sleep(0.001)
+
+        except StreamError as e:
+            self.error = e
+
+        self.done.set()
+
+    @operation(
+        name="size",
+        input=Input.raw(),
+        streaming=True
+    )
+    async def size_event_handler(self, topic: str, stream: AsyncIterator[RawMessage]):
+        async for chunk in stream:
+            self.chunks += 1
+            self.received_bytes += len(chunk)
+
+        self.done.set()
+
+    @operation(
+        name="stall",
+        input=Input.int64(),
+        streaming=True
+    )
+    async def stall_event_handler(self, topic: str, stream: AsyncIterator[Int64Message]):
+        await asyncio.Event().wait()     # items are never consumed, so credits are never granted
+
+
+class TestStream(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.plugin = CounterPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            stream_window=4
+        )
+
+        self.core = Core(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            stream_window=4,
+            stream_chunk_size=1024,
+            operation_requirements={
+                "sum": OperationRequirement(Constraint(
+                    inputs=[Input.int64().as_stream()],
+                    outputs=[Output.no_output()],
+                )),
+                "size": OperationRequirement(Constraint(
+                    inputs=[Input.raw().as_stream()],
+                    outputs=[Output.no_output()],
+                )),
+                "stall": OperationRequirement(Constraint(
+                    inputs=[Input.int64().as_stream()],
+                    outputs=[Output.no_output()],
+                ))
+            }
+        )
+
+        await self.plugin.start()
+        await self.core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(self.core.state, CoreState.COMPLIANT)
+
+    async def asyncTearDown(self):
+        await self.plugin.stop()
+        await self.core.stop()
+
+        await asyncio.sleep(1)
+
+    async def test_bounded_stream(self):
+        async def numbers():
+            for _ in range(200):
+                self.plugin.produced += 1
+                yield Int64Message(1)
+
+        plugin_identifier = await self.core.execute_stream("sum", numbers())
+        self.assertEqual(plugin_identifier, self.plugin.identifier)
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertEqual(self.plugin.total, 200)
+        self.assertIsNone(self.plugin.error)
+        self.assertLessEqual(self.plugin.max_in_flight, 2 * self.plugin.stream_window)
+        self.assertEqual(self.plugin._stream_receiver.open_streams, 0)
+
+    async def test_different_windows(self):
+        self.core.stream_window = 2
+        self.plugin.stream_window = 16
+
+        async def numbers():
+            for _ in range(50):
+                self.plugin.produced += 1
+                yield Int64Message(1)
+
+        await self.core.execute_stream("sum", numbers(), credit_timeout=2)
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertEqual(self.plugin.total, 50)
+        self.assertIsNone(self.plugin.error)
+
+    async def test_chunked_bytes(self):
+        async def blobs():
+            yield bytes(10 * 1024 + 1)
+            yield memoryview(bytes(100))
+
+        await self.core.execute_stream("size", blobs())
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertEqual(self.plugin.received_bytes, 10 * 1024 + 1 + 100)
+        self.assertEqual(self.plugin.chunks, 12)
+
+    async def test_aborted_stream(self):
+        async def failing():
+            yield Int64Message(1)
+            raise RuntimeError("source failed")
+
+        with self.assertRaises(RuntimeError):
+            await self.core.execute_stream("sum", failing())
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertEqual(self.plugin.total, 1)
+        self.assertIsNotNone(self.plugin.error)
+
+    async def _open_stalled_stream(self) -> asyncio.Task:
+        stalled = asyncio.Event()
+
+        async def numbers():
+            yield Int64Message(1)
+            await stalled.wait()    # i.e. sender is dead
+
+        task = asyncio.create_task(self.core.execute_stream("sum", numbers()))
+
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.plugin._stream_receiver.open_streams, 1)
+
+        return task
+
+    async def test_idle_stream(self):
+        self.plugin.stream_idle_timeout = 1
+
+        task = await self._open_stalled_stream()
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertEqual(self.plugin.total, 1)
+        self.assertIsInstance(self.plugin.error, StreamError)
+        self.assertEqual(self.plugin._stream_receiver.open_streams, 0)
+
+        task.cancel()
+
+    async def test_stream_of_closed_connection(self):
+        task = await self._open_stalled_stream()
+
+        await self.plugin._close_self_side_connection(self.core.identifier, "sum")
+
+        await asyncio.wait_for(self.plugin.done.wait(), 5)
+
+        self.assertIsInstance(self.plugin.error, StreamError)
+        self.assertEqual(self.plugin._stream_receiver.open_streams, 0)
+
+        task.cancel()
+
+    async def test_outgoing_stream_of_closed_connection(self):
+        async def numbers():
+            for _ in range(100):
+                yield Int64Message(1)
+
+        task = asyncio.create_task(self.core.execute_stream("stall", numbers()))     # no credit timeout
+
+        await asyncio.sleep(0.5)
+        self.assertFalse(task.done())
+
+        await self.core._close_self_side_connection(self.plugin.identifier, "stall")
+
+        with self.assertRaises(StreamError):
+            await asyncio.wait_for(task, 1)
+
+        self.assertEqual(len(self.core._outgoing_streams), 0)
@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+from dataclasses import dataclass
+from typing import Optional
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import sink
+from orbitalis.core.state import CoreState
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.tracing.exporter import InMemorySpanExporter
+from orbitalis.tracing.tracer import Tracer
+from orbitalis.utils.event_headers import encode_event_identifier, decode_event_identifier
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class UppercasePlugin(Plugin):
+
+    @operation(
+        name="uppercase",
+        input=Input.string(),
+        output=Output.string()
+    )
+    async def uppercase_event_handler(self, topic: str, event: Event[StringMessage]):
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="uppercase")
+
+        await self.send_result_to_all(connections, event.payload.value.upper())
+
+
+@dataclass
+class MyCore(Core):
+    last_result: Optional[str] = None
+
+    @sink("uppercase")
+    async def uppercase_sink(self, topic: str, event: Event[StringMessage]):
+        self.last_result = event.payload.value
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+
+    def test_event_identifier_headers(self):
+        event_identifier = encode_event_identifier({"a": "1", "b": "x-y"}, identifier="id")
+
+        self.assertEqual(decode_event_identifier(event_identifier), ("id", {"a": "1", "b": "x-y"}))
+        self.assertEqual(decode_event_identifier("id"), ("id", {}))
+
+    async def test_span_propagation(self):
+        exporter = InMemorySpanExporter()
+
+        plugin = UppercasePlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            tracer=Tracer(exporter=exporter)
+        )
+
+        core = MyCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            tracer=Tracer(exporter=exporter),
+            operation_requirements={
+                "uppercase": OperationRequirement(Constraint(
+                    inputs=[Input.string()],
+                    outputs=[Output.string()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("uppercase", StringMessage("hello"), any=True)
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(core.last_result, "HELLO")
+
+        execute_span = exporter.spans_by_name("execute uppercase")[0]
+        operation_span = exporter.spans_by_name("operation uppercase")[0]
+        result_span = exporter.spans_by_name("result uppercase")[0]
+        sink_span = exporter.spans_by_name("sink uppercase")[0]
+
+        self.assertEqual(len(exporter.spans_of_trace(execute_span.trace_id)), 4)
+
+        self.assertEqual(operation_span.parent_span_id, execute_span.span_id)
+        self.assertEqual(result_span.parent_span_id, operation_span.span_id)
+        self.assertEqual(sink_span.parent_span_id, result_span.span_id)
+
+        self.assertEqual(operation_span.orbiter_identifier, plugin.identifier)
+        self.assertEqual(sink_span.orbiter_identifier, core.identifier)
+        self.assertIn("broker_latency", operation_span.attributes)
+        self.assertIn("broker_latency", sink_span.attributes)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from busline.event.event import Event
+from busline.event.message.string_message import StringMessage
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.state import CoreState
+from orbitalis.events.discover import DiscoverMessage
+from orbitalis.events.offer import OfferMessage
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from orbitalis.traffic.record import TrafficRecord, TrafficRecordKind
+from orbitalis.traffic.recorder import TrafficRecorder, RecordingPubSubClient
+from orbitalis.traffic.replayer import read_traffic, TrafficReplayer
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.string(),
+        output=Output.no_output()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[StringMessage]):
+        pass
+
+
+class TestTraffic(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "traffic.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_only_file(self):
+        with TrafficRecorder(path=self.path) as recorder:
+            recorder.record(TrafficRecordKind.PUBLISH, "topic", "me", StringMessage("hello"), "id;reply_to=abc")
+            recorder.record(TrafficRecordKind.DELIVER, "topic", "me", None)
+
+        with TrafficRecorder(path=self.path) as recorder:
+            recorder.record(TrafficRecordKind.PUBLISH, "topic", "me", StringMessage("again"))
+
+        # crash while writing last record
+        with open(self.path, "ab") as f:
+            f.write(TrafficRecord.from_message(TrafficRecordKind.PUBLISH, 0, "topic", "me", StringMessage("lost")).encode()[:-2])
+
+        records = list(read_traffic(self.path))
+
+        self.assertEqual([record.kind for record in records], [TrafficRecordKind.PUBLISH, TrafficRecordKind.DELIVER, TrafficRecordKind.PUBLISH])
+        self.assertEqual(records[0].message, StringMessage("hello"))
+        self.assertEqual(records[0].event_identifier, "id;reply_to=abc")
+        self.assertIsNone(records[1].message)
+        self.assertEqual(records[2].message, StringMessage("again"))
+
+    async def test_recording_client(self):
+        recorder = TrafficRecorder(path=self.path)
+
+        plugin = EchoPlugin(
+            identifier="plugin",
+            eventbus_client=RecordingPubSubClient.wrap(build_new_local_client(), recorder, source="plugin"),
+            with_loop=False
+        )
+
+        core = Core(
+            identifier="core",
+            eventbus_client=RecordingPubSubClient.wrap(build_new_local_client(), recorder, source="core"),
+            with_loop=False,
+            operation_requirements={
+                "echo": OperationRequirement(Constraint(
+                    minimum=1,
+                    inputs=[Input.string()],
+                    outputs=[Output.no_output()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(1)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("echo", StringMessage("hello"), any=True)
+
+        await asyncio.sleep(0.5)
+
+        await plugin.stop()
+        await core.stop()
+
+        recorder.close()
+
+        records = list(read_traffic(self.path))
+        summary = {(record.kind, record.source, type(record.message)) for record in records}
+
+        self.assertIn((TrafficRecordKind.PUBLISH, "core", DiscoverMessage), summary)
+        self.assertIn((TrafficRecordKind.DELIVER, "plugin", DiscoverMessage), summary)
+        self.assertIn((TrafficRecordKind.PUBLISH, "plugin", OfferMessage), summary)
+        self.assertIn((TrafficRecordKind.DELIVER, "plugin", StringMessage), summary)
+
+        timestamps = [record.timestamp for record in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    async def test_replay(self):
+        with TrafficRecorder(path=self.path) as recorder:
+            for i in range(5):
+                recorder.append(TrafficRecord.from_message(TrafficRecordKind.PUBLISH, 1000 + i * 0.5, "numbers", "producer", StringMessage(str(i))))
+                recorder.append(TrafficRecord.from_message(TrafficRecordKind.DELIVER, 1000 + i * 0.5, "numbers", "consumer", StringMessage(str(i))))
+
+            recorder.append(TrafficRecord.from_message(TrafficRecordKind.PUBLISH, 1003, "numbers", "other", StringMessage("other")))
+
+        received: List[Tuple[float, str]] = []
+
+        async def on_event(topic: str, event: Event):
+            received.append((time.monotonic(), event.payload.value))
+
+        subscriber = build_new_local_client()
+        await subscriber.connect()
+        await subscriber.subscribe("numbers", on_event)
+
+        publisher = build_new_local_client()
+        await publisher.connect()
+
+        # 2 seconds of traffic at 10x
+        replayer = TrafficReplayer(path=self.path, eventbus_client=publisher, speed=10, sources={"producer"})
+
+        started_at = time.monotonic()
+        self.assertEqual(await replayer.replay(), 5)
+        elapsed = time.monotonic() - started_at
+
+        await asyncio.sleep(0.1)
+
+        self.assertEqual([value for _, value in received], ["0", "1", "2", "3", "4"])
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertLess(elapsed, 1)
+
+        # as fast as possible
+        received.clear()
+        self.assertEqual(await TrafficReplayer(path=self.path, eventbus_client=publisher, speed=None).replay(), 6)
+
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(received), 6)
+
+        await subscriber.disconnect()
+        await publisher.disconnect()
@@ -0,0 +1,174 @@
+import asyncio
+import unittest
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List
+
+from busline.client.subscriber.event_handler.callback_event_handler import CallbackEventHandler
+from busline.event.event import Event
+from busline.event.message.number_message import Int64Message
+from orbitalis.core.core import Core
+from orbitalis.core.requirement import Constraint, OperationRequirement
+from orbitalis.core.sink import windowed_sink
+from orbitalis.core.state import CoreState
+from orbitalis.core.window import QuantileSketch, WindowedSink, WindowAggregate
+from orbitalis.orbiter.connection import Connection
+from orbitalis.orbiter.schemaspec import Input, Output
+from orbitalis.plugin.operation import operation
+from orbitalis.plugin.plugin import Plugin
+from tests.utils import build_new_local_client
+
+
+@dataclass
+class EchoPlugin(Plugin):
+
+    @operation(
+        name="echo",
+        input=Input.int64(),
+        output=Output.int64()
+    )
+    async def echo_event_handler(self, topic: str, event: Event[Int64Message]):
+        connections = await self.retrieve_and_touch_connections(input_topic=topic, operation_name="echo")
+
+        await self.send_result_to_all(connections, event.payload)
+
+
+@dataclass
+class WindowCore(Core):
+    aggregates: List[WindowAggregate] = field(default_factory=list)
+
+    @windowed_sink("echo", size=0.5, percentiles=(0.5,))
+    async def echo_sink(self, operation_name: str, aggregate: WindowAggregate):
+        self.aggregates.append(aggregate)
+
+
+def build_event(value: int) -> Event:
+    return Event(publisher_identifier="publisher", payload=Int64Message(value), identifier=str(value), timestamp=datetime.now())
+
+
+class TestWindowSink(unittest.IsolatedAsyncioTestCase):
+
+    def test_sketch(self):
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        other = QuantileSketch(relative_accuracy=0.01)
+
+        for value in range(1, 5001):
+            sketch.add(value)
+        for value in range(5001, 10001):
+            other.add(value)
+
+        sketch.merge(other)
+
+        self.assertEqual(sketch.count, 10000)
+        self.assertAlmostEqual(sketch.quantile(0.5), 5000, delta=5000 * 0.01)
+        self.assertAlmostEqual(sketch.quantile(0.99), 9900, delta=9900 * 0.01)
+
+        small = QuantileSketch(max_buckets=16)
+        for value in range(1, 10001):
+            small.add(value)
+
+        self.assertLessEqual(len(small._positive), 16)
+        self.assertAlmostEqual(small.quantile(1), 10000, delta=10000 * 0.01)
+
+    async def test_plugin_by_topic(self):
+        core = WindowCore(eventbus_client=build_new_local_client(), with_loop=False)
+        await core.eventbus_client.connect()
+        sink: WindowedSink = core.operation_sinks["echo"]
+
+        connection = Connection(
+            operation_name="echo",
+            remote_identifier="plugin",
+            incoming_close_connection_topic="close.in",
+            close_connection_to_remote_topic="close.out",
+            input=Input.int64(),
+            output=Output.int64(),
+            output_topic="echo.output"
+        )
+
+        # output arrived before connection registration is not cached
+        self.assertIsNone(sink._plugin_identifier("echo.output"))
+
+        core._add_connection(connection)
+        self.assertEqual(sink._plugin_identifier("echo.output"), "plugin")
+
+        await core._on_close_connection(connection)
+        self.assertNotIn("echo.output", sink._plugin_by_topic)
+
+    async def test_tumbling_and_sliding(self):
+        tumbling_aggregates: List[WindowAggregate] = []
+        sliding_aggregates: List[WindowAggregate] = []
+
+        tumbling = WindowedSink(
+            operation_name="op",
+            handler=CallbackEventHandler(lambda name, aggregate: tumbling_aggregates.append(aggregate)),
+            size=0.3
+        )
+
+        sliding = WindowedSink(
+            operation_name="op",
+            handler=CallbackEventHandler(lambda name, aggregate: sliding_aggregates.append(aggregate)),
+            size=0.6,
+            slide=0.3
+        )
+
+        for value in (1, 2, 3):
+            await tumbling.handle("topic", build_event(value))
+            await sliding.handle("topic", build_event(value))
+
+        await asyncio.sleep(0.4)
+
+        for value in (10, 20):
+            await tumbling.handle("topic", build_event(value))
+            await sliding.handle("topic", build_event(value))
+
+        await asyncio.sleep(1.2)
+
+        self.assertEqual([(a.count, a.sum, a.min, a.max) for a in tumbling_aggregates], [(3, 6, 1, 3), (2, 30, 10, 20)])
+        self.assertEqual([(a.count, a.sum) for a in sliding_aggregates], [(3, 6), (5, 36), (2, 30)])
+
+        self.assertIsNone(tumbling._timer)
+        self.assertEqual(len(sliding._panes), 0)
+
+    async def test_windowed_sink(self):
+        plugin = EchoPlugin(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True
+        )
+
+        core = WindowCore(
+            eventbus_client=build_new_local_client(),
+            with_loop=False,
+            raise_exceptions=True,
+            operation_requirements={
+                "echo": OperationRequirement(Constraint(
+                    inputs=[Input.int64()],
+                    outputs=[Output.int64()],
+                ))
+            }
+        )
+
+        await plugin.start()
+        await core.start()
+
+        await asyncio.sleep(2)
+
+        self.assertEqual(core.state, CoreState.COMPLIANT)
+
+        await core.execute("echo", [Int64Message(value) for value in range(1, 101)], any=True)
+
+        await asyncio.sleep(1.5)
+
+        self.assertGreater(len(core.aggregates), 0)
+
+        self.assertEqual(sum(aggregate.count for aggregate in core.aggregates), 100)
+        self.assertEqual(sum(aggregate.sum for aggregate in core.aggregates), 5050)
+
+        for aggregate in core.aggregates:
+            self.assertEqual(aggregate.plugin_identifier, plugin.identifier)
+            self.assertTrue(aggregate.min <= aggregate.percentiles[0.5] <= aggregate.max * 1.01)
+
+        await plugin.stop()
+        await core.stop()
+
+        await asyncio.sleep(1)